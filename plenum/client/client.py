@@ -18,7 +18,10 @@ from ledger.merkle_verifier import MerkleVerifier
 from ledger.serializers.compact_serializer import CompactSerializer
 from ledger.util import F, STH
 from plenum.client.pool_manager import HasPoolManager
-from plenum.common.exceptions import MissingNodeOp, RemoteNotFound
+from plenum.common.compression import SupportedCompressions, \
+    decompressMsg
+from plenum.common.exceptions import MissingNodeOp, RemoteNotFound, \
+    InvalidNodeMsg
 from plenum.common.has_file_storage import HasFileStorage
 from plenum.common.ledger_manager import LedgerManager
 from plenum.common.motor import Motor
@@ -28,9 +31,9 @@ from plenum.common.signer import Signer
 from plenum.common.stacked import NodeStack
 from plenum.common.startable import Status, LedgerState, Mode
 from plenum.common.txn import REPLY, POOL_LEDGER_TXNS, \
-    LEDGER_STATUS, CONSISTENCY_PROOF, CATCHUP_REP, REQACK, REQNACK
+    LEDGER_STATUS, CONSISTENCY_PROOF, CATCHUP_REP, REQACK, REQNACK, COMPRESSED
 from plenum.common.types import Reply, OP_FIELD_NAME, f, HA, \
-    LedgerStatus, TaggedTuples
+    LedgerStatus, TaggedTuples, MsgCodecs
 from plenum.common.request import Request
 from plenum.common.util import getMaxFailures, MessageProcessor, \
     checkIfMoreThanFSameItems, rawToFriendly
@@ -259,8 +262,15 @@ class Client(Motor,
         Handles single message from a node, and appends it to a queue
         :param wrappedMsg: Reply received by the client from the node
         """
-        self.inBox.append(wrappedMsg)
         msg, frm = wrappedMsg
+        if msg.get(OP_FIELD_NAME) == COMPRESSED:
+            try:
+                msg = decompressMsg(msg)
+            except InvalidNodeMsg as ex:
+                self.discard(msg, ex, logger.warning)
+                return
+            wrappedMsg = (msg, frm)
+        self.inBox.append(wrappedMsg)
         # Do not print result of transaction type `POOL_LEDGER_TXNS` on the CLI
         ledgerTxnTypes = (POOL_LEDGER_TXNS, LEDGER_STATUS, CONSISTENCY_PROOF,
                           CATCHUP_REP)
@@ -410,6 +420,9 @@ class Client(Motor,
                 self.flushMsgsPendingConnection()
         if self._ledger:
             for n in joined:
+                # Announced before asking for the pool ledger so that large
+                # catchup replies can be compressed
+                self.sendMsgCodecs(n)
                 self.sendLedgerStatus(n)
 
     def replyIfConsensus(self, identifier, reqId: int):
@@ -568,6 +581,14 @@ class Client(Motor,
                     _, _, c = self.expectingRepliesFor[key]
                     self.expectingRepliesFor[key] = (nodes, now, c + 1)
 
+    def sendMsgCodecs(self, nodeName: str):
+        """
+        Announce the compressions of messages this client can decompress to
+        the node
+        """
+        rid = self.nodestack.getRemote(nodeName).uid
+        self.nodestack.send(MsgCodecs(list(SupportedCompressions)), rid)
+
     def sendLedgerStatus(self, nodeName: str):
         ledgerStatus = LedgerStatus(0, self.ledger.size, self.ledger.root_hash)
         rid = self.nodestack.getRemote(nodeName).uid
@@ -0,0 +1,176 @@
+"""
+Buffer of the transactions received in catchup replies which cannot be
+applied to the ledger yet.
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class BufferedReply:
+    """
+    The transactions of a catchup reply not yet applied to the ledger, with
+    contiguous sequence numbers, along with the node which sent them and the
+    consistency proof from the last of them to the size the ledger is being
+    caught up to.
+    """
+
+    def __init__(self, frm: str, txns: List[Tuple[int, Any]],
+                 consProof: List[str]):
+        self.frm = frm
+        self.txns = txns
+        self.consProof = consProof
+
+    @property
+    def start(self) -> int:
+        return self.txns[0][0]
+
+    @property
+    def end(self) -> int:
+        return self.txns[-1][0]
+
+    def trimHead(self, till: int):
+        """
+        Drop the transactions with sequence numbers till `till`. The
+        consistency proof still holds for the rest.
+        """
+        if till >= self.start:
+            self.txns = self.txns[till - self.start + 1:]
+
+    def __len__(self):
+        return len(self.txns)
+
+    def __repr__(self):
+        return "{} from {} to {}".format(self.frm, self.start, self.end)
+
+
+class CatchupReplyBuffer:
+    """
+    Transactions received in catchup replies, kept as the ranges of
+    sequence numbers of the replies. Ranges do not overlap, the part of a
+    reply already buffered or applied is dropped when it is added, and a
+    buffered reply covering the rest of it is trimmed or dropped.
+
+    The reply to apply next, the one starting right after the ledger, is
+    found with a single lookup and replies are released as soon as they are
+    applied, so receiving and applying replies takes time proportional to
+    the number of replies and not of transactions buffered.
+    """
+
+    def __init__(self):
+        # Buffered replies by the sequence number of their first transaction
+        self._byStart = {}  # type: Dict[int, BufferedReply]
+        # Sequence numbers of the first transaction of buffered replies, in
+        # order
+        self._starts = []  # type: List[int]
+        # Number of transactions buffered
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        return (self._byStart[s] for s in self._starts)
+
+    def at(self, seqNo: int) -> Optional[BufferedReply]:
+        """
+        The buffered reply whose first transaction has sequence number
+        `seqNo`, if any
+        """
+        return self._byStart.get(seqNo)
+
+    def covering(self, seqNo: int) -> Optional[BufferedReply]:
+        """
+        The buffered reply with the transaction with sequence number `seqNo`,
+        if any
+        """
+        i = bisect_right(self._starts, seqNo)
+        if i:
+            reply = self._byStart[self._starts[i - 1]]
+            if reply.end >= seqNo:
+                return reply
+
+    def add(self, frm: str, txns: List[Tuple[int, Any]],
+            consProof: List[str], appliedTill: int) -> Optional[BufferedReply]:
+        """
+        Buffer the transactions of a catchup reply
+
+        :param txns: transactions of the reply with their sequence numbers,
+        contiguous and in order
+        :param appliedTill: size of the ledger
+        :return: the buffered reply, None if all its transactions are
+        already applied or buffered
+        """
+        reply = BufferedReply(frm, txns, consProof)
+        reply.trimHead(appliedTill)
+        if not reply.txns:
+            return None
+        before = self.covering(reply.start)
+        if before is not None:
+            if before.end >= reply.end:
+                return None
+            reply.trimHead(before.end)
+        i = bisect_left(self._starts, reply.start)
+        while i < len(self._starts) and self._starts[i] <= reply.end:
+            other = self._byStart[self._starts[i]]
+            if other.end <= reply.end:
+                self.remove(other)
+            else:
+                self._trim(other, reply.end, i)
+                break
+        self._byStart[reply.start] = reply
+        insort(self._starts, reply.start)
+        self.size += len(reply)
+        return reply
+
+    def _trim(self, reply: BufferedReply, till: int, index: int):
+        del self._byStart[reply.start]
+        self.size -= len(reply)
+        reply.trimHead(till)
+        self.size += len(reply)
+        # The order of the replies does not change
+        self._starts[index] = reply.start
+        self._byStart[reply.start] = reply
+
+    def remove(self, reply: BufferedReply):
+        if self._byStart.get(reply.start) is not reply:
+            return
+        del self._byStart[reply.start]
+        del self._starts[bisect_left(self._starts, reply.start)]
+        self.size -= len(reply)
+
+    def release(self, appliedTill: int):
+        """
+        Drop the transactions with sequence numbers till `appliedTill`
+        """
+        while self._starts and self._starts[0] <= appliedTill:
+            reply = self._byStart[self._starts[0]]
+            if reply.end <= appliedTill:
+                self.remove(reply)
+            else:
+                self._trim(reply, appliedTill, 0)
+                break
+
+    def missing(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """
+        The ranges of sequence numbers from `start` to `end`, both inclusive,
+        of the transactions not buffered
+        """
+        gaps = []
+        nextSeqNo = start
+        for reply in self:
+            if reply.end < start:
+                continue
+            if reply.start > end:
+                break
+            if reply.start > nextSeqNo:
+                gaps.append((nextSeqNo, reply.start - 1))
+            nextSeqNo = max(nextSeqNo, reply.end + 1)
+        if nextSeqNo <= end:
+            gaps.append((nextSeqNo, end))
+        return gaps
+
+    def clear(self):
+        self._byStart.clear()
+        self._starts = []
+        self.size = 0
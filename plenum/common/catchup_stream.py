@@ -0,0 +1,233 @@
+"""
+Catchup of a ledger in fixed size chunks of transactions requested from
+several nodes, with a bounded number of chunks in flight to each node.
+"""
+
+import time
+from bisect import bisect_right, insort
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from plenum.common.log import getlogger
+from plenum.common.types import CatchupReq
+
+logger = getlogger()
+
+
+class CatchupChunk:
+    """
+    A range of transactions, `start` to `end` both inclusive, requested in
+    one catchup request
+    """
+
+    def __init__(self, start: int, end: int):
+        self.start = start
+        self.end = end
+        # Node the chunk is requested from, None if not requested or no
+        # longer awaited from the node
+        self.peer = None  # type: Optional[str]
+        self.sentAt = None  # type: Optional[float]
+        self.received = False
+        # Nodes which did not send the chunk in time
+        self.timedOutPeers = set()  # type: Set[str]
+
+    def __repr__(self):
+        return "{}-{}".format(self.start, self.end)
+
+
+class CatchupStream:
+    """
+    Catchup of a ledger from sequence number `start` to `end`, in chunks of at
+    most `chunkSize` transactions.
+
+    Each node is sent requests for at most `maxInFlight` chunks at a time, a
+    node responding more than twice as slow as the fastest node only for one.
+    Chunks are requested in order of sequence numbers so that they can be
+    applied to the ledger as they arrive, from the nodes with the lowest
+    average response time first. A chunk not received within `timeout` is
+    requested again, from another node if possible, and the node it was
+    requested from counts as slow.
+
+    Chunks are dropped once applied to the ledger, the catchup is done when
+    no chunks are left.
+    """
+
+    # Weight of the latest response time in the average response time
+    LatencyWeight = 0.3
+
+    def __init__(self, ledgerType: int, start: int, end: int,
+                 peers: List[str], chunkSize: int, maxInFlight: int,
+                 timeout: float,
+                 reqFactory: Callable[[int, int], Any]=None):
+        """
+        :param reqFactory: builds the request for the chunk of transactions
+        from the given start to end, a `CatchupReq` if None
+        """
+        self.ledgerType = ledgerType
+        self.reqFactory = reqFactory or partial(CatchupReq, ledgerType)
+        self.chunkSize = chunkSize
+        self.maxInFlight = maxInFlight
+        self.timeout = timeout
+        # Chunks by their start
+        self.chunks = {}  # type: Dict[int, CatchupChunk]
+        # Starts of the chunks in order
+        self.starts = []  # type: List[int]
+        for s in range(start, end + 1, chunkSize):
+            self.chunks[s] = CatchupChunk(s, min(s + chunkSize - 1, end))
+            self.starts.append(s)
+        # Average response time of each node, None until it responds
+        self.latencies = {peer: None for peer in peers}
+        # Number of chunks awaited from each node
+        self.inFlight = {peer: 0 for peer in peers}
+
+    @property
+    def done(self) -> bool:
+        return not self.chunks
+
+    @property
+    def peers(self) -> List[str]:
+        return list(self.latencies)
+
+    def _slots(self, peer: str, fastest: Optional[float]) -> int:
+        latency = self.latencies[peer]
+        if latency is None or fastest is None or latency <= 2 * fastest:
+            return self.maxInFlight
+        return 1
+
+    def _pickPeer(self, chunk: CatchupChunk) -> Optional[str]:
+        """
+        The fastest node which can be sent one more request, preferring the
+        nodes which have not failed to send the chunk. Nodes which have not
+        responded yet are tried first to learn how fast they are.
+        """
+        known = [l for l in self.latencies.values() if l is not None]
+        fastest = min(known) if known else None
+        free = [p for p in self.latencies
+                if self.inFlight[p] < self._slots(p, fastest)]
+        if not free:
+            return None
+        return min(free, key=lambda p: (p in chunk.timedOutPeers,
+                                        self.latencies[p] or 0,
+                                        self.inFlight[p]))
+
+    def requests(self, now: float=None) -> List[Tuple[str, CatchupReq]]:
+        """
+        Assign the chunks which are neither awaited nor received to nodes,
+        as many as the nodes can be sent
+
+        :return: the nodes to send requests to with the requests
+        """
+        now = time.perf_counter() if now is None else now
+        reqs = []
+        for start in self.starts:
+            chunk = self.chunks[start]
+            if chunk.received or chunk.peer is not None:
+                continue
+            peer = self._pickPeer(chunk)
+            if peer is None:
+                break
+            chunk.peer = peer
+            chunk.sentAt = now
+            self.inFlight[peer] += 1
+            reqs.append((peer, self.reqFactory(chunk.start, chunk.end)))
+        return reqs
+
+    def _release(self, chunk: CatchupChunk):
+        if chunk.peer is not None and chunk.peer in self.inFlight:
+            self.inFlight[chunk.peer] -= 1
+        chunk.peer = None
+
+    def _recordLatency(self, peer: str, latency: float):
+        if peer not in self.latencies:
+            return
+        avg = self.latencies[peer]
+        self.latencies[peer] = latency if avg is None else \
+            (1 - self.LatencyWeight) * avg + self.LatencyWeight * latency
+
+    def received(self, peer: str, start: int, end: int,
+                 now: float=None) -> bool:
+        """
+        Record the receipt of the transactions `start` to `end` from the
+        node. A reply with fewer transactions than the chunk, like from a node
+        whose ledger is shorter, leaves the rest of the chunk to be requested
+        again.
+
+        :return: whether the transactions were awaited, a reply for a chunk
+        already received or not requested is not
+        """
+        now = time.perf_counter() if now is None else now
+        chunk = self.chunks.get(start)
+        if chunk is None or chunk.received or end > chunk.end or \
+                (chunk.peer is None and chunk.sentAt is None):
+            return False
+        if chunk.peer == peer:
+            self._recordLatency(peer, now - chunk.sentAt)
+        self._release(chunk)
+        if end < chunk.end:
+            rest = CatchupChunk(end + 1, chunk.end)
+            self.chunks[rest.start] = rest
+            insort(self.starts, rest.start)
+            chunk.end = end
+        chunk.received = True
+        return True
+
+    def failed(self, seqNo: int):
+        """
+        The chunk with the transaction with sequence number `seqNo` could not
+        be verified, it is requested again
+        """
+        i = bisect_right(self.starts, seqNo)
+        chunk = self.chunks[self.starts[i - 1]] if i else None
+        if chunk is not None and chunk.end >= seqNo:
+            self._release(chunk)
+            chunk.received = False
+            chunk.sentAt = None
+
+    def expire(self, now: float=None) -> List[CatchupChunk]:
+        """
+        Stop awaiting the chunks requested longer than `timeout` ago so that
+        they are requested again
+
+        :return: the chunks which timed out
+        """
+        now = time.perf_counter() if now is None else now
+        expired = []
+        for chunk in self.chunks.values():
+            if chunk.peer is not None and now - chunk.sentAt > self.timeout:
+                peer = chunk.peer
+                logger.debug("catchup chunk {} of ledger {} not received "
+                             "from {} in time".
+                             format(chunk, self.ledgerType, peer))
+                chunk.timedOutPeers.add(peer)
+                self._release(chunk)
+                self._recordLatency(peer, 2 * self.timeout)
+                expired.append(chunk)
+        return expired
+
+    def applied(self, ledgerSize: int):
+        """
+        Drop the chunks whose transactions are all in the ledger
+        """
+        while self.starts and self.chunks[self.starts[0]].end <= ledgerSize:
+            chunk = self.chunks.pop(self.starts.pop(0))
+            self._release(chunk)
+
+    def addPeer(self, peer: str):
+        """
+        Request chunks from the node too, like a node which connected after
+        the catchup started or reconnected
+        """
+        if peer not in self.latencies:
+            self.latencies[peer] = None
+            self.inFlight[peer] = 0
+
+    def removePeer(self, peer: str):
+        """
+        Stop requesting chunks from the node, the chunks awaited from it are
+        requested from other nodes
+        """
+        for chunk in self.chunks.values():
+            if chunk.peer == peer:
+                self._release(chunk)
+        self.latencies.pop(peer, None)
+        self.inFlight.pop(peer, None)
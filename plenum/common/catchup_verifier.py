@@ -0,0 +1,170 @@
+"""
+Verification of the transactions received in catchup replies and their
+addition to the ledger in bulk.
+"""
+
+import io
+import os
+from base64 import b64decode
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import Any, List, Optional, Tuple
+
+from plenum.common.catchup_reply_buffer import BufferedReply
+from plenum.common.log import getlogger
+
+logger = getlogger()
+
+
+def hashLeaves(serializer, hasher, txns: List[Tuple[int, Any]]) \
+        -> List[bytes]:
+    """
+    Serialize the transactions of a reply as merkle leaves, as the ledger
+    does, and hash them. Runs in a worker process when replies are verified
+    in a pool.
+    """
+    return [hasher.hash_leaf(serializer.serialize(txn)) for _, txn in txns]
+
+
+def appendLeafHash(hasher, size: int, hashes: List[bytes], leafHash: bytes):
+    """
+    Append the hash of a leaf to the hashes of the full subtrees, largest
+    first, of a merkle tree of `size` leaves, as a compact merkle tree does
+    """
+    while size & 1:
+        leafHash = hasher.hash_children(hashes.pop(), leafHash)
+        size >>= 1
+    hashes.append(leafHash)
+
+
+def rootHash(hasher, hashes: List[bytes]) -> bytes:
+    """
+    Root of a merkle tree from the hashes of its full subtrees, largest first
+    """
+    if not hashes:
+        return hasher.hash_empty()
+    root = hashes[-1]
+    for h in reversed(hashes[:-1]):
+        root = hasher.hash_children(h, root)
+    return root
+
+
+class CatchupVerifier:
+    """
+    Verifies catchup replies following each other against the consistency
+    proof of the size and root the ledger is caught up to.
+
+    The transactions of the replies are serialized and their merkle leaves
+    hashed in a pool of `workers` processes, a reply per task, since the
+    leaves of a reply do not depend on the ones before it. The replies are
+    then verified in order by adding the hashes of their leaves to the
+    hashes of the ledger's merkle tree and checking the consistency proof of
+    each. With less than 2 workers, or a single reply, the leaves are hashed
+    by the node's process.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool = None  # type: Optional[ProcessPoolExecutor]
+
+    def _hashLeaves(self, ledger, replies: List[BufferedReply]) \
+            -> List[List[bytes]]:
+        serializer, hasher = ledger.leafSerializer, ledger.hasher
+        if self.workers < 2 or len(replies) < 2:
+            return [hashLeaves(serializer, hasher, r.txns) for r in replies]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            futures = [self._pool.submit(hashLeaves, serializer, hasher,
+                                         r.txns) for r in replies]
+            return [fut.result() for fut in futures]
+        except Exception as ex:
+            logger.warning("could not hash the leaves of {} catchup replies "
+                           "in the pool, hashing them in process: {}".
+                           format(len(replies), ex))
+            return [hashLeaves(serializer, hasher, r.txns) for r in replies]
+
+    def verify(self, ledger, merkleVerifier, replies: List[BufferedReply],
+               finalSize: int, finalRoot: str) -> int:
+        """
+        Verify the replies, the first following the ledger and each following
+        the one before it. The ledger's merkle tree is left as it is.
+
+        :param merkleVerifier: verifier of consistency proofs of the ledger
+        :param finalSize: size the ledger is caught up to
+        :param finalRoot: base64 encoded merkle root of the ledger of that size
+        :return: the number of replies verified, the reply at that index, if
+        any, could not be verified
+        """
+        hasher = ledger.hasher
+        size = ledger.tree.tree_size
+        hashes = list(ledger.tree.hashes)
+        leafHashes = self._hashLeaves(ledger, replies)
+        for i, (reply, replyHashes) in enumerate(zip(replies, leafHashes)):
+            for leafHash in replyHashes:
+                appendLeafHash(hasher, size, hashes, leafHash)
+                size += 1
+            try:
+                verified = merkleVerifier.verify_tree_consistency(
+                    size, finalSize, rootHash(hasher, hashes),
+                    b64decode(finalRoot),
+                    [b64decode(p) for p in reply.consProof])
+            except Exception as ex:
+                logger.info("could not verify catchup reply {} since {}".
+                            format(reply, ex))
+                verified = False
+            if not verified:
+                return i
+        return len(replies)
+
+    def stop(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+
+
+# Attributes of a file hash store holding the stores of its leaves and of
+# its nodes, each kept in a file of its own
+HASH_STORE_FILES = ("leavesFile", "nodesFile")
+
+# Attribute of a file store holding its open file
+STORE_FILE = "dbFile"
+
+
+def durableStores(ledger) -> List[Any]:
+    """
+    The stores of the ledger, of its transactions and merkle tree hashes,
+    which sync every write to disk
+    """
+    hashStore = getattr(getattr(ledger, "tree", None), "hashStore", None)
+    stores = [getattr(ledger, "_transactionLog", None), hashStore] + \
+        [getattr(hashStore, a, None) for a in HASH_STORE_FILES]
+    return [s for s in stores
+            if s is not None and getattr(s, "ensureDurability", False) is True]
+
+
+def syncStore(store):
+    """
+    Write to disk what is written to the file of the store
+    """
+    file = getattr(store, STORE_FILE, None)
+    if isinstance(file, io.IOBase) and not file.closed and file.writable():
+        file.flush()
+        os.fsync(file.fileno())
+
+
+@contextmanager
+def deferredDurability(ledger):
+    """
+    Let the ledger's stores which sync every write to disk write without
+    syncing inside the context, and sync them once when leaving it
+    """
+    stores = durableStores(ledger)
+    for store in stores:
+        store.ensureDurability = False
+    try:
+        yield
+    finally:
+        for store in stores:
+            store.ensureDurability = True
+            syncStore(store)
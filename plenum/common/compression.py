@@ -0,0 +1,81 @@
+"""
+Compression of large messages, like catchup replies, sent to nodes and
+clients which announced that they can decompress them.
+"""
+
+import json
+import zlib
+from base64 import b64encode, b64decode
+from binascii import Error as BinasciiError
+from typing import Any, Dict, Mapping, Union
+
+from plenum.common.config_util import getConfig
+from plenum.common.exceptions import InvalidNodeMsg
+from plenum.common.txn import COMPRESSED
+from plenum.common.types import Compressed, OP_FIELD_NAME, TaggedTupleBase, \
+    f, CatchupRep, ConsistencyProof, PoolLedgerTxns, SnapshotChunk
+
+ZLIB = "zlib"
+
+# Compressions a message can be decompressed from, announced as codecs
+SupportedCompressions = (ZLIB, )
+
+# Types of the messages compressed when big enough, if compression of ledger
+# messages is enabled
+CompressibleMsgTypes = (CatchupRep, ConsistencyProof, PoolLedgerTxns,
+                        SnapshotChunk)
+
+
+def compressMsg(msg: TaggedTupleBase, threshold: int=0,
+                level: int=None) -> Any:
+    """
+    Return the message compressed with zlib if its JSON encoding is bigger
+    than `threshold` bytes, the message as it is otherwise.
+
+    :param msg: the message to compress
+    :param threshold: size below which the message is not compressed
+    :param level: zlib compression level, the configured one if None
+    """
+    encoded = json.dumps(msg.melted(), separators=(',', ':')).encode()
+    if len(encoded) < threshold:
+        return msg
+    if level is None:
+        level = getConfig().CompressionLevel
+    return Compressed(ZLIB, b64encode(zlib.compress(encoded, level)).decode())
+
+
+def decompressMsg(msg: Union[Compressed, Mapping], maxSize: int=None) -> Dict:
+    """
+    Return the dictionary form of a compressed message.
+
+    :param msg: the compressed message or its dictionary form
+    :param maxSize: maximum size of the decompressed message, the configured
+    one if None
+    :raises InvalidNodeMsg: if the message cannot be decompressed or its
+    decompressed form is not a single uncompressed message
+    """
+    if isinstance(msg, Mapping):
+        compression = msg.get(f.COMPRESSION.nm)
+        data = msg.get(f.COMPRESSED_DATA.nm)
+    else:
+        compression, data = msg
+    if compression != ZLIB:
+        raise InvalidNodeMsg("unknown compression {}".format(compression))
+    if maxSize is None:
+        maxSize = getConfig().MaxDecompressedMsgSize
+    try:
+        decompressor = zlib.decompressobj()
+        data = decompressor.decompress(
+            b64decode(data), maxSize)
+        if decompressor.unconsumed_tail:
+            raise InvalidNodeMsg("decompressed message is bigger than {} "
+                                 "bytes".format(maxSize))
+        decompressed = json.loads(data.decode())
+    except (zlib.error, BinasciiError, UnicodeDecodeError, ValueError,
+            TypeError) as ex:
+        raise InvalidNodeMsg("could not decompress message: {}".
+                             format(ex)) from ex
+    if not isinstance(decompressed, dict) or \
+            decompressed.get(OP_FIELD_NAME) == COMPRESSED:
+        raise InvalidNodeMsg("compressed message is not a message")
+    return decompressed
@@ -160,6 +160,17 @@ class InvalidNodeMsgType(InvalidNodeMsg):
     pass
 
 
+class InvalidNodeMsgField(InvalidNodeMsg):
+    """
+    A field of a node message has a value of the wrong type. `msg` is the
+    message with the field as received.
+    """
+    def __init__(self, msg, reason, *args, **kwargs):
+        super().__init__(reason, *args, **kwargs)
+        self.msg = msg
+        self.reason = reason
+
+
 class InvalidClientRequest(InvalidClientMessageException):
     pass
 
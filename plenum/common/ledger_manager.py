@@ -1,9 +1,7 @@
-import heapq
 import operator
-from base64 import b64encode, b64decode
+from base64 import b64encode
 from collections import Callable
 from collections import deque
-from copy import copy
 from functools import partial
 from random import shuffle
 from typing import Any, List, Dict, Set, Tuple
@@ -15,13 +13,20 @@ from ledger.ledger import Ledger
 from ledger.merkle_verifier import MerkleVerifier
 from ledger.util import F
 
+from plenum.common.catchup_reply_buffer import CatchupReplyBuffer
+from plenum.common.catchup_stream import CatchupStream
+from plenum.common.catchup_verifier import CatchupVerifier, \
+    deferredDurability
+from plenum.common.compression import CompressibleMsgTypes, ZLIB, \
+    compressMsg
 from plenum.common.exceptions import RemoteNotFound
 from plenum.common.startable import LedgerState
 from plenum.common.types import LedgerStatus, CatchupRep, ConsistencyProof, f, \
-    CatchupReq, ConsProofRequest
+    CatchupReq, ConsProofRequest, SnapshotReq, SnapshotChunk
 from plenum.common.util import getMaxFailures
 from plenum.common.config_util import getConfig
 from plenum.common.log import getlogger
+from plenum.persistence.ledger_offset_index import LedgerOffsetIndex
 from plenum.server.has_action_queue import HasActionQueue
 
 logger = getlogger()
@@ -60,14 +65,10 @@ class LedgerManager(HasActionQueue):
 
         self.catchUpTill = {}
 
-        # Catchup replies that need to be applied to the ledger. First element
-        # of the list is a list of transactions that need to be applied to the
-        # pool transaction ledger and the second element is the list of
-        # transactions that need to be applied to the domain transaction ledger
-        self.receivedCatchUpReplies = {}    # type: Dict[int, List]
-
-        self.recvdCatchupRepliesFrm = {}
-        # type: Dict[int, Dict[str, List[CatchupRep]]]
+        # Transactions of catchup replies that need to be applied to each
+        # ledger
+        self.receivedCatchUpReplies = {}
+        # type: Dict[int, CatchupReplyBuffer]
 
         # Tracks the beginning of consistency proof timer. Timer starts when the
         #  node gets f+1 consistency proofs. If the node is not able to begin
@@ -83,6 +84,19 @@ class LedgerManager(HasActionQueue):
         self.catchupReplyTimers = {}
         # type: Dict[int, Optional[float]]
 
+        self.catchupVerifier = CatchupVerifier(
+            self.config.CatchupVerificationWorkers)
+
+        # Chunks of transactions requested and received in the streaming
+        # catchup of each ledger, None when not catching up that way
+        self.catchupStreams = {}
+        # type: Dict[int, Optional[CatchupStream]]
+
+        # Sequence number till which each ledger is being caught up from a
+        # snapshot, None when not fetching a snapshot of the ledger
+        self.snapshotTill = {}
+        # type: Dict[int, Optional[int]]
+
     def __repr__(self):
         return self.owner.name
 
@@ -108,16 +122,20 @@ class LedgerManager(HasActionQueue):
             "preCatchupCompleteClbk": preCatchupCompleteClbk,
             "postCatchupCompleteClbk": postCatchupCompleteClbk,
             "postTxnAddedToLedgerClbk": postTxnAddedToLedgerClbk,
-            "verifier": MerkleVerifier(ledger.hasher)
+            "verifier": MerkleVerifier(ledger.hasher),
+            # Index of the offsets of transactions in the ledger's file, built
+            # when first needed, False if the ledger cannot be indexed
+            "offsetIndex": None
         }
         self.stashedLedgerStatuses[typ] = deque()
         self.ledgerStatusOk[typ] = set()
         self.recvdConsistencyProofs[typ] = {}
         self.catchUpTill[typ] = None
-        self.receivedCatchUpReplies[typ] = []
-        self.recvdCatchupRepliesFrm[typ] = {}
+        self.receivedCatchUpReplies[typ] = CatchupReplyBuffer()
         self.consistencyProofsTimers[typ] = None
         self.catchupReplyTimers[typ] = None
+        self.catchupStreams[typ] = None
+        self.snapshotTill[typ] = None
 
     def checkIfCPsNeeded(self, ledgerType):
         if self.consistencyProofsTimers[ledgerType] is not None:
@@ -142,12 +160,11 @@ class LedgerManager(HasActionQueue):
     def checkIfTxnsNeeded(self, ledgerType):
         if self.catchupReplyTimers[ledgerType] is not None:
             catchupTill = self.catchUpTill[ledgerType]
-            start, end = getattr(catchupTill, f.SEQ_NO_START.nm), \
-                         getattr(catchupTill, f.SEQ_NO_END.nm)
+            end = getattr(catchupTill, f.SEQ_NO_END.nm)
             ledger = self.ledgers[ledgerType]["ledger"]
-            catchUpReplies = self.receivedCatchUpReplies[ledgerType]
-            totalMissing = (end - ledger.size) - len(catchUpReplies)
-
+            gaps = self.receivedCatchUpReplies[ledgerType].missing(
+                ledger.size + 1, end)
+            totalMissing = sum(to - frm + 1 for frm, to in gaps)
             if totalMissing:
                 logger.debug(
                     "{} requesting {} missing transactions after timeout".
@@ -171,8 +188,6 @@ class LedgerManager(HasActionQueue):
                 shuffle(eligibleNodes)
                 batchSize = math.ceil(totalMissing/len(eligibleNodes))
                 cReqs = []
-                lastSeenSeqNo = ledger.size
-                leftMissing = totalMissing
 
                 def addReqsForMissing(frm, to):
                     # Add Catchup requests for missing transactions. `frm` and
@@ -191,38 +206,8 @@ class LedgerManager(HasActionQueue):
                         cReqs.append(req)
                     return missing
 
-                for seqNo, txn in catchUpReplies:
-                    if (seqNo - lastSeenSeqNo) != 1:
-                        missing = addReqsForMissing(lastSeenSeqNo+1, seqNo-1)
-                        leftMissing -= missing
-                    lastSeenSeqNo = seqNo
-
-                # If still missing some transactions from request has not been
-                # sent then either `catchUpReplies` was empty or it did not have
-                #  transactions till `end`
-                if leftMissing > 0:
-                    logger.debug("{} still missing {} transactions after "
-                                 "looking at receivedCatchUpReplies".
-                                 format(self, leftMissing))
-                    # `catchUpReplies` was empty
-                    if lastSeenSeqNo == ledger.size:
-                        missing = addReqsForMissing(ledger.size+1, end)
-                        leftMissing -= missing
-                    # did not have transactions till `end`
-                    elif lastSeenSeqNo != end:
-                        missing = addReqsForMissing(lastSeenSeqNo + 1, end)
-                        leftMissing -= missing
-                    else:
-                        logger.error("{} still missing {} transactions. "
-                                     "Something happened which was not thought "
-                                     "of. {} {} {}"
-                                     .format(self, leftMissing, start, end,
-                                             lastSeenSeqNo))
-                    if leftMissing:
-                        logger.error(
-                            "{} still missing {} transactions. {} {} {}"
-                                .format(self, leftMissing, start, end,
-                                        lastSeenSeqNo))
+                for frm, to in gaps:
+                    addReqsForMissing(frm, to)
 
                 numElgNodes = len(eligibleNodes)
                 for i, req in enumerate(cReqs):
@@ -370,8 +355,7 @@ class LedgerManager(HasActionQueue):
                          " till {}".format(self, end, ledger.size))
             end = ledger.size
 
-        # TODO: This is very inefficient for long ledgers
-        txns = ledger.getAllTxn(start, end)
+        txns = self.getTxnRange(getattr(req, f.LEDGER_TYPE.nm), start, end)
 
         logger.debug("node {} requested catchup for {} from {} to {}"
                      .format(frm, end - start, start, end))
@@ -383,6 +367,65 @@ class LedgerManager(HasActionQueue):
         self.sendTo(msg=CatchupRep(getattr(req, f.LEDGER_TYPE.nm), txns,
                                    consProof), to=frm)
 
+    def getOffsetIndex(self, ledgerType: int) -> Optional[LedgerOffsetIndex]:
+        """
+        Return the offset index of the ledger, built when first needed, if
+        the ledger is stored in a text file and `IndexLedgerOffsets` is set
+        """
+        ledgerInfo = self.ledgers[ledgerType]
+        if ledgerInfo["offsetIndex"] is None and \
+                self.config.IndexLedgerOffsets:
+            ledgerInfo["offsetIndex"] = \
+                LedgerOffsetIndex.forLedger(ledgerInfo["ledger"]) or False
+        return ledgerInfo["offsetIndex"] or None
+
+    def getTxnRange(self, ledgerType: int, start: int, end: int) -> Dict:
+        """
+        Return the transactions of the ledger with sequence numbers from
+        `start` to `end`, both inclusive. They are read through the offset
+        index of the ledger if it has one, otherwise the ledger is read from
+        its beginning.
+        """
+        index = self.getOffsetIndex(ledgerType)
+        if index:
+            try:
+                return index.getRange(start, end)
+            except OSError as ex:
+                logger.warning("{} could not read transactions {} to {} "
+                               "through the offset index: {}".
+                               format(self, start, end, ex))
+        return self.ledgers[ledgerType]["ledger"].getAllTxn(start, end)
+
+    def getSerializedTxnRange(self, ledgerType: int, start: int,
+                              end: int) -> List[str]:
+        """
+        Return the transactions of the ledger with sequence numbers from
+        `start` to `end`, both inclusive, serialized. They are read as stored
+        through the offset index of the ledger if it has one, otherwise they
+        are read from the ledger and serialized.
+        """
+        index = self.getOffsetIndex(ledgerType)
+        if index:
+            try:
+                return index.getSerializedRange(start, end)
+            except OSError as ex:
+                logger.warning("{} could not read transactions {} to {} "
+                               "through the offset index: {}".
+                               format(self, start, end, ex))
+        ledger = self.ledgers[ledgerType]["ledger"]
+        return [ledger.serializeLeaf(txn).decode() for txn in
+                ledger.getAllTxn(start, end).values()]
+
+    def closeOffsetIndexes(self):
+        """
+        Close the offset indexes of the ledgers, they are opened again when
+        next needed
+        """
+        for ledgerInfo in self.ledgers.values():
+            if ledgerInfo["offsetIndex"]:
+                ledgerInfo["offsetIndex"].close()
+            ledgerInfo["offsetIndex"] = None
+
     def processCatchupRep(self, rep: CatchupRep, frm: str):
         logger.debug("{} received catchup reply from {}: {}".
                      format(self, frm, rep))
@@ -393,132 +436,93 @@ class LedgerManager(HasActionQueue):
         logger.debug("{} found {} transactions in the catchup from {}"
                      .format(self, txnsNum, frm))
         if txns:
-            ledger = self.getLedgerForMsg(rep)
-            if frm not in self.recvdCatchupRepliesFrm[ledgerType]:
-                self.recvdCatchupRepliesFrm[ledgerType][frm] = []
-            self.recvdCatchupRepliesFrm[ledgerType][frm].append(rep)
-            catchUpReplies = self.receivedCatchUpReplies[ledgerType]
-            # Creating a list of txns sorted on the basis of sequence
-            # numbers
-            logger.debug("{} merging all received catchups".format(self))
-            catchUpReplies = list(heapq.merge(catchUpReplies, txns,
-                                              key=operator.itemgetter(0)))
-            logger.debug(
-                "{} merged catchups, there are {} of them now, from {} to {}"
-                .format(self, len(catchUpReplies), catchUpReplies[0][0],
-                        catchUpReplies[-1][0]))
-
-            numProcessed = self._processCatchupReplies(ledgerType, ledger,
-                                                       catchUpReplies)
-            logger.debug(
-                "{} processed {} catchup replies with sequence numbers {}"
-                    .format(self, numProcessed, [seqNo for seqNo, _ in
-                                                 catchUpReplies[
-                                                 :numProcessed]]))
-            self.receivedCatchUpReplies[ledgerType] = \
-                catchUpReplies[numProcessed:]
-            if getattr(self.catchUpTill[ledgerType], f.SEQ_NO_END.nm) == \
-                    ledger.size:
-                self.catchUpTill[ledgerType] = None
-                self.catchupCompleted(ledgerType)
-
-    def _processCatchupReplies(self, ledgerType, ledger: Ledger,
-                               catchUpReplies: List):
-        # Removing transactions for sequence numbers are already
-        # present in the ledger
-        numProcessed = sum(1 for s, _ in catchUpReplies if s <= ledger.size)
-        catchUpReplies = catchUpReplies[numProcessed:]
-        if numProcessed:
-            logger.debug("{} found {} already processed transactions in the "
-                         "catchup replies".format(self, numProcessed))
-        if catchUpReplies:
-            seqNo = catchUpReplies[0][0]
-            if seqNo - ledger.seqNo == 1:
-                result, nodeName, toBeProcessed = self.hasValidCatchupReplies(
-                    ledgerType, ledger, seqNo, catchUpReplies)
-                if result:
-                    for _, txn in catchUpReplies[:toBeProcessed]:
-                        merkleInfo = ledger.add(txn)
-                        txn[F.seqNo.name] = merkleInfo[F.seqNo.name]
-                        self.ledgers[ledgerType]["postTxnAddedToLedgerClbk"](
-                            ledgerType, txn)
-                    self._removePrcdCatchupReply(ledgerType, nodeName, seqNo)
-                    return numProcessed + toBeProcessed + \
-                        self._processCatchupReplies(ledgerType, ledger,
-                                                catchUpReplies[toBeProcessed:])
-                else:
-                    if self.ownedByNode:
-                        self.owner.blacklistNode(nodeName,
-                                                 reason="Sent transactions "
-                                                        "that could not be "
-                                                        "verified")
-                        self._removePrcdCatchupReply(ledgerType, nodeName,
-                                                     seqNo)
-                        # Invalid transactions have to be discarded so letting
-                        # the caller know how many txns have to removed from
-                        # `self.receivedCatchUpReplies`
-                        return numProcessed + toBeProcessed
-        return numProcessed
-
-    def _removePrcdCatchupReply(self, ledgerType, node, seqNo):
-        for i, rep in enumerate(self.recvdCatchupRepliesFrm[ledgerType][node]):
-            if str(seqNo) in getattr(rep, f.TXNS.nm):
-                break
-        self.recvdCatchupRepliesFrm[ledgerType][node].pop(i)
-
-    def hasValidCatchupReplies(self, ledgerType, ledger, seqNo, catchUpReplies):
-        # Here seqNo has to be the seqNo of first transaction of
-        # `catchupReplies`
-
-        # Creating a temporary tree which will be used to verify consistency
-        # proof, by inserting transactions. Duplicating a merkle tree is not
-        # expensive since we are using a compact merkle tree.
-        tempTree = copy(ledger.tree)
-
-        # Get the batch of transactions in the catchup reply which has sequence
-        # number `seqNo`
-        nodeName, catchupReply = self._getCatchupReplyForSeqNo(ledgerType,
-                                                               seqNo)
-
-        txns = getattr(catchupReply, f.TXNS.nm)
-        for s, txn in catchUpReplies[:len(txns)]:
-            # Add only those transaction in the temporary tree from the above
-            # batch
-            # Transfers of odcits in RAET converts integer keys to string
-            if str(s) in txns:
-                tempTree.append(ledger.serializeLeaf(txn))
-
-        proof = getattr(catchupReply, f.CONS_PROOF.nm)
-        verifier = self.ledgers[ledgerType]["verifier"]
+            self._processCatchupTxns(ledgerType, rep, txns,
+                                     getattr(rep, f.CONS_PROOF.nm), frm)
+
+    def _processCatchupTxns(self, ledgerType: int, msg: Any,
+                            txns: List[Tuple[int, Any]], consProof: List[str],
+                            frm: str):
+        """
+        Buffer the transactions received from a node, in a catchup reply or
+        a snapshot chunk, and add to the ledger those that can be
+        """
+        stream = self.catchupStreams[ledgerType]
+        if stream is not None and \
+                not stream.received(frm, txns[0][0], txns[-1][0]):
+            self.discard(msg, reason="{} did not request transactions from"
+                                     " {} to {} or already has them".
+                         format(self, txns[0][0], txns[-1][0]),
+                         logMethod=logger.debug)
+            return
+        ledger = self.ledgers[ledgerType]["ledger"]
+        buffered = self.receivedCatchUpReplies[ledgerType].add(
+            frm, txns, consProof, ledger.size)
+        if buffered is None:
+            self.discard(msg, reason="{} already has transactions from {} "
+                                     "to {}".format(self, txns[0][0],
+                                                    txns[-1][0]),
+                         logMethod=logger.debug)
+            return
+        numProcessed = self._processCatchupReplies(ledgerType, ledger)
+        logger.debug("{} processed {} transactions from catchup replies, "
+                     "ledger size is {} now".
+                     format(self, numProcessed, ledger.size))
+        if getattr(self.catchUpTill[ledgerType], f.SEQ_NO_END.nm) == \
+                ledger.size:
+            self.catchUpTill[ledgerType] = None
+            self.catchupCompleted(ledgerType)
+        elif stream is not None:
+            stream.applied(ledger.size)
+            if stream.done and self.snapshotTill[ledgerType] is not None:
+                self.snapshotCompleted(ledgerType)
+            else:
+                self.sendCatchupChunkReqs(ledgerType)
+
+    def _processCatchupReplies(self, ledgerType, ledger: Ledger) -> int:
+        """
+        Verify the buffered catchup replies which follow the ledger and add
+        the transactions of those verified to the ledger in one batch, synced
+        to disk once. A reply which cannot be verified is discarded, along
+        with the node which sent it.
+
+        :return: the number of transactions added
+        """
+        replies = self.receivedCatchUpReplies[ledgerType]
+        batch = []
+        reply = replies.at(ledger.size + 1)
+        while reply is not None:
+            batch.append(reply)
+            reply = replies.at(reply.end + 1)
+        if not batch:
+            return 0
         cp = self.catchUpTill[ledgerType]
-        finalSize = getattr(cp, f.SEQ_NO_END.nm)
-        finalMTH = getattr(cp, f.NEW_MERKLE_ROOT.nm)
-        try:
-            logger.debug("{} verifying proof for {}, {}, {}, {}, {}".
-                         format(self, tempTree.tree_size, finalSize,
-                                tempTree.root_hash, b64decode(finalMTH),
-                                [b64decode(p) for p in proof]))
-            verified = verifier.verify_tree_consistency(tempTree.tree_size,
-                                                        finalSize,
-                                                        tempTree.root_hash,
-                                                        b64decode(finalMTH),
-                                                        [b64decode(p) for p in
-                                                         proof])
-        except Exception as ex:
-            logger.info("{} could not verify catchup reply {} since {}".
-                        format(self, catchupReply, ex))
-            verified = False
-        return bool(verified), nodeName, len(txns)
-
-    def _getCatchupReplyForSeqNo(self, ledgerType, seqNo):
-        # This is inefficient if we have large number of nodes but since
-        # number of node are always between 60-120, this is ok.
-        for k, catchupReps in self.recvdCatchupRepliesFrm[ledgerType].items():
-            for rep in catchupReps:
-                txns = getattr(rep, f.TXNS.nm)
-                # Transfers of odcits in RAET converts integer keys to string
-                if str(seqNo) in txns:
-                    return k, rep
+        numVerified = self.catchupVerifier.verify(
+            ledger, self.ledgers[ledgerType]["verifier"], batch,
+            getattr(cp, f.SEQ_NO_END.nm), getattr(cp, f.NEW_MERKLE_ROOT.nm))
+        numProcessed = 0
+        clbk = self.ledgers[ledgerType]["postTxnAddedToLedgerClbk"]
+        with deferredDurability(ledger):
+            for reply in batch[:numVerified]:
+                for _, txn in reply.txns:
+                    merkleInfo = ledger.add(txn)
+                    txn[F.seqNo.name] = merkleInfo[F.seqNo.name]
+                    clbk(ledgerType, txn)
+                numProcessed += len(reply)
+        replies.release(ledger.size)
+        if numVerified < len(batch):
+            # Invalid transactions are discarded to be requested again
+            reply = batch[numVerified]
+            replies.remove(reply)
+            stream = self.catchupStreams[ledgerType]
+            if stream is not None:
+                stream.failed(reply.start)
+                stream.removePeer(reply.frm)
+            if self.ownedByNode:
+                self.owner.blacklistNode(reply.frm,
+                                         reason="Sent transactions "
+                                                "that could not be "
+                                                "verified")
+        return numProcessed
 
     def processConsistencyProofReq(self, req: ConsProofRequest, frm: str):
         logger.debug("{} received consistency proof request: {} from {}".
@@ -668,29 +672,229 @@ class LedgerManager(HasActionQueue):
         if proof is not None:
             self.ledgers[ledgerType]["state"] = LedgerState.syncing
             p = ConsistencyProof(*proof)
-            rids = [self.nodestack.getRemote(nm).uid for nm in
-                    self.nodestack.conns]
-            reqs = self.getCatchupReqs(p)
-            for req in zip(reqs, rids):
-                self.send(*req)
             self.catchUpTill[ledgerType] = p
-            if reqs:
-                self.catchupReplyTimers[ledgerType] = time.perf_counter()
-                timeout = self._getCatchupTimeout(
-                    len(reqs),
-                    getattr(reqs[0], f.SEQ_NO_END.nm) -
-                    getattr(reqs[0], f.SEQ_NO_START.nm) + 1)
-                self._schedule(partial(self.checkIfTxnsNeeded, ledgerType),
-                               timeout)
+            if self.needsSnapshot(ledgerType, p):
+                self.startSnapshot(ledgerType, p)
+            else:
+                self.requestTxns(ledgerType, p)
         else:
             self.catchupCompleted(ledgerType)
 
+    def requestTxns(self, ledgerType: int, consProof: ConsistencyProof):
+        """
+        Request the transactions the ledger is missing till the end of the
+        consistency proof
+        """
+        if self.config.StreamingCatchup:
+            self.startCatchupStream(ledgerType, consProof)
+            return
+        rids = [self.nodestack.getRemote(nm).uid for nm in
+                self.nodestack.conns]
+        reqs = self.getCatchupReqs(consProof)
+        for req in zip(reqs, rids):
+            self.send(*req)
+        if reqs:
+            self.catchupReplyTimers[ledgerType] = time.perf_counter()
+            timeout = self._getCatchupTimeout(
+                len(reqs),
+                getattr(reqs[0], f.SEQ_NO_END.nm) -
+                getattr(reqs[0], f.SEQ_NO_START.nm) + 1)
+            self._schedule(partial(self.checkIfTxnsNeeded, ledgerType),
+                           timeout)
+
+    def needsSnapshot(self, ledgerType: int,
+                      consProof: ConsistencyProof) -> bool:
+        """
+        Whether the ledger is far enough behind the end of the consistency
+        proof to be caught up from a snapshot first
+        """
+        threshold = self.config.SnapshotCatchupThreshold
+        if not self.ownedByNode or threshold is None:
+            return False
+        behind = getattr(consProof, f.SEQ_NO_END.nm) - \
+            self.ledgers[ledgerType]["ledger"].size
+        return behind > max(threshold, self.config.SnapshotChunkSize)
+
+    def startSnapshot(self, ledgerType: int, consProof: ConsistencyProof):
+        """
+        Catch up the ledger by fetching chunks of the transactions as stored
+        in the ledgers of the connected nodes, each chunk verified against
+        the root of the consistency proof. Only whole chunks are fetched
+        this way, the transactions after them are requested as usual once
+        the snapshot is fetched.
+        """
+        ledger = self.ledgers[ledgerType]["ledger"]
+        end = getattr(consProof, f.SEQ_NO_END.nm)
+        chunkSize = self.config.SnapshotChunkSize
+        till = ledger.size + (end - ledger.size) // chunkSize * chunkSize
+        logger.info("{} fetching transactions {} to {} of ledger {} from a "
+                    "snapshot".format(self, ledger.size + 1, till, ledgerType))
+        self.snapshotTill[ledgerType] = till
+        peers = self.catchupPeers()
+        stream = CatchupStream(
+            ledgerType, ledger.size + 1, till, peers, chunkSize,
+            self.config.SnapshotChunksInFlight,
+            self.config.SnapshotChunkTimeout,
+            reqFactory=lambda s, e: SnapshotReq(ledgerType, s, e, end))
+        self.catchupStreams[ledgerType] = stream
+        self.sendCatchupChunkReqs(ledgerType)
+        self._schedule(partial(self.checkCatchupStream, ledgerType, stream),
+                       stream.timeout)
+
+    def snapshotCompleted(self, ledgerType: int):
+        """
+        Request the transactions after the snapshot as usual
+        """
+        ledger = self.ledgers[ledgerType]["ledger"]
+        logger.info("{} fetched snapshot of ledger {} till {}".
+                    format(self, ledgerType, ledger.size))
+        self.snapshotTill[ledgerType] = None
+        self.catchupStreams[ledgerType] = None
+        consProof = self.catchUpTill[ledgerType]._replace(
+            **{f.SEQ_NO_START.nm: ledger.size})
+        self.catchUpTill[ledgerType] = consProof
+        self.requestTxns(ledgerType, consProof)
+
+    def processSnapshotReq(self, req: SnapshotReq, frm: str):
+        logger.debug("{} received snapshot request: {} from {}".
+                     format(self, req, frm))
+        ledgerType = getattr(req, f.LEDGER_TYPE.nm)
+        start, end, size = getattr(req, f.SEQ_NO_START.nm), \
+            getattr(req, f.SEQ_NO_END.nm), getattr(req, f.LEDGER_SIZE.nm)
+        ledger = self.getLedgerForMsg(req)
+        if ledger is None:
+            return
+        if not 1 <= start <= end <= size:
+            self.discard(req, reason="Invalid range", logMethod=logger.warn)
+            return
+        if size > ledger.size:
+            self.discard(req, reason="{} not able to service since ledger size "
+                                     "is {}".format(self, ledger.size),
+                         logMethod=logger.debug)
+            return
+        txns = self.getSerializedTxnRange(ledgerType, start, end)
+        consProof = [b64encode(p).decode() for p in
+                     ledger.tree.consistency_proof(end, size)]
+        self.sendTo(msg=SnapshotChunk(ledgerType, start, end, "\n".join(txns),
+                                      consProof), to=frm)
+
+    def processSnapshotChunk(self, chunk: SnapshotChunk, frm: str):
+        logger.debug("{} received snapshot chunk of transactions {} to {} "
+                     "from {}".format(self, getattr(chunk, f.SEQ_NO_START.nm),
+                                      getattr(chunk, f.SEQ_NO_END.nm), frm))
+        ledgerType = getattr(chunk, f.LEDGER_TYPE.nm)
+        if self.snapshotTill.get(ledgerType) is None:
+            self.discard(chunk, reason="{} is not fetching a snapshot".
+                         format(self), logMethod=logger.debug)
+            return
+        txns = self._snapshotTxns(chunk)
+        if txns:
+            self._processCatchupTxns(ledgerType, chunk, txns,
+                                     getattr(chunk, f.CONS_PROOF.nm), frm)
+
+    def _snapshotTxns(self, chunk: SnapshotChunk) \
+            -> Optional[List[Tuple[int, Any]]]:
+        """
+        The transactions of a snapshot chunk with their sequence numbers,
+        None if the chunk is malformed
+        """
+        start, end = getattr(chunk, f.SEQ_NO_START.nm), \
+            getattr(chunk, f.SEQ_NO_END.nm)
+        serialized = getattr(chunk, f.SERIALIZED_TXNS.nm).split("\n")
+        if len(serialized) != end - start + 1:
+            self.discard(chunk, reason="has {} transactions for sequence "
+                                       "numbers {} to {}".
+                         format(len(serialized), start, end),
+                         logMethod=logger.info)
+            return None
+        ledger = self.ledgers[getattr(chunk, f.LEDGER_TYPE.nm)]["ledger"]
+        deserialize = ledger.leafSerializer.deserialize
+        try:
+            return [(seqNo, deserialize(txn)) for seqNo, txn in
+                    enumerate(serialized, start)]
+        except Exception as ex:
+            self.discard(chunk, reason="has transactions which cannot be "
+                                       "deserialized: {}".format(ex),
+                         logMethod=logger.info)
+            return None
+
+    def startCatchupStream(self, ledgerType: int, consProof: ConsistencyProof):
+        """
+        Catch up the ledger till the end of the consistency proof by
+        requesting chunks of transactions from the connected nodes, see
+        `CatchupStream`
+        """
+        ledger = self.ledgers[ledgerType]["ledger"]
+        peers = self.catchupPeers()
+        stream = CatchupStream(
+            ledgerType, ledger.size + 1, getattr(consProof, f.SEQ_NO_END.nm),
+            peers, self.config.CatchupChunkSize,
+            self.config.CatchupChunksInFlight, self.config.CatchupChunkTimeout)
+        self.catchupStreams[ledgerType] = stream
+        self.sendCatchupChunkReqs(ledgerType)
+        self._schedule(partial(self.checkCatchupStream, ledgerType, stream),
+                       stream.timeout)
+
+    def sendCatchupChunkReqs(self, ledgerType: int):
+        """
+        Request as many of the chunks not received yet as the nodes can be
+        sent
+        """
+        stream = self.catchupStreams[ledgerType]
+        for nodeName, req in stream.requests():
+            try:
+                rid = self.nodestack.getRemote(nodeName).uid
+            except RemoteNotFound:
+                logger.debug("{} could not request catchup chunk from {}".
+                             format(self, nodeName))
+                stream.removePeer(nodeName)
+                continue
+            logger.debug("{} requesting catchup chunk {} from {}".
+                         format(self, req, nodeName))
+            self.send(req, rid)
+
+    def catchupPeers(self) -> List[str]:
+        """
+        The nodes to request catchup chunks from, the connected nodes which
+        are not blacklisted
+        """
+        return [nm for nm in self.nodestack.conns
+                if nm not in self.blacklistedNodes]
+
+    def checkCatchupStream(self, ledgerType: int, stream: CatchupStream):
+        """
+        Request again the chunks not received in time, from nodes connected
+        and not blacklisted, which includes nodes which connected or
+        reconnected since the catchup started
+        """
+        if self.catchupStreams[ledgerType] is not stream:
+            return
+        peers = self.catchupPeers()
+        for nodeName in stream.peers:
+            if nodeName not in peers:
+                stream.removePeer(nodeName)
+        for nodeName in peers:
+            stream.addPeer(nodeName)
+        expired = stream.expire()
+        if expired:
+            logger.info("{} requesting catchup chunks {} again".
+                        format(self, expired))
+        if not stream.peers:
+            logger.warning("{} has no nodes to catch up ledger {} from".
+                           format(self, ledgerType))
+        self.sendCatchupChunkReqs(ledgerType)
+        self._schedule(partial(self.checkCatchupStream, ledgerType, stream),
+                       stream.timeout)
+
     def _getCatchupTimeout(self, numRequest, batchSize):
         return numRequest * (self.config.CatchupTransactionsTimeout +
                              .1*batchSize)
 
     def catchupCompleted(self, ledgerType: int):
         self.catchupReplyTimers[ledgerType] = None
+        self.catchupStreams[ledgerType] = None
+        self.snapshotTill[ledgerType] = None
+        self.receivedCatchUpReplies[ledgerType].clear()
         logger.debug("{} completed catching up ledger {}".format(self,
                                                                  ledgerType))
         if ledgerType not in self.ledgers:
@@ -823,8 +1027,20 @@ class LedgerManager(HasActionQueue):
             logger.error("{} cannot find remote with name {}".
                          format(self, remoteName))
 
+    def compressedFor(self, msg: Any, to: str, stack) -> Any:
+        """
+        Return the message compressed if it is a big ledger message and the
+        recipient can decompress it, the message as it is otherwise
+        """
+        if self.config.CompressLedgerMsgs and stack is not None and \
+                isinstance(msg, CompressibleMsgTypes) and \
+                stack.canDecode(to, ZLIB):
+            return compressMsg(msg, self.config.CompressionThreshold)
+        return msg
+
     def sendTo(self, msg: Any, to: str):
         stack = self.getStack(to)
+        msg = self.compressedFor(msg, to, stack)
         # If the message is being sent by a node
         if self.ownedByNode:
             if stack == self.nodestack:
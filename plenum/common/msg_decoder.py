@@ -0,0 +1,227 @@
+"""
+Decoding of node messages from their dictionary form into TaggedTuples.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+from plenum.common.exceptions import MissingNodeOp, InvalidNodeOp, \
+    InvalidNodeMsg, InvalidNodeMsgField
+from plenum.common.compression import decompressMsg
+from plenum.common.txn import BATCH, COMPRESSED
+from plenum.common.types import OP_FIELD_NAME, PositionalTypeIds, \
+    TaggedTuples, TaggedTupleBase
+
+# Types of values accepted for fields declared with a primitive type.
+# Numbers without a fractional part may be sent as integers
+PrimitiveTypes = {
+    str: (str,),
+    int: (int,),
+    float: (float, int),
+    bool: (bool,),
+}
+
+
+# Type id -> operation of the messages sent as arrays by positional codecs
+OpOfTypeId = {typeId: op for op, typeId in PositionalTypeIds.items()}
+
+
+def fieldTypes(cls) -> Dict[str, Any]:
+    return getattr(cls, '_field_types', None) or \
+        getattr(cls, '__annotations__', {})
+
+
+class MsgDecoder:
+    """
+    Decoder of messages of one TaggedTuple type. Checks that the message has
+    all the fields of the type and no other and that fields declared with a
+    primitive type have a value of that type, and builds the tuple from the
+    values in field order.
+
+    The checks and the construction of the tuple are compiled once per type
+    into a single function, `decode`, and for messages sent as arrays by a
+    positional codec into `decodeValues`, see `PositionalCodec`.
+    """
+
+    def __init__(self, cls):
+        self.cls = cls
+        self.fields = cls._fields
+        types = fieldTypes(cls)
+        # Accepted types of each field whose type is checked
+        self.checkedTypes = {nm: PrimitiveTypes[types[nm]]
+                             for nm in self.fields
+                             if types.get(nm) in PrimitiveTypes}
+        self.decode = self._compile()
+        self.decodeValues = self._compileValues()
+
+    def _compile(self) -> Callable[[Dict], TaggedTupleBase]:
+        names = ["v{}".format(i) for i in range(len(self.fields))]
+        lines = ["def decode(msg):",
+                 "    if len(msg) != {}:".format(len(self.fields) + 1),
+                 "        _invalid(msg)",
+                 "    try:"]
+        lines.extend("        {} = msg[{!r}]".format(v, nm)
+                     for v, nm in zip(names, self.fields))
+        lines.extend(["    except KeyError:",
+                      "        _invalid(msg)"])
+        return self._compiled("decode", lines, names)
+
+    def _compileValues(self) -> Callable[[List], TaggedTupleBase]:
+        """
+        Compile the decoding of a message sent as the id of its type followed
+        by the values of its fields in order
+        """
+        names = ["v{}".format(i) for i in range(len(self.fields))]
+        lines = ["def decodeValues(msg):",
+                 "    if len(msg) != {}:".format(len(self.fields) + 1),
+                 "        _invalidValues(msg)",
+                 "    _, {} = msg".format(", ".join(names))]
+        return self._compiled("decodeValues", lines, names)
+
+    def _compiled(self, name: str, lines: List[str], names: List[str]):
+        """
+        Complete the decoding function whose lines read the values of the
+        fields into `names`, with the construction of the tuple and the checks
+        of the values, and compile it.
+        """
+        lines.append("    decoded = _new(_cls, ({}))".format(
+            "".join(v + ", " for v in names)))
+        for i, (v, nm) in enumerate(zip(names, self.fields)):
+            if nm not in self.checkedTypes:
+                continue
+            # Checking the exact type first is much faster than isinstance
+            # for the values of the expected type
+            lines.extend([
+                "    if type({v}) is not _t{i}[0] and "
+                "not isinstance({v}, _t{i}):".format(v=v, i=i),
+                "        _wrongType(decoded, {!r}, {})".format(nm, v)])
+        lines.append("    return decoded")
+        namespace = {"_new": tuple.__new__, "_cls": self.cls,
+                     "_invalid": self._invalid,
+                     "_invalidValues": self._invalidValues,
+                     "_wrongType": self._wrongType}
+        namespace.update(("_t{}".format(i), self.checkedTypes[nm])
+                         for i, nm in enumerate(self.fields)
+                         if nm in self.checkedTypes)
+        exec("\n".join(lines), namespace)
+        return namespace[name]
+
+    def _invalid(self, msg: Dict):
+        missing = [nm for nm in self.fields if nm not in msg]
+        if missing:
+            raise InvalidNodeMsg("{} is missing fields {}".
+                                 format(self.cls.__name__, missing))
+        unknown = set(msg) - set(self.fields) - {OP_FIELD_NAME}
+        raise InvalidNodeMsg("{} has unknown fields {}".
+                             format(self.cls.__name__, unknown))
+
+    def _invalidValues(self, msg: List):
+        raise InvalidNodeMsg("{} has {} values for {} fields".
+                             format(self.cls.__name__, len(msg) - 1,
+                                    len(self.fields)))
+
+    @staticmethod
+    def _wrongType(decoded: TaggedTupleBase, nm: str, value: Any):
+        raise InvalidNodeMsgField(decoded, "field {} has incorrect type: {}".
+                                  format(nm, type(value)))
+
+
+# Operation -> decoder of messages with that operation
+_decoders = {}  # type: Dict[str, MsgDecoder]
+
+
+def getDecoder(op: str) -> Optional[MsgDecoder]:
+    """
+    Get the decoder of messages with the given operation, None if the
+    operation is unknown
+    """
+    decoder = _decoders.get(op)
+    if decoder is None or decoder.cls is not TaggedTuples.get(op):
+        cls = TaggedTuples.get(op)
+        if cls is None:
+            return None
+        decoder = _decoders[op] = MsgDecoder(cls)
+    return decoder
+
+
+def decodeNodeMsg(msg: Dict) -> TaggedTupleBase:
+    """
+    Decode a node message. The messages in a BATCH are decoded along with
+    it, a message in the batch which cannot be decoded is left as it is to
+    be rejected when it is processed. A COMPRESSED message is decoded as the
+    message it is the compressed form of.
+
+    :param msg: the dictionary form of the message, with its operation, or
+    its array form if sent by a positional codec
+    :raises InvalidNodeMsg: if the message cannot be decoded
+    """
+    if isinstance(msg, list):
+        return decodePositionalMsg(msg)
+    op = msg.get(OP_FIELD_NAME)
+    if not op:
+        raise MissingNodeOp
+    decoder = getDecoder(op)
+    if decoder is None:
+        raise InvalidNodeOp(op)
+    decoded = decoder.decode(msg)
+    if op == COMPRESSED:
+        return decodeNodeMsg(decompressMsg(decoded))
+    if op == BATCH and isinstance(decoded.messages, list):
+        decoded = tuple.__new__(decoder.cls, (
+            [decodeBatchedMsg(m) for m in decoded.messages],
+            decoded.signature))
+    return decoded
+
+
+def decodePositionalMsg(msg: List) -> TaggedTupleBase:
+    """
+    Decode a message sent as the id of its type followed by the values of
+    its fields, see `PositionalCodec`
+
+    :raises InvalidNodeMsg: if the message cannot be decoded
+    """
+    try:
+        op = OpOfTypeId[msg[0]]
+    except (IndexError, KeyError, TypeError):
+        raise InvalidNodeOp("unknown type id in {}".format(msg[:1]))
+    decoder = getDecoder(op)
+    if decoder is None:
+        raise InvalidNodeOp(op)
+    return decoder.decodeValues(msg)
+
+
+def parseBatchedMsg(msg: Any) -> Any:
+    """
+    Return the dictionary form of a message received in a batch, which is
+    sent encoded if the sender pre-encodes batched messages, see
+    `Batched.encodeBatchedMsg`.
+    """
+    if isinstance(msg, str):
+        try:
+            return json.loads(msg)
+        except ValueError:
+            return msg
+    return msg
+
+
+def decodeBatchedMsg(msg: Any) -> Any:
+    if isinstance(msg, list):
+        try:
+            return decodePositionalMsg(msg)
+        except InvalidNodeMsg:
+            return msg
+    if isinstance(msg, str):
+        msg = parseBatchedMsg(msg)
+        if isinstance(msg, list):
+            return decodeBatchedMsg(msg)
+    if not isinstance(msg, dict):
+        return msg
+    op = msg.get(OP_FIELD_NAME)
+    # Compressed messages are decompressed when they are processed
+    decoder = getDecoder(op) if op not in (BATCH, COMPRESSED) else None
+    if decoder is None:
+        return msg
+    try:
+        return decoder.decode(msg)
+    except InvalidNodeMsg:
+        return msg
@@ -1,12 +1,13 @@
+import json
 import sys
 import time
 from collections import Callable
-from collections import deque
+from collections import deque, OrderedDict
 from typing import Any, Set, Optional, List, Iterable
 from typing import Dict
 from typing import Tuple
 
-from raet.raeting import AutoMode, TrnsKind
+from raet.raeting import AutoMode, TrnsKind, BodyKind
 from raet.road.estating import RemoteEstate
 from raet.road.keeping import RoadKeep
 from raet.road.stacking import RoadStack
@@ -18,13 +19,21 @@ from plenum.common.exceptions import RemoteNotFound
 from plenum.common.log import getlogger
 from plenum.common.ratchet import Ratchet
 from plenum.common.signer import Signer
-from plenum.common.types import Batch, TaggedTupleBase, HA
+from plenum.common.txn import PREPREPARE, PREPARE, COMMIT, CHECKPOINT, \
+    THREE_PC_STATE, NOMINATE, PRIMARY, REELECTION, INSTANCE_CHANGE
+from plenum.common.types import Batch, TaggedTupleBase, HA, OP_FIELD_NAME, \
+    f, PositionalTypeIds, TaggedTuples
 from plenum.common.request import Request
 from plenum.common.util import distributedConnectionMap, \
     MessageProcessor, checkPortAvailable
 from plenum.common.config_util import getConfig
 from plenum.common.error import error
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = getlogger()
 
 # this overrides the defaults
@@ -272,6 +281,8 @@ class SimpleStack(Stack):
         self.stackParams = stackParams
         self.msgHandler = msgHandler
         self._conns = set()  # type: Set[str]
+        # Name of remote -> codecs the remote announced it can decode
+        self.announcedCodecs = {}  # type: Dict[str, Set[str]]
         super().__init__(**stackParams, msgHandler=self.msgHandler, sighex=sighex)
 
     @property
@@ -345,6 +356,19 @@ class SimpleStack(Stack):
         """
         pass
 
+    def setAnnouncedCodecs(self, name: str, codecs: Optional[List[str]]):
+        """
+        Record the codecs the remote announced it can decode, None to forget
+        them
+        """
+        if codecs is None:
+            self.announcedCodecs.pop(name, None)
+        else:
+            self.announcedCodecs[name] = set(codecs)
+
+    def canDecode(self, name: str, codec: str) -> bool:
+        return codec in self.announcedCodecs.get(name, ())
+
     def start(self):
         super().start()
         # super().__init__(**self.stackParams, msgHandler=self.msgHandler)
@@ -751,6 +775,134 @@ class KITStack(SimpleStack):
         return remote.name
 
 
+# Lanes of an outbox, flushed in this order
+CONSENSUS_LANE, ELECTION_LANE, BULK_LANE = range(3)
+OutBoxLaneNames = ("consensus", "election", "bulk")
+
+# Lane of the messages with each operation, messages with other operations,
+# like catchup messages and PROPAGATEs, go in the bulk lane
+LaneOfOp = {
+    PREPREPARE: CONSENSUS_LANE,
+    PREPARE: CONSENSUS_LANE,
+    COMMIT: CONSENSUS_LANE,
+    CHECKPOINT: CONSENSUS_LANE,
+    THREE_PC_STATE: CONSENSUS_LANE,
+    NOMINATE: ELECTION_LANE,
+    PRIMARY: ELECTION_LANE,
+    REELECTION: ELECTION_LANE,
+    INSTANCE_CHANGE: ELECTION_LANE,
+}
+
+# Encoded size of a batch without its messages
+BatchOverhead = len(json.dumps({OP_FIELD_NAME: Batch.typename,
+                                f.MSGS.nm: [], f.SIG.nm: None},
+                               separators=(',', ':')))
+
+
+class OutBox:
+    """
+    Messages waiting to be sent to a remote, queued in lanes. Messages are
+    taken from the lanes in priority order and in the order they were queued
+    within a lane.
+    """
+
+    def __init__(self):
+        self.lanes = tuple(deque() for _ in OutBoxLaneNames)
+
+    def append(self, payload: Dict):
+        op = payload.get(OP_FIELD_NAME) if isinstance(payload, dict) else None
+        self.lanes[LaneOfOp.get(op, BULK_LANE)].append(payload)
+
+    def popleft(self) -> Dict:
+        for lane in self.lanes:
+            if lane:
+                return lane.popleft()
+        raise IndexError("pop from an empty outbox")
+
+    def __len__(self):
+        return sum(len(lane) for lane in self.lanes)
+
+    def __iter__(self):
+        for lane in self.lanes:
+            yield from lane
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class MsgCodec:
+    """
+    Encoding of the messages sent to a remote in batches. The batch itself is
+    sent as a dictionary, since RAET only sends mappings, in the body kind of
+    the codec. A node uses a codec other than the default only for the
+    remotes which announced that they can decode it.
+    """
+    name = None
+    # RAET body kind of the messages sent to remotes using the codec, None
+    # for the stack's default
+    bodyKind = None
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    def encode(self, msg: Dict) -> Any:
+        """
+        Return the form in which the message is sent in a batch
+
+        :param msg: the message prepared for sending
+        """
+        return msg
+
+
+class DictCodec(MsgCodec):
+    """
+    Messages are sent as dictionaries of their fields and operation
+    """
+    name = "dict"
+
+
+class PositionalCodec(MsgCodec):
+    """
+    Messages of the types in `PositionalTypeIds` are sent as arrays of the id
+    of their type followed by the values of their fields in order, without
+    the names of the fields. Other messages are sent as dictionaries.
+    """
+    name = "positional"
+
+    def encode(self, msg: Dict) -> Any:
+        op = msg.get(OP_FIELD_NAME) if isinstance(msg, dict) else None
+        typeId = PositionalTypeIds.get(op)
+        if typeId is None:
+            return msg
+        fields = TaggedTuples[op]._fields
+        # A message with anything more than its fields, like a signature, is
+        # sent as it is
+        if len(msg) != len(fields) + 1:
+            return msg
+        return [typeId] + [msg[nm] for nm in fields]
+
+
+class MsgPackCodec(PositionalCodec):
+    """
+    Messages are sent as with the positional codec in batches encoded with
+    msgpack instead of JSON. Available only if msgpack is installed.
+    """
+    name = "msgpack"
+    bodyKind = BodyKind.msgpack.value
+
+    @property
+    def available(self) -> bool:
+        return msgpack is not None
+
+
+# Codecs of batched messages by name, in order of preference
+MsgCodecsByName = OrderedDict((codec.name, codec) for codec in
+                              (MsgPackCodec(), PositionalCodec(), DictCodec()))
+
+DefaultMsgCodec = MsgCodecsByName[DictCodec.name]
+
+
 class Batched(MessageProcessor):
     """
     A mixin to allow batching of requests to be send to remotes.
@@ -760,7 +912,52 @@ class Batched(MessageProcessor):
         """
         :param self: 'NodeStacked'
         """
-        self.outBoxes = {}  # type: Dict[int, deque]
+        config = getConfig()
+        self.outBoxes = {}  # type: Dict[int, OutBox]
+        self.preEncodeBatchedMsgs = config.PreEncodeBatchedMsgs
+        # Maximum encoded size of a batch, None for no limit
+        self.maxBatchSize = config.MaxBatchSize
+        # Highest number of messages queued in each lane for a remote,
+        # seen when flushing, since the stats were last reset
+        self.peakLaneDepths = [0] * len(OutBoxLaneNames)
+        self.msgCodec = MsgCodecsByName.get(config.NodeMsgCodec)
+        if self.msgCodec is None or not self.msgCodec.available:
+            logger.warning("message codec {} is not available, using {}".
+                           format(config.NodeMsgCodec, DefaultMsgCodec.name))
+            self.msgCodec = DefaultMsgCodec
+
+    @property
+    def supportedCodecs(self) -> List[str]:
+        """
+        Names of the codecs of batched messages this stack can decode
+        """
+        return [name for name, codec in MsgCodecsByName.items()
+                if codec.available]
+
+    def codecFor(self, name: str) -> MsgCodec:
+        """
+        Codec of the messages sent to the remote, this stack's codec if the
+        remote announced it can decode them, the default codec otherwise
+        """
+        if self.msgCodec.name in self.announcedCodecs.get(name, ()):
+            return self.msgCodec
+        return DefaultMsgCodec
+
+    def message(self, body, uid=None, timeout=None):
+        """
+        Send the message body in the body kind of the codec used for the
+        remote, RAET packs the body when the message is created
+        """
+        remote = self.remotes.get(uid) \
+            if self.msgCodec is not DefaultMsgCodec else None
+        bodyKind = self.codecFor(remote.name).bodyKind if remote else None
+        if bodyKind is None:
+            return super().message(body, uid, timeout)
+        default, self.Bk = self.Bk, bodyKind
+        try:
+            return super().message(body, uid, timeout)
+        finally:
+            self.Bk = default
 
     def _enqueue(self, msg: Any, rid: int, signer: Signer) -> None:
         """
@@ -769,19 +966,31 @@ class Batched(MessageProcessor):
         :param msg: the message to enqueue
         :param rid: the id of the remote node
         """
-        payload = self.prepForSending(msg, signer)
+        self._enqueuePayload(self.prepForSending(msg, signer), rid)
+
+    def _enqueuePayload(self, payload: Dict, rid: int) -> None:
+        """
+        Enqueue a message already prepared for sending into the remote's
+        queue. The same payload may be enqueued for several remotes so it
+        must not be changed once enqueued.
+
+        :param payload: the message prepared for sending
+        :param rid: the id of the remote node
+        """
         if rid not in self.outBoxes:
-            self.outBoxes[rid] = deque()
+            self.outBoxes[rid] = OutBox()
         self.outBoxes[rid].append(payload)
 
     def _enqueueIntoAllRemotes(self, msg: Any, signer: Signer) -> None:
         """
         Enqueue the specified message into all the remotes in the nodestack.
+        The message is prepared for sending once for all the remotes.
 
         :param msg: the message to enqueue
         """
+        payload = self.prepForSending(msg, signer)
         for rid in self.remotes.keys():
-            self._enqueue(msg, rid, signer)
+            self._enqueuePayload(payload, rid)
 
     def send(self, msg: Any, *rids: Iterable[int], signer: Signer=None) -> None:
         """
@@ -793,16 +1002,95 @@ class Batched(MessageProcessor):
          this message must be enqueued
         """
         if rids:
+            payload = self.prepForSending(msg, signer)
             for r in rids:
-                self._enqueue(msg, r, signer)
+                self._enqueuePayload(payload, r)
         else:
             self._enqueueIntoAllRemotes(msg, signer)
 
+    @staticmethod
+    def encodeBatchedMsg(msg: Dict) -> str:
+        """
+        Encode a message to be sent in a batch, the same way the transport
+        encodes message bodies
+        """
+        return json.dumps(msg, separators=(',', ':'))
+
+    def laneDepths(self) -> Dict[str, int]:
+        """
+        Number of messages queued in each lane for all remotes
+        """
+        return {name: sum(len(box.lanes[lane])
+                          for box in self.outBoxes.values())
+                for lane, name in enumerate(OutBoxLaneNames)}
+
+    def outBoxStats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            "depths": self.laneDepths(),
+            "peakDepths": dict(zip(OutBoxLaneNames, self.peakLaneDepths))
+        }
+
+    def resetOutBoxStats(self):
+        self.peakLaneDepths = [0] * len(OutBoxLaneNames)
+
+    def _batches(self, msgs: OutBox, encoded: Dict[int, Tuple[Dict, str]],
+                 codec: MsgCodec=DefaultMsgCodec,
+                 converted: Dict[Tuple[int, str], Tuple[Dict, Any]]=None):
+        """
+        Take all messages from the outbox and group them into batches no
+        bigger than `maxBatchSize` when encoded. A message bigger than that
+        is sent in a batch of its own. Sizes are measured as JSON, which
+        overestimates the size of msgpack encoded batches. Messages are sent
+        encoded if they are pre-encoded or measured.
+
+        :param msgs: the outbox
+        :param encoded: the messages encoded so far in this flush
+        :param codec: the codec of the messages sent to the remote
+        :param converted: the messages converted by codecs so far in this
+        flush, keyed by the id of the message and the name of the codec
+        """
+        encode = self.preEncodeBatchedMsgs or self.maxBatchSize
+        convert = codec is not DefaultMsgCodec
+        batch, size = [], BatchOverhead
+        while msgs:
+            msg = msgs.popleft()
+            if convert:
+                key = (id(msg), codec.name)
+                if key not in converted:
+                    converted[key] = (msg, codec.encode(msg))
+                msg = converted[key][1]
+            if encode:
+                if id(msg) not in encoded:
+                    encoded[id(msg)] = (msg, self.encodeBatchedMsg(msg))
+                enc = encoded[id(msg)][1]
+                # The separator of messages in the batch is counted too
+                msgSize = len(enc) + 1
+                # Once encoded, to be measured too, the message is sent as a
+                # string rather than encoded again with the batch. In a JSON
+                # batch it is quoted and its quotes and backslashes escaped,
+                # in a msgpack batch it is sent as it is
+                if codec.bodyKind is None:
+                    msgSize += enc.count('"') + enc.count('\\') + 2
+                msg = enc
+                if self.maxBatchSize and batch and \
+                        size + msgSize > self.maxBatchSize:
+                    yield batch
+                    batch, size = [], BatchOverhead
+                size += msgSize
+            batch.append(msg)
+        if batch:
+            yield batch
+
     def flushOutBoxes(self) -> None:
         """
         Clear the outBoxes and transmit batched messages to remotes.
         """
         removedRemotes = []
+        # Messages sent in batches, when encoded, keyed by the id of their
+        # payload, along with the payload so that the id is not reused during
+        # the flush. A message enqueued for many remotes is encoded only once
+        encoded = {}  # type: Dict[int, Tuple[Dict, str]]
+        converted = {}  # type: Dict[Tuple[int, str], Tuple[Dict, Any]]
         for rid, msgs in self.outBoxes.items():
             try:
                 dest = self.remotes[rid].name
@@ -810,6 +1098,9 @@ class Batched(MessageProcessor):
                 removedRemotes.append(rid)
                 continue
             if msgs:
+                for lane, queued in enumerate(msgs.lanes):
+                    if len(queued) > self.peakLaneDepths[lane]:
+                        self.peakLaneDepths[lane] = len(queued)
                 if len(msgs) == 1:
                     msg = msgs.popleft()
                     # Setting timeout to never expire
@@ -819,17 +1110,18 @@ class Batched(MessageProcessor):
                     logger.debug("{} batching {} msgs to {} into one transmission".
                                  format(self, len(msgs), dest))
                     logger.trace("    messages: {}".format(msgs))
-                    batch = Batch([], None)
-                    while msgs:
-                        batch.messages.append(msgs.popleft())
-                    # don't need to sign the batch, when the composed msgs are
-                    # signed
-                    payload = self.prepForSending(batch)
-                    logger.trace("{} sending payload to {}: {}".format(self,
-                                                                       dest,
-                                                                       payload))
-                    # Setting timeout to never expire
-                    self.transmit(payload, rid, timeout=self.messageTimeout)
+                    for messages in self._batches(msgs, encoded,
+                                                  self.codecFor(dest),
+                                                  converted):
+                        batch = Batch(messages, None)
+                        # don't need to sign the batch, when the composed msgs
+                        # are signed
+                        payload = self.prepForSending(batch)
+                        logger.trace("{} sending payload to {}: {}".
+                                     format(self, dest, payload))
+                        # Setting timeout to never expire
+                        self.transmit(payload, rid,
+                                      timeout=self.messageTimeout)
         for rid in removedRemotes:
             logger.warning("{} rid {} has been removed".format(self, rid),
                            extra={"cli": False})
@@ -850,6 +1142,9 @@ class ClientStack(SimpleStack):
 
     def serviceClientStack(self):
         newClients = self.connecteds - self.connectedClients
+        # Clients announce their codecs again when they connect again
+        for name in self.connectedClients - self.connecteds:
+            self.setAnnouncedCodecs(name, None)
         self.connectedClients = self.connecteds
         return newClients
 
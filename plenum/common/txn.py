@@ -11,6 +11,8 @@ PRIMARY = "PRIMARY"
 PRIMDEC = "PRIMARYDECIDED"
 
 BATCH = "BATCH"
+MSG_CODECS = "MSG_CODECS"
+COMPRESSED = "COMPRESSED"
 
 REQACK = "REQACK"
 
@@ -19,6 +21,9 @@ REQNACK = "REQNACK"
 POOL_LEDGER_TXNS = "POOL_LEDGER_TXNS"
 
 PROPAGATE = "PROPAGATE"
+PROPAGATE_DIGEST = "PROPAGATE_DIGEST"
+REQUEST_FETCH = "REQUEST_FETCH"
+REQUEST_FETCH_REP = "REQUEST_FETCH_REP"
 
 PREPREPARE = "PREPREPARE"
 PREPARE = "PREPARE"
@@ -39,6 +44,8 @@ CONSISTENCY_PROOF = "CONSISTENCY_PROOF"
 CATCHUP_REQ = "CATCHUP_REQ"
 CATCHUP_REP = "CATCHUP_REP"
 CONS_PROOF_REQUEST = "CONS_PROOF_REQUEST"
+SNAPSHOT_REQ = "SNAPSHOT_REQ"
+SNAPSHOT_CHUNK = "SNAPSHOT_CHUNK"
 
 BLACKLIST = "BLACKLIST"
 
@@ -1,12 +1,14 @@
 import sys
 from collections import namedtuple
-from typing import NamedTuple, Any, List, Mapping, Optional, TypeVar, Dict
+from typing import NamedTuple, Any, List, Mapping, Optional, TypeVar, \
+    Dict, Tuple
 
 from plenum.common.txn import NOMINATE, PRIMARY, REELECTION, REQACK,\
     ORDERED, PROPAGATE, PREPREPARE, REPLY, COMMIT, PREPARE, BATCH, \
     INSTANCE_CHANGE, BLACKLIST, REQNACK, LEDGER_STATUS, CONSISTENCY_PROOF, \
     CATCHUP_REQ, CATCHUP_REP, POOL_LEDGER_TXNS, CONS_PROOF_REQUEST, CHECKPOINT, \
-    CHECKPOINT_STATE, THREE_PC_STATE
+    CHECKPOINT_STATE, THREE_PC_STATE, PROPAGATE_DIGEST, REQUEST_FETCH, \
+    REQUEST_FETCH_REP, MSG_CODECS, COMPRESSED, SNAPSHOT_REQ, SNAPSHOT_CHUNK
 
 HA = NamedTuple("HA", [
     ("host", str),
@@ -37,6 +39,8 @@ class f:  # provides a namespace for reusable field constants
     RESULT = Field('result', Any)
     SENDER_NODE = Field('senderNode', str)
     REQ_ID = Field('reqId', int)
+    # List of (identifier, reqId) of the requests in a 3 phase commit batch
+    REQ_IDR = Field('reqIdr', List[Tuple[str, int]])
     VIEW_NO = Field('viewNo', int)
     INST_ID = Field('instId', int)
     IS_STABLE = Field('isStable', bool)
@@ -69,6 +73,11 @@ class f:  # provides a namespace for reusable field constants
     DOMAIN_CATCHUP_REQ = Field("domainCatchupReq", Any)
     POOL_CATCHUP_REP = Field("poolCatchupRep", Any)
     DOMAIN_CATCHUP_REP = Field("domainCatchupRep", Any)
+    CODECS = Field("codecs", List[str])
+    COMPRESSION = Field("compression", str)
+    COMPRESSED_DATA = Field("data", str)
+    LEDGER_SIZE = Field("ledgerSize", int)
+    SERIALIZED_TXNS = Field("serializedTxns", str)
 
 
 # TODO: Move this to `txn.py` which should be renamed to constants.py
@@ -153,8 +162,8 @@ PoolLedgerTxns = TaggedTuple(POOL_LEDGER_TXNS, [
 Ordered = NamedTuple(ORDERED, [
     f.INST_ID,
     f.VIEW_NO,
-    f.IDENTIFIER,
-    f.REQ_ID,
+    f.REQ_IDR,
+    f.PP_SEQ_NO,
     f.PP_TIME])
 
 # <PROPAGATE, <REQUEST, o, s, c> σc, i>~μi
@@ -167,12 +176,32 @@ Propagate = TaggedTuple(PROPAGATE, [
     f.REQUEST,
     f.SENDER_CLIENT])
 
+# Sent instead of a PROPAGATE when `DigestPropagates` is enabled, carries the
+# digest of the request instead of the request. A node which does not have
+# the request once enough nodes agree on its digest fetches it with a
+# REQUEST_FETCH from one of them, the request is sent in a REQUEST_FETCH_REP
+PropagateDigest = TaggedTuple(PROPAGATE_DIGEST, [
+    f.IDENTIFIER,
+    f.REQ_ID,
+    f.DIGEST,
+    f.SENDER_CLIENT])
+
+RequestFetch = TaggedTuple(REQUEST_FETCH, [
+    f.IDENTIFIER,
+    f.REQ_ID,
+    f.DIGEST])
+
+RequestFetchRep = TaggedTuple(REQUEST_FETCH_REP, [
+    f.REQUEST,
+    f.SENDER_CLIENT])
+
+# `reqIdr` is the ordered list of requests in the batch and `digest` is the
+# digest of the whole batch, see `Replica.batchDigest`
 PrePrepare = TaggedTuple(PREPREPARE, [
     f.INST_ID,
     f.VIEW_NO,
     f.PP_SEQ_NO,
-    f.IDENTIFIER,
-    f.REQ_ID,
+    f.REQ_IDR,
     f.DIGEST,
     f.PP_TIME
     ])
@@ -199,8 +228,9 @@ Checkpoint = TaggedTuple(CHECKPOINT, [
 
 CheckpointState = NamedTuple(CHECKPOINT_STATE, [
     f.SEQ_NO,
-    f.DIGESTS,  # Digest of all the requests in the checkpoint
-    f.DIGEST,   # Final digest of the checkpoint, after all requests in its
+    f.DIGESTS,  # Running digest (`RunningDigest`) of the batches ordered in
+    # the checkpoint so far
+    f.DIGEST,   # Final digest of the checkpoint, after all batches in its
     # range have been ordered
     f.RECEIVED_DIGESTS,
     f.IS_STABLE
@@ -254,6 +284,36 @@ ConsProofRequest = TaggedTuple(CONS_PROOF_REQUEST, [
     f.SEQ_NO_END
 ])
 
+# Request for the transactions `seqNoStart` to `seqNoEnd` as stored in the
+# ledger, with a consistency proof from `seqNoEnd` to `ledgerSize`
+SnapshotReq = TaggedTuple(SNAPSHOT_REQ, [
+    f.LEDGER_TYPE,
+    f.SEQ_NO_START,
+    f.SEQ_NO_END,
+    f.LEDGER_SIZE
+])
+
+# Transactions `seqNoStart` to `seqNoEnd` serialized as stored in the ledger,
+# one per line
+SnapshotChunk = TaggedTuple(SNAPSHOT_CHUNK, [
+    f.LEDGER_TYPE,
+    f.SEQ_NO_START,
+    f.SEQ_NO_END,
+    f.SERIALIZED_TXNS,
+    f.CONS_PROOF
+])
+
+
+# Sent by a node to each node it connects to, with the names of the codecs
+# of batched messages it can decode, see `MsgCodec`
+MsgCodecs = TaggedTuple(MSG_CODECS, [f.CODECS])
+
+# A message compressed with `compression`, `data` is the base64 form of the
+# compressed JSON encoding of the message, see `compressMsg`
+Compressed = TaggedTuple(COMPRESSED, [
+    f.COMPRESSION,
+    f.COMPRESSED_DATA])
+
 
 TaggedTuples = None  # type: Dict[str, class]
 
@@ -269,6 +329,30 @@ def loadRegistry():
 
 loadRegistry()
 
+# Ids of the types of messages sent as arrays by positional codecs, see
+# `PositionalCodec`. An id must never be changed or reused as nodes with
+# different versions decode each other's messages by it
+PositionalTypeIds = {
+    PREPREPARE: 1,
+    PREPARE: 2,
+    COMMIT: 3,
+    CHECKPOINT: 4,
+    THREE_PC_STATE: 5,
+    PROPAGATE: 6,
+    PROPAGATE_DIGEST: 7,
+    REQUEST_FETCH: 8,
+    REQUEST_FETCH_REP: 9,
+    NOMINATE: 10,
+    PRIMARY: 11,
+    REELECTION: 12,
+    INSTANCE_CHANGE: 13,
+    LEDGER_STATUS: 14,
+    CONSISTENCY_PROOF: 15,
+    CATCHUP_REQ: 16,
+    CATCHUP_REP: 17,
+    CONS_PROOF_REQUEST: 18,
+}
+
 ThreePhaseType = (PrePrepare, Prepare, Commit)
 ThreePhaseMsg = TypeVar("3PhaseMsg", *ThreePhaseType)
 
@@ -1,3 +1,4 @@
+from collections import OrderedDict
 from typing import Dict
 
 from abc import abstractmethod
@@ -41,3 +42,54 @@ class DidVerifier(Verifier):
 
     def verify(self, sig, msg) -> bool:
         return self._vr.verify(sig, msg)
+
+
+class VerifierCache:
+    """
+    Least recently used cache of `DidVerifier`s keyed by identifier, so that
+    the keys of a client are decoded once rather than for every message. A
+    cached verifier is only used if it was built for the verkey the
+    identifier has now.
+    """
+
+    def __init__(self, maxSize: int):
+        self.maxSize = maxSize
+        self._verifiers = OrderedDict()
+        # type: OrderedDict[str, Tuple[str, DidVerifier]]
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._verifiers)
+
+    def get(self, identifier: str, verkey: str) -> DidVerifier:
+        """
+        Return a verifier for the identifier and verkey, building and caching
+        one if there is none for them.
+        """
+        cached = self._verifiers.get(identifier)
+        if cached is not None and cached[0] == verkey:
+            self._verifiers.move_to_end(identifier)
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        vr = DidVerifier(verkey, identifier=identifier)
+        if self.maxSize > 0:
+            self._verifiers[identifier] = (verkey, vr)
+            self._verifiers.move_to_end(identifier)
+            if len(self._verifiers) > self.maxSize:
+                self._verifiers.popitem(last=False)
+        return vr
+
+    def invalidate(self, identifier: str):
+        self._verifiers.pop(identifier, None)
+
+    def clear(self):
+        self._verifiers.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._verifiers),
+            "hits": self.hits,
+            "misses": self.misses
+        }
@@ -108,6 +108,34 @@ ConsistencyProofsTimeout = 5
 # Timeout factor after which a node starts requesting transactions
 CatchupTransactionsTimeout = 5
 
+# If True, a node catches up by requesting chunks of `CatchupChunkSize`
+# transactions, at most `CatchupChunksInFlight` at a time from each node,
+# preferring the nodes that respond fastest, instead of one request for a share
+# of all missing transactions from each node. A chunk not received within
+# `CatchupChunkTimeout` seconds is requested again, from another node if
+# possible
+StreamingCatchup = False
+CatchupChunkSize = 500
+CatchupChunksInFlight = 2
+CatchupChunkTimeout = 10
+
+# If set, a node more than this number of transactions behind the other nodes
+# first fetches from them snapshots of their ledgers: the transactions as
+# stored, in chunks of `SnapshotChunkSize` transactions with at most
+# `SnapshotChunksInFlight` chunks in flight to each node, each chunk verified
+# against the merkle root the nodes agree on. The transactions after the last
+# whole chunk are then caught up as usual. A chunk not received within
+# `SnapshotChunkTimeout` seconds is requested again
+SnapshotCatchupThreshold = None
+SnapshotChunkSize = 5000
+SnapshotChunksInFlight = 2
+SnapshotChunkTimeout = 30
+
+# Number of worker processes serializing and hashing the transactions of
+# catchup replies to verify them, a reply per task. The node's process
+# hashes them if less than 2
+CatchupVerificationWorkers = 0
+
 # Log configuration
 logRotationWhen = 'D'
 logRotationInterval = 1
@@ -129,6 +157,132 @@ CHK_FREQ = 100
 # Difference between low water mark and high water mark
 LOG_SIZE = 3*CHK_FREQ
 
+# Maximum number of messages stashed from a single node by a replica, for a
+# later view or outside the water marks, and by a node for a protocol
+# instance it does not have yet. Further messages from that node are
+# discarded till some of its stashed messages are processed
+MaxStashedMsgsPerSender = 3*LOG_SIZE
+
+# Maximum number of requests the primary replica puts in a single
+# PRE-PREPARE. A value of 1 sends a PRE-PREPARE for every request
+Max3PCBatchSize = 1
+
+# Maximum time (in seconds) the primary replica waits for more requests
+# before sending a PRE-PREPARE for a batch smaller than `Max3PCBatchSize`
+Max3PCBatchWait = .1
+
+# If True, the primary replica chooses the batch size and wait on the fly
+# from the number of requests waiting to be sent and the ordering latency,
+# between the minimum values below and `Max3PCBatchSize` and `Max3PCBatchWait`
+Adaptive3PCBatching = False
+Min3PCBatchSize = 1
+Min3PCBatchWait = 0
+
+# Ordering latency (in seconds) above which adaptive batching reduces the wait
+Target3PCBatchLatency = 1
+
+# Minimum time (in seconds) between two revisions of the adaptive batching
+# choices
+Adapt3PCBatchFreq = 1
+
+# If True, the primary replica keeps a window of PRE-PREPAREs in flight
+# (sent but not ordered) sized from the time batches take to be ordered,
+# rather than sending PRE-PREPAREs till the high water mark is reached
+Pipelined3PC = False
+
+# Bounds of the window of PRE-PREPAREs in flight. The window also never
+# exceeds `LOG_SIZE - CHK_FREQ`
+Min3PCInFlight = 1
+Max3PCInFlight = 2*CHK_FREQ
+
+# The window of PRE-PREPAREs in flight shrinks when the round trip time of
+# batches goes beyond this multiple of the lowest round trip time seen
+InFlightRttFactor = 2
+
+# If True, the replicas of backup protocol instances run in worker
+# processes, the replica of the master protocol instance always runs in the
+# node's process
+BackupReplicasInWorkers = False
+
+# If True, replicas of backup protocol instances keep only the state needed
+# to order requests and time the ordering: they keep no checkpoints and drop
+# the 3 phase state of a batch as soon as it is ordered
+LeanBackupReplicas = False
+
+# Maximum time (in seconds) a replica worker process waits for messages
+# from its node before servicing the replica
+ReplicaWorkerPollTimeout = .01
+
+
+# Number of client verifiers, built from the identifier and verkey of a
+# client, that a node keeps to authenticate requests
+ClientVerifierCacheSize = 10000
+
+# If True, signatures of client requests and of PROPAGATEs are verified in
+# batches by a pool of worker processes rather than one at a time in the
+# node's process
+PooledSigVerification = False
+
+# Number of worker processes verifying signatures, the number of CPUs if
+# None
+SigVerificationWorkers = None
+
+# Maximum number of signatures sent to a worker process at once
+SigVerificationBatchSize = 100
+
+# If True, nodes propagate the digest of a client request rather than the
+# request itself and a node which did not receive the request from the
+# client fetches it from one of the nodes once enough of them agree on its
+# digest
+DigestPropagates = False
+
+# Time (in seconds) after which a node fetches a request from another node
+# if the node it fetched it from has not sent it
+RequestFetchTimeout = 2
+
+# If True, the message routers of nodes, replicas and electors keep the
+# number of messages handled and the time taken to handle them for each
+# message type
+RouterStats = False
+
+# If True, messages sent to other nodes in a batch are encoded once however
+# many nodes they are sent to and the batch carries the encoded messages.
+# Nodes accept batches of either encoded or plain messages. A batch sent as
+# JSON carries each encoded message as a string whose quotes and backslashes
+# are escaped, about a fifth more bytes for 3 phase messages. Batches sent to
+# nodes using the "msgpack" codec (see `NodeMsgCodec`) carry them unescaped
+PreEncodeBatchedMsgs = False
+
+# Maximum size (in bytes) of an encoded batch of messages sent to a node,
+# the messages queued for a node are sent in more batches if needed. None for
+# no limit. With a limit, messages are encoded once per flush to be measured
+# and sent encoded, as with `PreEncodeBatchedMsgs`, so they are not encoded
+# again when the batch is sent
+MaxBatchSize = 1048576
+
+# Codec of the messages sent to other nodes in batches: "dict", "positional"
+# (arrays of the values of the fields keyed by the id of the message type) or
+# "msgpack" (positional, encoded with msgpack, needs msgpack installed). A
+# codec other than "dict" is used only with nodes which announce they can
+# decode it, nodes decode messages sent with any codec they support
+NodeMsgCodec = "dict"
+
+# If True, catchup replies, consistency proofs and pool ledger transactions
+# whose JSON encoding is at least `CompressionThreshold` bytes are sent
+# compressed with zlib to the nodes and clients which announce they can
+# decompress them
+CompressLedgerMsgs = False
+CompressionThreshold = 4 * 1024
+CompressionLevel = 6
+
+# Maximum size (in bytes) of a compressed message once decompressed, bigger
+# messages are rejected
+MaxDecompressedMsgSize = 64 * 1024 * 1024
+
+# If True, the offsets of transactions in the files of ledgers are indexed,
+# in a file next to each ledger's file, so that catchup requests for a range
+# of transactions are served without reading the ledger from its beginning
+IndexLedgerOffsets = True
 
 CLIENT_REQACK_TIMEOUT = 5
 CLIENT_REPLY_TIMEOUT = 10
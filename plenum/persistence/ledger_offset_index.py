@@ -0,0 +1,197 @@
+"""
+Index of the offsets of the transactions in the file of a ledger, used to
+read ranges of transactions without reading the file from its beginning.
+"""
+
+import os
+import struct
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from plenum.common.log import getlogger
+
+logger = getlogger()
+
+
+class LedgerOffsetIndex:
+    """
+    Persistent index of the offsets of the transactions in the text file of
+    a ledger. The index is a file next to the ledger's file holding the
+    offsets as fixed size integers, the offset of the transaction with
+    sequence number `n` being the `n`th, so the offset of any transaction is
+    read with a single seek.
+
+    The index is brought up to date with the ledger's file before each read
+    by indexing only the transactions added since the last read, so the
+    ledger does not have to tell the index about the transactions added to
+    it. If the last indexed transaction is no longer found where it was
+    indexed in the ledger's file, as when the ledger is reset, the index is
+    built again.
+    """
+
+    Suffix = "_offsets"
+    Entry = struct.Struct(">Q")
+
+    def __init__(self, ledger, path: str=None):
+        """
+        :param ledger: a ledger stored in a text file, with one transaction
+        per line
+        :param path: path of the index file, next to the ledger's file if
+        None
+        """
+        store = ledger._transactionLog
+        self.ledger = ledger
+        self.dataPath = store.dbPath
+        self.path = path or self.dataPath + self.Suffix
+        self.isLineNoKey = getattr(store, "isLineNoKey", True)
+        self.storeContentHash = getattr(store, "storeContentHash", False)
+        self.delimiter = getattr(store, "delimiter", "\t").encode()
+        self.lineSep = getattr(store, "lineSep", "\r\n").encode()
+        self._indexFile = open(self.path, "a+b")
+        # Number of transactions indexed
+        self.size = 0
+        # Offset in the ledger's file till which transactions are indexed
+        self.indexedTill = 0
+        # Offset and line of the last indexed transaction, to find out if the
+        # ledger's file changed other than by getting more transactions
+        self.lastIndexed = None  # type: Optional[Tuple[int, bytes]]
+        self._resume()
+
+    @classmethod
+    def forLedger(cls, ledger) -> Optional['LedgerOffsetIndex']:
+        """
+        Return an index of the ledger if it is stored in a text file, None
+        otherwise
+        """
+        store = getattr(ledger, "_transactionLog", None)
+        if not getattr(store, "dbPath", None):
+            return None
+        return cls(ledger)
+
+    def _resume(self):
+        """
+        Continue indexing from the end of the last indexed transaction, or
+        from the beginning if the index does not match the ledger's file
+        """
+        entries = os.path.getsize(self.path) // self.Entry.size
+        if not entries:
+            self._reset()
+            return
+        lastOffset = self._offsetAt(entries)
+        with open(self.dataPath, "rb") as data:
+            line = self._lineAt(data, lastOffset)
+        if line is None:
+            logger.info("{} does not match ledger file {}, building it "
+                        "again".format(self.path, self.dataPath))
+            self._reset()
+            return
+        # Any partially written entry is dropped
+        self._indexFile.truncate(entries * self.Entry.size)
+        self.size = entries
+        self.indexedTill = lastOffset + len(line)
+        self.lastIndexed = (lastOffset, line)
+
+    def _reset(self):
+        self._indexFile.truncate(0)
+        self.size = 0
+        self.indexedTill = 0
+        self.lastIndexed = None
+
+    def _lineAt(self, data, offset: int) -> Optional[bytes]:
+        """
+        The complete and non empty line starting at `offset` in the ledger's
+        file, None if there is no such line
+        """
+        data.seek(max(offset - 1, 0))
+        before = data.read(1) if offset else b"\n"
+        line = data.readline()
+        if before != b"\n" or not line.endswith(b"\n") or \
+                not line.strip(self.lineSep):
+            return None
+        return line
+
+    def _offsetAt(self, seqNo: int) -> int:
+        self._indexFile.seek((seqNo - 1) * self.Entry.size)
+        return self.Entry.unpack(self._indexFile.read(self.Entry.size))[0]
+
+    def sync(self) -> int:
+        """
+        Index the transactions added to the ledger's file since the last
+        sync. A line not yet completely written is left for the next sync.
+
+        :return: the number of transactions indexed
+        """
+        dataSize = os.path.getsize(self.dataPath)
+        with open(self.dataPath, "rb") as data:
+            if self.lastIndexed is not None:
+                lastOffset, lastLine = self.lastIndexed
+                if dataSize < self.indexedTill or \
+                        self._lineAt(data, lastOffset) != lastLine:
+                    logger.info("{} changed since indexed, building index {} "
+                                "again".format(self.dataPath, self.path))
+                    self._reset()
+            if dataSize == self.indexedTill:
+                return 0
+            entries = []
+            offset = self.indexedTill
+            data.seek(offset)
+            for line in data:
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip(self.lineSep):
+                    entries.append(self.Entry.pack(offset))
+                    self.lastIndexed = (offset, line)
+                offset += len(line)
+        self._indexFile.write(b"".join(entries))
+        self._indexFile.flush()
+        self.size += len(entries)
+        self.indexedTill = offset
+        return len(entries)
+
+    def _value(self, line: bytes) -> str:
+        """
+        The serialized transaction in a line of the ledger's file
+        """
+        if not self.isLineNoKey:
+            line = line.split(self.delimiter, 1)[1]
+        if self.storeContentHash:
+            line = line.rsplit(self.delimiter, 1)[0]
+        return line.decode()
+
+    def getSerializedRange(self, start: int, end: int) -> List[str]:
+        """
+        Return the serialized transactions with sequence numbers from `start`
+        to `end`, both inclusive, in order of sequence numbers, as stored in
+        the ledger's file. Only the lines of those transactions are read from
+        the ledger's file.
+        """
+        self.sync()
+        start = max(start, 1)
+        end = min(end, self.size)
+        values = []
+        if start > end:
+            return values
+        with open(self.dataPath, "rb") as data:
+            data.seek(self._offsetAt(start))
+            for line in data:
+                line = line.strip(self.lineSep)
+                if not line:
+                    continue
+                values.append(self._value(line))
+                if len(values) == end - start + 1:
+                    break
+        return values
+
+    def getRange(self, start: int, end: int) -> Dict[int, Any]:
+        """
+        Return the transactions with sequence numbers from `start` to `end`,
+        both inclusive, in order of sequence numbers. Only the lines of those
+        transactions are read from the ledger's file.
+        """
+        deserialize = self.ledger.leafSerializer.deserialize
+        return OrderedDict((seqNo, deserialize(value)) for seqNo, value in
+                           enumerate(self.getSerializedRange(start, end),
+                                     max(start, 1)))
+
+    def close(self):
+        self._indexFile.close()
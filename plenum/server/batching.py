@@ -0,0 +1,179 @@
+import time
+from typing import Callable, Dict, Optional
+
+
+class BatchController:
+    """
+    Chooses the size of, and the maximum time to wait for, the batches of
+    requests that a primary replica sends in PRE-PREPAREs.
+
+    When `Adaptive3PCBatching` is disabled `Max3PCBatchSize` and
+    `Max3PCBatchWait` are used as they are. Otherwise the choices are revised
+    at most every `Adapt3PCBatchFreq` seconds using the number of request
+    digests waiting to be sent and the recent ordering latency:
+
+    - the batch size doubles while more requests are waiting than fit in a
+    batch and halves when less than half a batch is waiting
+    - the wait drops to `Min3PCBatchWait` when at most one request is
+    waiting, halves when the ordering latency is above
+    `Target3PCBatchLatency` and grows in small steps otherwise
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._batchSize = config.Min3PCBatchSize
+        self._batchWait = config.Min3PCBatchWait
+        self.lastUpdatedAt = None   # type: float
+
+    @property
+    def adaptive(self) -> bool:
+        return self.config.Adaptive3PCBatching
+
+    @property
+    def batchSize(self) -> int:
+        """
+        Maximum number of requests to put in a PRE-PREPARE
+        """
+        return self._batchSize if self.adaptive else \
+            self.config.Max3PCBatchSize
+
+    @property
+    def batchWait(self) -> float:
+        """
+        Maximum time to wait before sending a batch smaller than `batchSize`
+        """
+        return self._batchWait if self.adaptive else \
+            self.config.Max3PCBatchWait
+
+    def update(self, queueDepth: int, getLatency: Callable[[], float]) -> bool:
+        """
+        Revise the batch size and wait if adaptive batching is enabled and
+        the last revision is old enough.
+
+        :param queueDepth: number of request digests waiting to be sent
+        :param getLatency: returns the recent ordering latency in seconds
+        :return: whether the batch size or wait changed
+        """
+        if not self.adaptive:
+            return False
+        now = time.perf_counter()
+        if self.lastUpdatedAt is not None and \
+                now - self.lastUpdatedAt < self.config.Adapt3PCBatchFreq:
+            return False
+        self.lastUpdatedAt = now
+
+        minSize, maxSize = self.config.Min3PCBatchSize, \
+            self.config.Max3PCBatchSize
+        minWait, maxWait = self.config.Min3PCBatchWait, \
+            self.config.Max3PCBatchWait
+
+        size = self._batchSize
+        if queueDepth > size:
+            size = min(size * 2, maxSize)
+        elif queueDepth < size // 2:
+            size = max(size // 2, minSize)
+
+        wait = self._batchWait
+        if queueDepth <= 1:
+            wait = minWait
+        elif getLatency() > self.config.Target3PCBatchLatency:
+            wait = max(wait / 2, minWait)
+        else:
+            wait = min(wait + (maxWait - minWait) / 10, maxWait)
+
+        changed = (size, wait) != (self._batchSize, self._batchWait)
+        self._batchSize, self._batchWait = size, wait
+        return changed
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "adaptive": self.adaptive,
+            "batchSize": self.batchSize,
+            "batchWait": self.batchWait
+        }
+
+
+class InFlightWindow:
+    """
+    Chooses the number of PRE-PREPAREs a primary replica keeps in flight,
+    i.e. sent but not yet ordered, when `Pipelined3PC` is enabled.
+
+    The window is revised on every ordered batch from the round trip time of
+    the batch, the time from sending its PRE-PREPARE to ordering it:
+
+    - while the smoothed round trip time stays within `InFlightRttFactor`
+    times the lowest one seen, the window doubles after each window of
+    ordered batches till it first shrinks and grows by one batch afterwards
+    - when the smoothed round trip time goes beyond that, the window halves,
+    at most once per window of ordered batches, and the lowest round trip
+    time is learnt again
+
+    The window stays between `Min3PCInFlight` and `Max3PCInFlight` and never
+    exceeds `LOG_SIZE - CHK_FREQ` so that a checkpoint stabilizes while the
+    primary is still sending PRE-PREPAREs below the high water mark.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        self._size = config.Min3PCInFlight
+        self.rtt = None         # type: float
+        self.minRtt = None      # type: float
+        self.slowStart = True
+        self._orderedSinceChange = 0
+
+    @property
+    def pipelined(self) -> bool:
+        return self.config.Pipelined3PC
+
+    @property
+    def maxSize(self) -> int:
+        return max(min(self.config.Max3PCInFlight,
+                       self.config.LOG_SIZE - self.config.CHK_FREQ),
+                   self.config.Min3PCInFlight)
+
+    @property
+    def size(self) -> Optional[int]:
+        """
+        Maximum number of PRE-PREPAREs in flight, None when not pipelined
+        in which case only the high water mark limits them
+        """
+        return min(self._size, self.maxSize) if self.pipelined else None
+
+    def isFull(self, inFlight: int) -> bool:
+        return self.pipelined and inFlight >= self.size
+
+    def ordered(self, rtt: float) -> bool:
+        """
+        Revise the window with the round trip time of an ordered batch.
+
+        :param rtt: seconds from sending the PRE-PREPARE to ordering it
+        :return: whether the window changed
+        """
+        if not self.pipelined:
+            return False
+        self.rtt = rtt if self.rtt is None else 0.875 * self.rtt + 0.125 * rtt
+        self.minRtt = rtt if self.minRtt is None else min(self.minRtt, rtt)
+        self._orderedSinceChange += 1
+        if self._orderedSinceChange < self._size:
+            return False
+
+        size = self._size
+        if self.rtt > self.minRtt * self.config.InFlightRttFactor:
+            size = max(size // 2, self.config.Min3PCInFlight)
+            self.slowStart = False
+            self.minRtt = None
+        elif self.slowStart:
+            size = min(size * 2, self.maxSize)
+        else:
+            size = min(size + 1, self.maxSize)
+        self._orderedSinceChange = 0
+        changed = size != self._size
+        self._size = size
+        return changed
+
+    def metrics(self) -> Dict[str, object]:
+        return {
+            "pipelined": self.pipelined,
+            "inFlightWindow": self.size,
+            "rtt": self.rtt
+        }
@@ -3,7 +3,7 @@ Clients are authenticated with a digital signature.
 """
 import base58
 from abc import abstractmethod
-from typing import Dict
+from typing import Dict, Tuple
 
 from plenum.common.log import getlogger
 
@@ -13,7 +13,8 @@ from plenum.common.exceptions import InvalidSignature, EmptySignature, \
     SigningException, InvalidSignatureFormat, UnknownIdentifier
 from plenum.common.signing import serializeMsg
 from plenum.common.types import f
-from plenum.common.verifier import DidVerifier
+from plenum.common.config_util import getConfig
+from plenum.common.verifier import VerifierCache
 
 logger = getlogger()
 
@@ -65,10 +66,48 @@ class ClientAuthNr:
 
 
 class NaclAuthNr(ClientAuthNr):
+    def __init__(self, verifierCacheSize: int=None):
+        """
+        :param verifierCacheSize: number of client verifiers to cache,
+            `ClientVerifierCacheSize` if not given
+        """
+        if verifierCacheSize is None:
+            verifierCacheSize = getConfig().ClientVerifierCacheSize
+        self.verifierCache = VerifierCache(verifierCacheSize)
+
     def authenticate(self,
                      msg: Dict,
                      identifier: str = None,
                      signature: str = None) -> str:
+        identifier, verkey, sig, ser = \
+            self.verificationData(msg, identifier, signature)
+        try:
+            vr = self.verifierCache.get(identifier, verkey)
+            isVerified = vr.verify(sig, ser)
+            if not isVerified:
+                raise InvalidSignature
+        except SigningException as e:
+            raise e
+        except Exception as ex:
+            raise CouldNotAuthenticate from ex
+        return identifier
+
+    def verificationData(self,
+                         msg: Dict,
+                         identifier: str = None,
+                         signature: str = None) -> Tuple[str, str, bytes,
+                                                         bytes]:
+        """
+        Get what is needed to verify the client's signature on the message,
+        without verifying it.
+
+        :param identifier: see `authenticate`
+        :param signature: see `authenticate`
+        :param msg: the message to authenticate
+        :return: the identifier, the verkey, the decoded signature and the
+            serialized message; an exception of type SigningException is
+            raised if any of them cannot be found
+        """
         try:
             if not signature:
                 try:
@@ -92,15 +131,11 @@ class NaclAuthNr(ClientAuthNr):
                 raise InvalidSignatureFormat from ex
             ser = self.serializeForSig(msg)
             verkey = self.getVerkey(identifier)
-            vr = DidVerifier(verkey, identifier=identifier)
-            isVerified = vr.verify(sig, ser)
-            if not isVerified:
-                raise InvalidSignature
         except SigningException as e:
             raise e
         except Exception as ex:
             raise CouldNotAuthenticate from ex
-        return identifier
+        return identifier, verkey, sig, ser
 
     @abstractmethod
     def addClient(self, identifier, verkey, role=None):
@@ -120,7 +155,8 @@ class SimpleAuthNr(NaclAuthNr):
     secure system.
     """
 
-    def __init__(self):
+    def __init__(self, verifierCacheSize: int=None):
+        super().__init__(verifierCacheSize)
         # key: some identifier, value: verification key
         self.clients = {}  # type: Dict[str, Dict]
 
@@ -128,6 +164,8 @@ class SimpleAuthNr(NaclAuthNr):
         if identifier in self.clients:
             # raise RuntimeError("client already added")
             logger.error("client already added")
+        # A verifier cached for the identifier may be for an older verkey
+        self.verifierCache.invalidate(identifier)
         self.clients[identifier] = {
             "verkey": verkey,
             "role": role
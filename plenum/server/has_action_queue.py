@@ -37,6 +37,25 @@ class HasActionQueue:
             self.actionQueue.append((action, self.aid))
         return self.aid
 
+    def _cancel(self, aid: int):
+        """
+        Cancel the scheduled action with id `aid` if it has not run yet.
+
+        :param aid: the id returned when the action was scheduled
+        """
+        for d in list(self.aqStash):
+            if d[1][1] == aid:
+                logger.debug("{} cancelling action {} with id {}".
+                             format(self, d[1][0], aid))
+                self.aqStash.remove(d)
+                return
+        for action in list(self.actionQueue):
+            if action[1] == aid:
+                logger.debug("{} cancelling action {} with id {}".
+                             format(self, action[0], aid))
+                self.actionQueue.remove(action)
+                return
+
     def _serviceActions(self) -> int:
         """
         Run all pending actions in the action queue.
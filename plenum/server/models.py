@@ -1,12 +1,88 @@
 """
 Some model objects used in Plenum protocol.
 """
-from typing import NamedTuple, Set, Tuple
+from hashlib import sha256
+from typing import NamedTuple, Set, Tuple, List, Optional, Iterator, \
+    Iterable
+
+from sortedcontainers import SortedDict
+
+from plenum.common.types import Commit, Prepare, PrePrepare
+
+
+class VoterIndex:
+    """
+    Assigns small integer indexes to voter names, in the order the voters
+    are first seen. An index is assigned once for each member of the pool
+    and is shared by all the votes tracked with it.
+    """
+
+    def __init__(self):
+        self._indexes = {}  # type: Dict[str, int]
+        self._names = []    # type: List[str]
+
+    def __len__(self):
+        return len(self._names)
+
+    def indexOf(self, name: str) -> int:
+        """
+        Return the index of the voter, assigning one if the voter is new
+        """
+        index = self._indexes.get(name)
+        if index is None:
+            index = len(self._names)
+            self._indexes[name] = index
+            self._names.append(name)
+        return index
+
+    def get(self, name: str) -> Optional[int]:
+        return self._indexes.get(name)
+
+    def nameOf(self, index: int) -> str:
+        return self._names[index]
+
+
+class VoterSet:
+    """
+    Set of voter names kept as a bitmask over the indexes of a `VoterIndex`.
+    Supports the set operations used on voters: `add`, `in`, `len` and
+    iteration.
+    """
+    __slots__ = ('index', 'bits')
+
+    def __init__(self, index: VoterIndex, voters: Iterable[str]=()):
+        self.index = index
+        self.bits = 0
+        for voter in voters:
+            self.add(voter)
+
+    def add(self, voter: str):
+        self.bits |= 1 << self.index.indexOf(voter)
+
+    def __contains__(self, voter: str) -> bool:
+        i = self.index.get(voter)
+        return i is not None and bool(self.bits >> i & 1)
+
+    def __len__(self) -> int:
+        return bin(self.bits).count("1")
+
+    def __iter__(self) -> Iterator[str]:
+        bits, i = self.bits, 0
+        while bits:
+            if bits & 1:
+                yield self.index.nameOf(i)
+            bits >>= 1
+            i += 1
+
+    def __eq__(self, other):
+        return set(self) == set(other)
+
+    def __repr__(self):
+        return "{}({})".format(self.__class__.__name__, set(self))
 
-from plenum.common.types import Commit, Prepare
 
 ThreePhaseVotes = NamedTuple("ThreePhaseVotes", [
-    ("voters", Set[str])])
+    ("voters", VoterSet)])
 
 
 InsChgVotes = NamedTuple("InsChg", [
@@ -16,6 +92,13 @@ InsChgVotes = NamedTuple("InsChg", [
 
 class TrackedMsgs(dict):
 
+    def __init__(self, voterIndex: VoterIndex=None):
+        super().__init__()
+        # Index of voters shared by the votes of all messages, so that votes
+        # are kept as bitmasks
+        self.voterIndex = voterIndex if voterIndex is not None else \
+            VoterIndex()
+
     def newVoteMsg(self, msg):
         raise NotImplementedError
 
@@ -51,7 +134,7 @@ class Prepares(TrackedMsgs):
     """
 
     def newVoteMsg(self, msg):
-        return ThreePhaseVotes(set())
+        return ThreePhaseVotes(VoterSet(self.voterIndex))
 
     def getKey(self, prepare):
         return prepare.viewNo, prepare.ppSeqNo
@@ -88,7 +171,7 @@ class Commits(TrackedMsgs):
     """
 
     def newVoteMsg(self, msg):
-        return ThreePhaseVotes(set())
+        return ThreePhaseVotes(VoterSet(self.voterIndex))
 
     def getKey(self, commit):
         return commit.viewNo, commit.ppSeqNo
@@ -142,3 +225,133 @@ class InstanceChanges(TrackedMsgs):
 
     def hasQuorum(self, viewNo: int, f: int) -> bool:
         return self.hasEnoughVotes(viewNo, 2 * f + 1)
+
+
+class ThreePCLogEntry:
+    """
+    3 phase commit state of a single 3 phase key: the PRE-PREPARE, the
+    PREPARE and COMMIT votes for it and whether it has been ordered
+    """
+    __slots__ = ('prePrepare', 'prepares', 'commits', 'ordered')
+
+    def __init__(self):
+        self.prePrepare = None  # type: Optional[PrePrepare]
+        self.prepares = None    # type: Optional[ThreePhaseVotes]
+        self.commits = None     # type: Optional[ThreePhaseVotes]
+        self.ordered = False
+
+
+class OrderedKeys:
+    """
+    Read only view of the ordered 3 phase keys of a `ThreePCLog`
+    """
+
+    def __init__(self, log: 'ThreePCLog'):
+        self.log = log
+
+    def __len__(self):
+        return self.log.orderedCount
+
+    def __contains__(self, key):
+        return self.log.isOrdered(key)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        return (key for key, entry in self.log.items() if entry.ordered)
+
+
+class ThreePCLog:
+    """
+    3 phase commit state of a replica kept in the order of the 3 phase keys,
+    i.e. (viewNo, ppSeqNo). Since pre-prepare sequence numbers keep
+    increasing across views, the entries covered by a stable checkpoint are
+    a prefix of the log and are removed in time proportional to their number.
+    """
+
+    def __init__(self):
+        self._entries = SortedDict()    # type: SortedDict[Tuple[int, int],
+        # ThreePCLogEntry]
+        self.orderedCount = 0
+
+        # 3 phase key that was ordered last
+        self.lastOrdered = None     # type: Optional[Tuple[int, int]]
+
+        self.ordered = OrderedKeys(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key) -> Optional[ThreePCLogEntry]:
+        return self._entries.get(key)
+
+    def items(self):
+        return self._entries.items()
+
+    def entry(self, key) -> ThreePCLogEntry:
+        """
+        Return the entry for the 3 phase key, adding it if not present
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = ThreePCLogEntry()
+            self._entries[key] = entry
+        return entry
+
+    def addPrePrepare(self, pp: PrePrepare):
+        self.entry((pp.viewNo, pp.ppSeqNo)).prePrepare = pp
+
+    def addPrepares(self, key, votes: ThreePhaseVotes):
+        self.entry(key).prepares = votes
+
+    def addCommits(self, key, votes: ThreePhaseVotes):
+        self.entry(key).commits = votes
+
+    def markOrdered(self, key):
+        entry = self.entry(key)
+        if not entry.ordered:
+            entry.ordered = True
+            self.orderedCount += 1
+        self.lastOrdered = key
+
+    def isOrdered(self, key) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.ordered
+
+    def truncate(self, tillSeqNo: int) \
+            -> List[Tuple[Tuple[int, int], ThreePCLogEntry]]:
+        """
+        Remove and return the entries with pre-prepare sequence number less
+        than or equal to `tillSeqNo`
+        """
+        removed = []
+        while self._entries:
+            key, entry = self._entries.peekitem(0)
+            if key[1] > tillSeqNo:
+                break
+            self._entries.popitem(0)
+            if entry.ordered:
+                self.orderedCount -= 1
+            removed.append((key, entry))
+        return removed
+
+
+class RunningDigest:
+    """
+    Digest of a sequence of digests, folded in one digest at a time so that
+    nothing but a hash state and a count is kept however long the sequence.
+    Used for the digests of the batches ordered in a checkpoint.
+    """
+    __slots__ = ('_hash', 'count')
+
+    def __init__(self):
+        self._hash = sha256()
+        self.count = 0
+
+    def add(self, digest: str):
+        self._hash.update(digest.encode())
+        self.count += 1
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
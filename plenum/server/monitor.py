@@ -107,6 +107,10 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
         #  value is a tuple of ordering time and latency of a request
         self.latenciesByBackupsInLast = {}
 
+        # Batch size and wait chosen by the primary replica of each protocol
+        # instance on this node. Key is the instance id
+        self.batchingChoices = {}   # type: Dict[int, Dict[str, object]]
+
         # Monitoring suspicious spikes in cluster throughput
         self.clusterThroughputSpikeMonitorData = {
             'value': 0,
@@ -153,7 +157,8 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
             ("master throughput", masterThrp),
             ("total requests", self.totalRequests),
             ("avg backup throughput", backupThrp),
-            ("master throughput ratio", r)]
+            ("master throughput ratio", r),
+            ("3PC batching", self.batchingChoices)]
         return m
 
     @property
@@ -480,6 +485,25 @@ class Monitor(HasActionQueue, PluginLoaderHelper):
 
         return self.mean(backupLatencies)
 
+    def getOrderingLatency(self, instId: int) -> float:
+        """
+        Return the average latency of the requests ordered by the protocol
+        instance in the last `LatencyWindowSize` seconds
+        """
+        if instId == self.instances.masterId:
+            return self.masterLatency
+        now = time.perf_counter()
+        return self.mean([l for t, l in
+                          self.latenciesByBackupsInLast.get(instId, [])
+                          if now - t <= config.LatencyWindowSize])
+
+    def batchingChanged(self, instId: int, choices: Dict[str, object]):
+        """
+        Record the batch size and wait chosen by the primary replica of a
+        protocol instance.
+        """
+        self.batchingChoices[instId] = choices
+
     def sendLatencies(self):
         logger.debug("{} sending latencies".format(self))
         utcTime = datetime.utcnow()
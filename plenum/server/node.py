@@ -23,15 +23,18 @@ from ledger.stores.hash_store import HashStore
 from ledger.stores.memory_hash_store import MemoryHashStore
 from ledger.util import F
 from plenum.client.wallet import Wallet
+from plenum.common.compression import SupportedCompressions, ZLIB, \
+    compressMsg
 from plenum.common.exceptions import SuspiciousNode, SuspiciousClient, \
-    MissingNodeOp, InvalidNodeOp, InvalidNodeMsg, InvalidClientMsgType, \
+    InvalidNodeMsgField, InvalidClientMsgType, \
     InvalidClientOp, InvalidClientRequest, BaseExc, \
     InvalidClientMessageException, RaetKeysNotFoundException as REx, BlowUp, \
-    UnauthorizedClientRequest
+    UnauthorizedClientRequest, InvalidSignature, CouldNotAuthenticate
 from plenum.common.has_file_storage import HasFileStorage
 from plenum.common.ledger_manager import LedgerManager
 from plenum.common.log import getlogger
 from plenum.common.motor import Motor
+from plenum.common.msg_decoder import decodeNodeMsg, parseBatchedMsg
 from plenum.common.plugin_helper import loadPlugins
 from plenum.common.raet import isLocalKeepSetup
 from plenum.common.ratchet import Ratchet
@@ -52,7 +55,9 @@ from plenum.common.types import Propagate, \
     HS_FILE, NODE_HASH_STORE_SUFFIX, LedgerStatus, ConsistencyProof, \
     CatchupReq, CatchupRep, CLIENT_STACK_SUFFIX, \
     PLUGIN_TYPE_VERIFICATION, PLUGIN_TYPE_PROCESSING, PoolLedgerTxns, \
-    ConsProofRequest, ElectionType, ThreePhaseType, Checkpoint, ThreePCState
+    ConsProofRequest, ElectionType, ThreePhaseType, Checkpoint, ThreePCState, \
+    PropagateDigest, RequestFetch, RequestFetchRep, TaggedTupleBase, \
+    MsgCodecs, SnapshotReq, SnapshotChunk
 from plenum.common.request import Request
 from plenum.common.util import MessageProcessor, friendlyEx, getMaxFailures, \
     rawToFriendly
@@ -68,7 +73,8 @@ from plenum.server import primary_elector
 from plenum.server import replica
 from plenum.server.blacklister import Blacklister
 from plenum.server.blacklister import SimpleBlacklister
-from plenum.server.client_authn import ClientAuthNr, SimpleAuthNr
+from plenum.server.client_authn import ClientAuthNr, NaclAuthNr, \
+    SimpleAuthNr
 from plenum.server.has_action_queue import HasActionQueue
 from plenum.server.instances import Instances
 from plenum.server.models import InstanceChanges
@@ -79,7 +85,10 @@ from plenum.server.pool_manager import HasPoolManager, TxnPoolManager, \
 from plenum.server.primary_decider import PrimaryDecider
 from plenum.server.primary_elector import PrimaryElector
 from plenum.server.propagator import Propagator
+from plenum.server.replica_worker import ReplicaProxy
 from plenum.server.router import Router
+from plenum.server.sig_verifier import PooledSigVerifier
+from plenum.server.stash import MsgStash
 from plenum.server.suspicion_codes import Suspicions
 from plenum.server.notifier_plugin_manager import notifierPluginTriggerEvents, \
     PluginManager
@@ -173,6 +182,13 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self.nodeInBox = deque()
         self.clientInBox = deque()
 
+        # Verifies signatures of client requests and PROPAGATEs in a pool of
+        # worker processes, None if they are verified in the node's process
+        self.sigVerifier = PooledSigVerifier(
+            self.config.SigVerificationWorkers,
+            self.config.SigVerificationBatchSize) \
+            if self.config.PooledSigVerification else None
+
         self.setF()
 
         self.replicas = []  # type: List[replica.Replica]
@@ -198,7 +214,11 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self.msgsToElector = deque()
 
         nodeRoutes = [(Propagate, self.processPropagate),
-                      (InstanceChange, self.processInstanceChange)]
+                      (PropagateDigest, self.processPropagateDigest),
+                      (RequestFetch, self.processRequestFetch),
+                      (RequestFetchRep, self.processRequestFetchRep),
+                      (InstanceChange, self.processInstanceChange),
+                      (MsgCodecs, self.processMsgCodecs)]
 
         nodeRoutes.extend((msgTyp, self.sendToElector) for msgTyp in
                           [Nomination, Primary, Reelection])
@@ -251,14 +271,16 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         # This controls which message types are excluded from signature
         # verification. These are still subject to RAET's signature verification
         # but client signatures will not be checked on these. Expressly
-        # prohibited from being in this is ClientRequest and Propagation,
-        # which both require client signature verification
+        # prohibited from being in this is ClientRequest, Propagation and
+        # RequestFetchRep, which all require client signature verification
         self.authnWhitelist = (Nomination, Primary, Reelection,
                                Batch,
                                PrePrepare, Prepare,
                                Commit, InstanceChange, LedgerStatus,
                                ConsistencyProof, CatchupReq, CatchupRep,
-                               ConsProofRequest, Checkpoint, ThreePCState)
+                               ConsProofRequest, Checkpoint, ThreePCState,
+                               PropagateDigest, RequestFetch, MsgCodecs,
+                               SnapshotReq, SnapshotChunk)
 
         # Map of request identifier, request id to client name. Used for
         # dispatching the processed requests to the correct client remote
@@ -286,15 +308,20 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             (ConsistencyProof, self.ledgerManager.processConsistencyProof),
             (ConsProofRequest, self.ledgerManager.processConsistencyProofReq),
             (CatchupReq, self.ledgerManager.processCatchupReq),
-            (CatchupRep, self.ledgerManager.processCatchupRep)
+            (CatchupRep, self.ledgerManager.processCatchupRep),
+            (SnapshotReq, self.ledgerManager.processSnapshotReq),
+            (SnapshotChunk, self.ledgerManager.processSnapshotChunk)
         ])
 
-        self.nodeMsgRouter = Router(*nodeRoutes)
+        self.nodeMsgRouter = Router(*nodeRoutes,
+                                    collectStats=self.config.RouterStats)
 
         self.clientMsgRouter = Router(
             (Request, self.processRequest),
             (LedgerStatus, self.ledgerManager.processLedgerStatus),
             (CatchupReq, self.ledgerManager.processCatchupReq),
+            (MsgCodecs, self.processClientMsgCodecs),
+            collectStats=self.config.RouterStats
         )
 
         # Ordered requests received from replicas while the node was not
@@ -309,9 +336,10 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         # Any messages that are intended for protocol instances not created.
         # Helps in cases where a new protocol instance have been added by a
         # majority of nodes due to joining of a new node, but some slow nodes
-        # are not aware of it. Key is instance id and value is a deque
-        # TODO: Do GC for `msgsForFutureReplicas`
-        self.msgsForFutureReplicas = {}
+        # are not aware of it. Indexed by instance id, with a limit on the
+        # number of messages stashed from each node
+        self.msgsForFutureReplicas = \
+            MsgStash(self.config.MaxStashedMsgsPerSender)
 
         self.adjustReplicas()
 
@@ -520,8 +548,17 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
 
         self.reset()
 
+        for r in self.replicas:
+            if isinstance(r, ReplicaProxy):
+                r.stop()
+
+        if self.sigVerifier is not None:
+            self.sigVerifier.stop()
+
         # Stop the txn store
         self.primaryStorage.stop()
+        self.ledgerManager.closeOffsetIndexes()
+        self.ledgerManager.catchupVerifier.stop()
 
         self.nodestack.stop()
         self.clientstack.stop()
@@ -600,6 +637,9 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         :return: the number of messages successfully processed
         """
         c = await self.clientstack.service(limit)
+        if self.sigVerifier is not None:
+            self.sigVerifier.flush()
+            c += self.serviceSigVerifier()
         await self.processClientInBox()
         return c
 
@@ -654,8 +694,12 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                         rid = self.nodestack.getRemote(n).uid
                         self.send(InstanceChange(self.viewNo), rid)
 
+        for n in left:
+            self.nodestack.setAnnouncedCodecs(n, None)
+
         # Send ledger status whether ready (connected to enough nodes) or not
         for n in joined:
+            self.sendMsgCodecs(n)
             self.sendPoolLedgerStatus(n)
             # Send the domain ledger status only when it has discovered enough
             # peers otherwise very few peers will know that this node is lagging
@@ -684,8 +728,15 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         logger.debug("{} sending new node info {} to all clients".format(self,
                                                                          txn))
         msg = PoolLedgerTxns(txn)
-        self.clientstack.transmitToClients(msg,
-                                           list(self.clientstack.connectedClients))
+        clients = list(self.clientstack.connectedClients)
+        if self.config.CompressLedgerMsgs:
+            compressed = compressMsg(msg, self.config.CompressionThreshold)
+            if compressed is not msg:
+                decompressing = [c for c in clients
+                                 if self.clientstack.canDecode(c, ZLIB)]
+                self.clientstack.transmitToClients(compressed, decompressing)
+                clients = [c for c in clients if c not in decompressing]
+        self.clientstack.transmitToClients(msg, clients)
 
     @property
     def clientStackName(self):
@@ -741,11 +792,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         return newReplicas
 
     def processStashedMsgsForReplica(self, instId: int):
-        if instId not in self.msgsForFutureReplicas:
-            return
-        i = 0
-        while self.msgsForFutureReplicas[instId]:
-            msg, frm = self.msgsForFutureReplicas[instId].popleft()
+        msgs = self.msgsForFutureReplicas.pop(instId)
+        for msg, frm in msgs:
             if isinstance(msg, ElectionType):
                 self.sendToElector(msg, frm)
             elif isinstance(msg, ThreePhaseType):
@@ -754,7 +802,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                 self.discard(msg, reason="Unknown message type for replica id"
                              .format(instId), logMethod=logger.warn)
         logger.debug("{} processed {} stashed msgs for replica {}".
-                     format(self, i, instId))
+                     format(self, len(msgs), instId))
 
     def decidePrimaries(self):
         """
@@ -772,8 +820,11 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         :param instId: protocol instance number
         :param isMaster: does this replica belong to the master protocol
             instance?
-        :return: a new instance of Replica
+        :return: a new instance of Replica, or of ReplicaProxy for a backup
+            protocol instance if `BackupReplicasInWorkers` is enabled
         """
+        if not isMaster and self.config.BackupReplicasInWorkers:
+            return ReplicaProxy(self, instId)
         return replica.Replica(self, instId, isMaster)
 
     def addReplica(self):
@@ -802,6 +853,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         replica = self.replicas[-1]
         self.replicas = self.replicas[:-1]
         self.msgsToReplicas = self.msgsToReplicas[:-1]
+        if isinstance(replica, ReplicaProxy):
+            replica.stop()
         self.monitor.addInstance()
         logger.display("{} removed replica {} from instance {}".
                        format(self, replica, replica.instId),
@@ -944,11 +997,13 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         if instId is None or not isinstance(instId, int) or instId < 0:
             return False
         if instId >= len(self.msgsToReplicas):
-            if instId not in self.msgsForFutureReplicas:
-                self.msgsForFutureReplicas[instId] = deque()
-            self.msgsForFutureReplicas[instId].append((msg, frm))
-            logger.debug("{} queueing message {} for future protocol "
-                         "instance {}".format(self, msg, instId))
+            if self.msgsForFutureReplicas.add(instId, msg, frm):
+                logger.debug("{} queueing message {} for future protocol "
+                             "instance {}".format(self, msg, instId))
+            else:
+                self.discard(msg, reason="too many messages from {} queued "
+                                         "for future protocol instances".
+                             format(frm), logMethod=logger.warning)
             return False
         return True
 
@@ -1020,12 +1075,12 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         try:
             vmsg = self.validateNodeMsg(wrappedMsg)
             if vmsg:
-                logger.info("{} msg validated {}".format(self, wrappedMsg),
-                            extra={"tags": ["node-msg-validation"]})
+                logger.debug("{} msg validated {}".format(self, wrappedMsg),
+                             extra={"tags": ["node-msg-validation"]})
                 self.unpackNodeMsg(*vmsg)
             else:
-                logger.info("{} non validated msg {}".format(self, wrappedMsg),
-                            extra={"tags": ["node-msg-validation"]})
+                logger.debug("{} non validated msg {}".format(self, wrappedMsg),
+                             extra={"tags": ["node-msg-validation"]})
         except SuspiciousNode as ex:
             self.reportSuspiciousNodeEx(ex)
         except Exception as ex:
@@ -1046,17 +1101,20 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                          .format(frm), logger.info)
             return None
 
-        op = msg.pop(OP_FIELD_NAME, None)
-        if not op:
-            raise MissingNodeOp
-        cls = TaggedTuples.get(op, None)
-        if not cls:
-            raise InvalidNodeOp(op)
-        try:
-            cMsg = cls(**msg)
-        except Exception as ex:
-            raise InvalidNodeMsg from ex
+        if isinstance(msg, TaggedTupleBase):
+            # Decoded along with the batch it was received in
+            cMsg = msg
+        else:
+            try:
+                cMsg = decodeNodeMsg(msg)
+            except InvalidNodeMsgField as ex:
+                self.discard(ex.msg, ex.reason)
+                return None
         try:
+            if self.sigVerifier is not None and isinstance(cMsg, Propagate) \
+                    and not self.isPropagatedReqVerified(cMsg.request) \
+                    and self.deferSignatureVerification(cMsg, frm):
+                return None
             self.verifySignature(cMsg)
         except BaseExc as ex:
             raise SuspiciousNode(frm, ex, cMsg) from ex
@@ -1162,7 +1220,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             cls = TaggedTuples.get(op, None)
             if not cls:
                 raise InvalidClientOp(op, msg.get(f.REQ_ID.nm))
-            if cls not in (Batch, LedgerStatus, CatchupReq):
+            if cls not in (Batch, LedgerStatus, CatchupReq, MsgCodecs):
                 raise InvalidClientMsgType(cls, msg.get(f.REQ_ID.nm))
         else:
             raise InvalidClientRequest(msg.get(f.IDENTIFIER.nm),
@@ -1173,6 +1231,9 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             raise InvalidClientRequest from ex
 
         if self.isSignatureVerificationNeeded(msg):
+            if self.sigVerifier is not None and \
+                    self.deferSignatureVerification(cMsg, frm):
+                return None
             self.verifySignature(cMsg)
             # Suspicions should only be raised when lot of sig failures are
             # observed
@@ -1196,7 +1257,7 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         """
         if isinstance(msg, Batch):
             for m in msg.messages:
-                self.handleOneClientMsg((m, frm))
+                self.handleOneClientMsg((parseBatchedMsg(m), frm))
         else:
             self.postToClientInBox(msg, frm)
 
@@ -1261,6 +1322,38 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         self.reqsFromCatchupReplies.add((txn.get(f.IDENTIFIER.nm),
                                          txn.get(f.REQ_ID.nm)))
 
+    def sendMsgCodecs(self, nodeName: str):
+        """
+        Announce the codecs of batched messages this node can decode to the
+        node
+        """
+        rid = self.nodestack.getRemote(nodeName).uid
+        codecs = self.nodestack.supportedCodecs + list(SupportedCompressions)
+        self.send(MsgCodecs(codecs), rid)
+
+    def processMsgCodecs(self, msg: MsgCodecs, frm):
+        """
+        Use the codec of this node for the batched messages sent to the node
+        which sent the MSG_CODECS if it can decode them, and compress large
+        messages for it if it can decompress them
+        """
+        if not isinstance(msg.codecs, list):
+            self.discard(msg, "codecs are not a list", logger.debug)
+            return
+        self.nodestack.setAnnouncedCodecs(frm, msg.codecs)
+        logger.debug("{} using {} codec for messages to {}".
+                     format(self, self.nodestack.codecFor(frm).name, frm))
+
+    def processClientMsgCodecs(self, msg: MsgCodecs, frm):
+        """
+        Compress large messages for the client which sent the MSG_CODECS if
+        it can decompress them
+        """
+        if not isinstance(msg.codecs, list):
+            self.discard(msg, "codecs are not a list", logger.debug)
+            return
+        self.clientstack.setAnnouncedCodecs(frm, msg.codecs)
+
     def sendPoolLedgerStatus(self, nodeName):
         self.sendLedgerStatus(nodeName, 0)
 
@@ -1351,12 +1444,88 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         if not self.isProcessingReq(*request.key):
             self.startedProcessingReq(*request.key, clientName)
         self.requests.addPropagate(request, frm)
+        # PROPAGATEs are processed only once their signature is verified
+        self.requests.markVerified(request)
 
         # # Only propagate if the node is participating in the consensus process
         # # which happens when the node has completed the catchup process
         self.propagate(request, clientName)
         self.tryForwarding(request)
 
+    def processPropagateDigest(self, msg: PropagateDigest, frm):
+        """
+        Process a PROPAGATE_DIGEST. Forward the request if enough nodes agree
+        on its digest, if the node does not have the request fetch it from one
+        of them.
+
+        :param msg: the PROPAGATE_DIGEST
+        :param frm: the name of the node which sent this `msg`
+        """
+        logger.debug("{} received propagated digest: {}".format(self, msg))
+        key = (msg.identifier, msg.reqId)
+        if not self.isProcessingReq(*key):
+            self.startedProcessingReq(*key, msg.senderClient)
+        state = self.requests.addPropagateDigest(msg, frm)
+        if state.request is not None:
+            self.tryForwarding(state.request)
+        else:
+            self.fetchRequest(key)
+
+    def processRequestFetch(self, msg: RequestFetch, frm):
+        """
+        Send the requested client request to the node fetching it if this
+        node has a request with the same digest.
+
+        :param msg: the REQUEST_FETCH
+        :param frm: the name of the node which sent this `msg`
+        """
+        key = (msg.identifier, msg.reqId)
+        req = self.requests[key].bodyWithDigest(msg.digest) \
+            if key in self.requests else None
+        if req is None:
+            self.discard(msg, "{} does not have the request".format(self),
+                         logger.debug)
+            return
+        if not self.isProcessingReq(*key):
+            self.discard(msg, "{} is not processing the request".format(self),
+                         logger.debug)
+            return
+        rep = RequestFetchRep(req.__getstate__(), self.requestSender[key])
+        self.send(rep, self.nodestack.getRemote(frm).uid)
+
+    def processRequestFetchRep(self, msg: RequestFetchRep, frm):
+        """
+        Process a client request fetched from another node, it is processed
+        like a PROPAGATE of the request once it matches the digest the nodes
+        agree on.
+
+        :param msg: the REQUEST_FETCH_REP
+        :param frm: the name of the node which sent this `msg`
+        """
+        request = Request(**msg.request)
+        key = request.key
+        state = self.requests.get(key)
+        if state is None or frm not in state.fetchedFrom:
+            self.discard(msg, "request was not fetched from {}".format(frm),
+                         logger.debug)
+            return
+        if state.request is not None:
+            self.discard(msg, "{} already has the request".format(self),
+                         logger.trace)
+            return
+        if request.digest != state.votedDigest(self.f + 1):
+            raise SuspiciousNode(frm, Suspicions.FETCHED_REQ_DIGEST_WRONG,
+                                 msg)
+        clientName = msg.senderClient
+        if not self.isProcessingReq(*key):
+            self.startedProcessingReq(*key, clientName)
+        self.requests.add(request)
+        # REQUEST_FETCH_REPs are processed only once their signature is
+        # verified
+        self.requests.markVerified(request)
+        self.propagate(request, clientName)
+        self.tryForwarding(request)
+
     def startedProcessingReq(self, identifier, reqId, frm):
         self.requestSender[identifier, reqId] = frm
 
@@ -1366,49 +1535,73 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
     def doneProcessingReq(self, identifier, reqId):
         self.requestSender.pop((identifier, reqId))
 
-    def processOrdered(self, ordered: Ordered, retryNo: int = 0):
+    def processOrdered(self, ordered: Ordered):
         """
-        Process and orderedRequest.
+        Process an ordered batch of requests.
 
-        Execute client request with retries if client request hasn't yet reached
-        this node but corresponding PROPAGATE, PRE-PREPARE, PREPARE and
-        COMMIT request did
+        Execute the client requests of the batch in the order they appear in
+        the batch, skipping the requests which were already received in
+        catchup replies
 
-        :param ordered: an orderedRequest
-        :param retryNo: the retry number used in recursion
-        :return: True if successful, None otherwise
+        :param ordered: an ordered batch of requests
+        :return: True if the batch was ordered by the master protocol instance,
+        None otherwise
         """
 
-        instId, viewNo, identifier, reqId, ppTime = tuple(ordered)
+        instId, viewNo, reqIdr, ppSeqNo, ppTime = tuple(ordered)
+        byMaster = instId == self.instances.masterId
 
-        self.monitor.requestOrdered(identifier,
-                                    reqId,
-                                    instId,
-                                    byMaster=(instId == self.instances.masterId))
+        for identifier, reqId in reqIdr:
+            self.monitor.requestOrdered(identifier, reqId, instId,
+                                        byMaster=byMaster)
 
         # Only the request ordered by master protocol instance are executed by
         # the client
-        if instId == self.instances.masterId:
-            key = (identifier, reqId)
-            if key in self.requests:
-                req = self.requests[key].request
-                self.executeRequest(ppTime, req)
-                logger.debug("{} executed client request {} {}".
-                             format(self.name, identifier, reqId))
-            # If the client request hasn't reached the node but corresponding
-            # PROPAGATE, PRE-PREPARE, PREPARE and COMMIT request did,
-            # then retry 3 times
-            elif retryNo < 3:
-                retryNo += 1
-                asyncio.sleep(random.randint(2, 4))
-                self.processOrdered(ordered, retryNo)
-                logger.debug("{} retrying executing client request {} {}".
-                             format(self.name, identifier, reqId))
+        if byMaster:
+            for identifier, reqId in reqIdr:
+                if (identifier, reqId) in self.reqsFromCatchupReplies:
+                    logger.debug("{} not executing client request {} {} "
+                                 "since it was received in catchup replies".
+                                 format(self, identifier, reqId))
+                    continue
+                self.executeOrderedRequest(identifier, reqId, ppTime)
             return True
         else:
             logger.trace("{} got ordered request from backup replica".
                          format(self))
 
+    def executeOrderedRequest(self, identifier: str, reqId: int,
+                              ppTime: float, retryNo: int = 0):
+        """
+        Execute a client request ordered by the master protocol instance.
+
+        Execute client request with retries if client request hasn't yet reached
+        this node but corresponding PROPAGATE, PRE-PREPARE, PREPARE and
+        COMMIT request did
+
+        :param identifier: identifier of the client
+        :param reqId: id of the request
+        :param ppTime: time of the PRE-PREPARE of the batch of the request
+        :param retryNo: the retry number used in recursion
+        """
+        key = (identifier, reqId)
+        if key in self.requests:
+            # A node propagating digests may only have the request it agreed
+            # on with the other nodes
+            req = self.requests[key].request or self.requests[key].finalised
+            self.executeRequest(ppTime, req)
+            logger.debug("{} executed client request {} {}".
+                         format(self.name, identifier, reqId))
+        # If the client request hasn't reached the node but corresponding
+        # PROPAGATE, PRE-PREPARE, PREPARE and COMMIT request did,
+        # then retry 3 times
+        elif retryNo < 3:
+            retryNo += 1
+            asyncio.sleep(random.randint(2, 4))
+            self.executeOrderedRequest(identifier, reqId, ppTime, retryNo)
+            logger.debug("{} retrying executing client request {} {}".
+                         format(self.name, identifier, reqId))
+
     def processEscalatedException(self, ex):
         """
         Process an exception escalated from a Replica
@@ -1578,9 +1771,13 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         """
         if isinstance(msg, self.authnWhitelist):
             return  # whitelisted message types rely on RAET for authn
-        if isinstance(msg, Propagate):
+        if isinstance(msg, (Propagate, RequestFetchRep)):
             typ = 'propagate '
             req = msg.request
+            if self.isPropagatedReqVerified(req):
+                logger.trace("{} skipping verification of already verified "
+                             "request in {}".format(self, msg))
+                return
         else:
             typ = ''
             req = msg
@@ -1594,6 +1791,89 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
                        extra={"cli": True,
                               "tags": ["node-msg-processing"]})
 
+    def isPropagatedReqVerified(self, req) -> bool:
+        """
+        Check whether the request in a PROPAGATE, signature included, is one
+        whose signature this node has already verified.
+        """
+        try:
+            request = Request(**req) if isinstance(req, Mapping) else req
+        except TypeError:
+            return False
+        return self.requests.isVerified(request)
+
+    def deferSignatureVerification(self, msg, frm) -> bool:
+        """
+        Send the signature of the request to be verified by the pool of
+        signature verifiers. The message is processed once verified, see
+        `serviceSigVerifier`.
+
+        :param msg: a client request or a PROPAGATE
+        :param frm: the name of the client or node that sent the message
+        :return: whether the signature was sent to the pool, it is not if the
+            message needs no verification or its authenticator cannot
+            provide what is needed to verify it in another process
+        """
+        if isinstance(msg, self.authnWhitelist):
+            return False
+        req = msg.request if isinstance(msg, Propagate) else msg
+        if not isinstance(req, Mapping):
+            req = req.__getstate__()
+        authNr = self.authNr(req)
+        if not isinstance(authNr, NaclAuthNr):
+            return False
+        self.sigVerifier.add(authNr.verificationData(req), (msg, frm))
+        return True
+
+    def serviceSigVerifier(self) -> int:
+        """
+        Process the messages whose signatures the pool of signature verifiers
+        has verified, in the order they were received.
+
+        :return: the number of messages processed
+        """
+        verified = self.sigVerifier.service()
+        for (msg, frm), isVerified in verified:
+            if isVerified:
+                ex = None
+                self.markSigVerified(msg)
+            elif isVerified is False:
+                ex = InvalidSignature(*self.reqKeyOf(msg))
+            else:
+                ex = CouldNotAuthenticate(*self.reqKeyOf(msg))
+            if isinstance(msg, Propagate):
+                if ex is None:
+                    self.unpackNodeMsg(msg, frm)
+                else:
+                    self.reportSuspiciousNodeEx(SuspiciousNode(frm, ex, msg))
+            elif ex is None:
+                self.unpackClientMsg(msg, frm)
+            else:
+                self.handleInvalidClientMsg(ex, (msg, frm))
+        return len(verified)
+
+    def markSigVerified(self, msg):
+        """
+        Record that the signature of the request in the message has been
+        verified so that the PROPAGATEs of the same request received later
+        are not sent to the pool of signature verifiers.
+
+        :param msg: a client request or a PROPAGATE
+        """
+        req = msg.request if isinstance(msg, Propagate) else msg
+        try:
+            request = Request(**req) if isinstance(req, Mapping) else req
+        except TypeError:
+            return
+        self.requests.markVerified(request)
+
+    @staticmethod
+    def reqKeyOf(msg) -> Tuple[str, int]:
+        req = msg.request if isinstance(msg, Propagate) else msg
+        if not isinstance(req, Mapping):
+            req = req.__getstate__()
+        return req.get(f.IDENTIFIER.nm), req.get(f.REQ_ID.nm)
+
     def authNr(self, req):
         return self.clientAuthNr
 
@@ -1764,8 +2044,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
         return i
 
     def gotInCatchupReplies(self, msg):
-        key = (getattr(msg, f.IDENTIFIER.nm), getattr(msg, f.REQ_ID.nm))
-        return key in self.reqsFromCatchupReplies
+        return all(tuple(key) in self.reqsFromCatchupReplies
+                   for key in getattr(msg, f.REQ_IDR.nm))
 
     def sync3PhaseState(self):
         for replica in self.replicas:
@@ -2002,7 +2282,8 @@ class Node(HasActionQueue, Motor, Propagator, MessageProcessor, HasFileStorage,
             'baseDir': self.basedirpath,
             'portN': self.nodestack.ha[1],
             'portC': self.clientstack.ha[1],
-            'address': nodeAddress
+            'address': nodeAddress,
+            'outBoxLanes': self.nodestack.outBoxStats()
         }
         return info
 
@@ -56,7 +56,8 @@ class PrimaryElector(PrimaryDecider):
         routerArgs = [(Nomination, self.processNominate),
                       (Primary, self.processPrimary),
                       (Reelection, self.processReelection)]
-        self.inBoxRouter = Router(*routerArgs)
+        self.inBoxRouter = Router(*routerArgs,
+                                  collectStats=node.config.RouterStats)
 
         self.pendingMsgsForViews = {}  # Dict[int, deque]
 
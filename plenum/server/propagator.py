@@ -1,6 +1,9 @@
-from typing import Dict, Tuple, Union
+import time
+from collections import Counter
+from functools import partial
+from typing import Dict, List, Optional, Tuple, Union
 
-from plenum.common.types import Propagate
+from plenum.common.types import Propagate, PropagateDigest, RequestFetch
 from plenum.common.request import Request
 from plenum.common.log import getlogger
 from plenum.common.util import checkIfMoreThanFSameItems
@@ -12,20 +15,60 @@ class ReqState:
     """
     Object to store the state of the request.
     """
-    def __init__(self, request: Request):
+    def __init__(self, request: Optional[Request]):
+        # None until the node gets the request, from the client, a PROPAGATE
+        # or a REQUEST_FETCH_REP
         self.request = request
         self.forwarded = False
         self.propagates = {}
+        # Digests of the request in the PROPAGATE_DIGESTs received, keyed by
+        # the name of the sending node
+        self.digestVotes = {}   # type: Dict[str, str]
+        # Nodes the request has been fetched from and when it was last fetched
+        self.fetchedFrom = set()    # type: Set[str]
+        self.fetchedAt = None
+        # Id of the action fetching the request from another node if the one
+        # asked last does not send it in time
+        self.fetchRetry = None  # type: Optional[int]
         self.finalised = None
+        # Digest and signature of the versions of this request whose
+        # signature has been verified, dropped along with the request state.
+        # The digest of a request does not cover its signature
+        self.verifiedSigs = set()   # type: Set[Tuple[str, str]]
 
     def isFinalised(self, f):
         if self.finalised is None:
-            req = checkIfMoreThanFSameItems([v.__getstate__() for v in
-                                             self.propagates.values()], f)
-            if req:
-                self.finalised = Request.fromState(req)
+            if self.digestVotes:
+                digest = self.votedDigest(f)
+                if digest:
+                    self.finalised = self.bodyWithDigest(digest)
+            else:
+                req = checkIfMoreThanFSameItems([v.__getstate__() for v in
+                                                 self.propagates.values()], f)
+                if req:
+                    self.finalised = Request.fromState(req)
         return self.finalised
 
+    def votedDigest(self, f) -> Optional[str]:
+        """
+        Return the digest of the request that more than `f` nodes agree on,
+        counting both PROPAGATEs and PROPAGATE_DIGESTs, None if there is none.
+        """
+        votes = {sender: req.digest for sender, req in self.propagates.items()}
+        votes.update(self.digestVotes)
+        if not votes:
+            return None
+        digest, count = Counter(votes.values()).most_common(1)[0]
+        return digest if count > f else None
+
+    def bodyWithDigest(self, digest: str) -> Optional[Request]:
+        """
+        Return the request with the given digest if the node has it
+        """
+        for req in [self.request, *self.propagates.values()]:
+            if req is not None and req.digest == digest:
+                return req
+
 
 class Requests(Dict[Tuple[str, int], ReqState]):
     """
@@ -43,6 +86,8 @@ class Requests(Dict[Tuple[str, int], ReqState]):
         key = req.key
         if key not in self:
             self[key] = ReqState(req)
+        elif self[key].request is None:
+            self[key].request = req
         return self[key]
 
     def forwarded(self, req: Request) -> bool:
@@ -68,12 +113,28 @@ class Requests(Dict[Tuple[str, int], ReqState]):
         data = self.add(req)
         data.propagates[sender] = req
 
+    def addPropagateDigest(self, msg: PropagateDigest, sender: str) -> ReqState:
+        """
+        Add the digest in the specified PROPAGATE_DIGEST to the votes for the
+        request.
+
+        :param msg: the PROPAGATE_DIGEST to add
+        :param sender: the name of the node sending the msg
+        """
+        key = (msg.identifier, msg.reqId)
+        if key not in self:
+            self[key] = ReqState(None)
+        data = self[key]
+        data.digestVotes[sender] = msg.digest
+        return data
+
     def votes(self, req) -> int:
         """
         Get the number of propagates for a given reqId and identifier.
         """
         try:
-            votes = len(self[(req.identifier, req.reqId)].propagates)
+            state = self[(req.identifier, req.reqId)]
+            votes = len(state.propagates) + len(state.digestVotes)
         except KeyError:
             votes = 0
         return votes
@@ -90,11 +151,29 @@ class Requests(Dict[Tuple[str, int], ReqState]):
         """
         Check whether the request specified has already been propagated.
         """
-        return req.key in self and sender in self[req.key].propagates
+        return req.key in self and \
+            (sender in self[req.key].propagates or
+             sender in self[req.key].digestVotes)
 
     def isFinalised(self, reqKey: Tuple[str, int]) -> bool:
         return reqKey in self and self[reqKey].finalised
 
+    def markVerified(self, req: Request):
+        """
+        Record that the signature of the request has been verified so that it
+        is not verified again for the PROPAGATEs of the same request.
+        """
+        if req.key in self:
+            self[req.key].verifiedSigs.add((req.digest, req.signature))
+
+    def isVerified(self, req: Request) -> bool:
+        """
+        Check whether the same signature on the same request has already
+        been verified.
+        """
+        return req.key in self and \
+            (req.digest, req.signature) in self[req.key].verifiedSigs
+
     def digest(self, reqKey: Tuple) -> str:
         if reqKey in self and self[reqKey].finalised:
             return self[reqKey].finalised.digest
@@ -121,7 +200,12 @@ class Propagator:
             #  process
             # which happens when the node has completed the catchup process
             if self.isParticipating:
-                propagate = self.createPropagate(request, clientName)
+                if self.config.DigestPropagates:
+                    propagate = PropagateDigest(request.identifier,
+                                                request.reqId, request.digest,
+                                                clientName)
+                else:
+                    propagate = self.createPropagate(request, clientName)
                 logger.display("{} propagating {} request {} from client {}".
                                format(self, request.identifier, request.reqId,
                                       clientName),
@@ -144,6 +228,58 @@ class Propagator:
             request
         return Propagate(request, clientName)
 
+    # noinspection PyUnresolvedReferences
+    def fetchRequest(self, key: Tuple[str, int]):
+        """
+        Fetch a request the node does not have from one of the nodes which
+        agree on its digest. The request is fetched from another node only if
+        the last one asked did not send it within `RequestFetchTimeout`, this
+        is scheduled every time the request is fetched.
+
+        :param key: the identifier and request id of the request
+        """
+        state = self.requests.get(key)
+        if state is None:
+            return
+        if state.request is not None or state.finalised is not None:
+            return
+        digest = state.votedDigest(self.f + 1)
+        if not digest:
+            return
+        if state.fetchedAt is not None and \
+                time.perf_counter() - state.fetchedAt < \
+                self.config.RequestFetchTimeout:
+            return
+        candidates = self.fetchCandidates(state, digest)
+        if not candidates:
+            # Every node was asked, the REQUEST_FETCHes or their replies
+            # might have been lost so the nodes are asked again
+            logger.info("{} asked every node for request {}, asking them "
+                        "again".format(self, key))
+            state.fetchedFrom.clear()
+            candidates = self.fetchCandidates(state, digest)
+        if not candidates:
+            return
+        frm = candidates[0]
+        state.fetchedFrom.add(frm)
+        state.fetchedAt = time.perf_counter()
+        logger.debug("{} fetching request {} from {}".format(self, key, frm))
+        self.send(RequestFetch(*key, digest),
+                  self.nodestack.getRemote(frm).uid)
+        if state.fetchRetry is not None:
+            self._cancel(state.fetchRetry)
+        state.fetchRetry = self._schedule(partial(self.fetchRequest, key),
+                                          self.config.RequestFetchTimeout)
+
+    def fetchCandidates(self, state: ReqState, digest: str) -> List[str]:
+        """
+        Nodes which agree on the digest of the request and have not been
+        asked for it yet
+        """
+        return [sender for sender, d in state.digestVotes.items()
+                if d == digest and sender not in state.fetchedFrom and
+                sender != self.name]
+
     # noinspection PyUnresolvedReferences
     def canForward(self, request: Request) -> bool:
         """
@@ -173,8 +309,12 @@ class Propagator:
         key = request.key
         logger.debug("{} forwarding client request {} to its replicas".
                      format(self, key))
+        state = self.requests[key]
+        if state.fetchRetry is not None:
+            self._cancel(state.fetchRetry)
+            state.fetchRetry = None
         for repQueue in self.msgsToReplicas:
-            repQueue.append(self.requests[key].finalised.reqDigest)
+            repQueue.append(state.finalised.reqDigest)
         self.monitor.requestUnOrdered(*key)
         self.requests.flagAsForwarded(request)
 
@@ -187,6 +327,8 @@ class Propagator:
         :param clientName:
         """
         self.requests.add(request)
+        # Client requests are processed only once their signature is verified
+        self.requests.markVerified(request)
         # # Only propagate if the node is participating in the consensus process
         # # which happens when the node has completed the catchup process
         self.propagate(request, clientName)
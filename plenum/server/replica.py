@@ -2,27 +2,29 @@ import time
 from collections import deque, OrderedDict
 from enum import IntEnum
 from enum import unique
-from typing import Dict
+from hashlib import sha256
+from typing import Dict, List
 from typing import Optional, Any
 from typing import Set
 from typing import Tuple
 
-from orderedset import OrderedSet
-from sortedcontainers import SortedDict
+from sortedcontainers import SortedDict, SortedSet
 
 import plenum.server.node
 from plenum.common.config_util import getConfig
 from plenum.common.exceptions import SuspiciousNode
-from plenum.common.signing import serialize
 from plenum.common.types import PrePrepare, \
     Prepare, Commit, Ordered, ThreePhaseMsg, ThreePhaseKey, ThreePCState, \
     CheckpointState, Checkpoint
 from plenum.common.request import ReqDigest
 from plenum.common.util import MessageProcessor, updateNamedTuple
 from plenum.common.log import getlogger
+from plenum.server.batching import BatchController, InFlightWindow
 from plenum.server.has_action_queue import HasActionQueue
-from plenum.server.models import Commits, Prepares
+from plenum.server.models import Commits, Prepares, ThreePCLog, VoterIndex, \
+    RunningDigest
 from plenum.server.router import Router
+from plenum.server.stash import MsgStash
 from plenum.server.suspicion_codes import Suspicions
 
 logger = getlogger()
@@ -86,12 +88,14 @@ class Replica(HasActionQueue, MessageProcessor):
         routerArgs.append((Checkpoint, self.processCheckpoint))
         routerArgs.append((ThreePCState, self.process3PhaseState))
 
-        self.inBoxRouter = Router(*routerArgs)
+        self.inBoxRouter = Router(*routerArgs,
+                                  collectStats=self.config.RouterStats)
 
         self.threePhaseRouter = Router(
                 (PrePrepare, self.processPrePrepare),
                 (Prepare, self.processPrepare),
-                (Commit, self.processCommit)
+                (Commit, self.processCommit),
+                collectStats=self.config.RouterStats
         )
 
         self.node = node
@@ -119,6 +123,10 @@ class Replica(HasActionQueue, MessageProcessor):
 
         self.isMaster = isMaster
 
+        # A lean replica belongs to a backup protocol instance and keeps
+        # only the 3 phase state of the batches that are not ordered yet
+        self.isLean = not isMaster and self.config.LeanBackupReplicas
+
         # Indicates name of the primary replica of this protocol instance.
         # None in case the replica does not know who the primary of the
         # instance is
@@ -128,12 +136,34 @@ class Replica(HasActionQueue, MessageProcessor):
         # whether it is primary or not
         self.postElectionMsgs = deque()
 
+        # Request digests received by the primary replica that have not been
+        # sent in a PRE-PREPARE yet. They are sent in batches of at most
+        # `Max3PCBatchSize` requests
+        self.reqDigestQueue = deque()   # type: deque[ReqDigest]
+
+        # Time (as per `time.perf_counter`) at which the oldest request
+        # digest in `reqDigestQueue` was received, None if the queue is empty
+        self.batchStartedAt = None      # type: Optional[float]
+
+        # Chooses the size of and the wait for the batches of requests sent
+        # in PRE-PREPAREs
+        self.batchController = BatchController(self.config)
+
+        # Chooses the number of PRE-PREPAREs the primary keeps in flight when
+        # pipelining
+        self.inFlightWindow = InFlightWindow(self.config)
+
+        # Time (as per `time.perf_counter`) at which each PRE-PREPARE sent by
+        # the primary and not yet ordered was sent. Key is the 3 phase key
+        self.prePrepareSentAt = {}  # type: Dict[Tuple[int, int], float]
+
         # PRE-PREPAREs that are waiting to be processed but do not have the
         # corresponding request digest. Happens when replica has not been
         # forwarded the request by the node but is getting 3 phase messages.
         # The value is a list since a malicious entry might send PRE-PREPARE
         # with a different digest and since we dont have the request finalised,
-        # we store all PRE-PPREPARES
+        # we store all PRE-PPREPARES. A PRE-PREPARE for a batch is stored
+        # against each request of the batch that is not yet finalised
         self.prePreparesPendingReqDigest = {}   # type: Dict[Tuple[str, int], List]
 
         # PREPAREs that are stored by non primary replica for which it has not
@@ -152,39 +182,44 @@ class Replica(HasActionQueue, MessageProcessor):
         # Dictionary of sent PRE-PREPARE that are stored by primary replica
         # which it has broadcasted to all other non primary replicas
         # Key of dictionary is a 2 element tuple with elements viewNo,
-        # pre-prepare seqNo and value is a tuple of Request Digest and time
+        # pre-prepare seqNo and value is the PRE-PREPARE
         self.sentPrePrepares = {}
-        # type: Dict[Tuple[int, int], Tuple[Tuple[str, int], float]]
+        # type: Dict[Tuple[int, int], PrePrepare]
 
         # Dictionary of received PRE-PREPAREs. Key of dictionary is a 2
         # element tuple with elements viewNo, pre-prepare seqNo and value is
-        # a tuple of Request Digest and time
+        # the PRE-PREPARE
         self.prePrepares = {}
-        # type: Dict[Tuple[int, int], Tuple[Tuple[str, int], float]]
+        # type: Dict[Tuple[int, int], PrePrepare]
 
         # Dictionary of received Prepare requests. Key of dictionary is a 2
         # element tuple with elements viewNo, seqNo and value is a 2 element
         # tuple containing request digest and set of sender node names(sender
         # replica names in case of multiple protocol instances)
         # (viewNo, seqNo) -> ((identifier, reqId), {senders})
-        self.prepares = Prepares()
+        # Senders of PREPAREs and COMMITs are kept as bitmasks over indexes
+        # of replica names that are shared by both
+        voterIndex = VoterIndex()
+        self.prepares = Prepares(voterIndex)
         # type: Dict[Tuple[int, int], Tuple[Tuple[str, int], Set[str]]]
 
-        self.commits = Commits()    # type: Dict[Tuple[int, int],
+        self.commits = Commits(voterIndex)    # type: Dict[Tuple[int, int],
         # Tuple[Tuple[str, int], Set[str]]]
 
-        # Set of tuples to keep track of ordered requests. Each tuple is
-        # (viewNo, ppSeqNo)
-        self.ordered = OrderedSet()        # type: OrderedSet[Tuple[int, int]]
+        # PRE-PREPARE, PREPARE and COMMIT votes and ordered flag of each 3
+        # phase key in sequence order. Used to track ordered keys and to clean
+        # up state covered by a stable checkpoint
+        self.threePCLog = ThreePCLog()
 
         # Dictionary to keep track of the which replica was primary during each
         # view. Key is the view no and value is the name of the primary
         # replica during that view
         self.primaryNames = {}  # type: Dict[int, str]
 
-        # Holds msgs that are for later views
-        self.threePhaseMsgsForLaterView = deque()
-        # type: deque[(ThreePhaseMsg, str)]
+        # Holds msgs that are for later views, indexed by view no and
+        # ppSeqNo
+        self.threePhaseMsgsForLaterView = \
+            MsgStash(self.config.MaxStashedMsgsPerSender)
 
         # Holds tuple of view no and prepare seq no of 3-phase messages it
         # received while it was not participating
@@ -192,13 +227,23 @@ class Replica(HasActionQueue, MessageProcessor):
 
         # Commits which are not being ordered since commits with lower view
         # numbers and sequence numbers have not been ordered yet. Key is the
-        # viewNo and value a map of pre-prepare sequence number to commit
-        self.stashedCommitsForOrdering = {}         # type: Dict[int,
-        # Dict[int, Commit]]
+        # viewNo and value a map of pre-prepare sequence number to commit,
+        # both sorted so that the lowest stashed commit is found directly
+        self.stashedCommitsForOrdering = SortedDict()   # type: SortedDict[int,
+        # SortedDict[int, Commit]]
+
+        # Pre-prepare sequence numbers of the 3 phase keys that have COMMITs
+        # but have not been ordered yet, grouped by view no. Used to decide
+        # whether a COMMIT is next in ordering without scanning all COMMITs
+        self.unorderedCommits = SortedDict()    # type: SortedDict[int,
+        # SortedSet[int]]
 
         self.checkpoints = SortedDict(lambda k: k[0])
 
-        self.stashingWhileOutsideWaterMarks = deque()
+        # Holds msgs with ppSeqNo outside the water marks, indexed by ppSeqNo
+        # and view no
+        self.stashingWhileOutsideWaterMarks = \
+            MsgStash(self.config.MaxStashedMsgsPerSender)
 
         # Low water mark
         self._h = 0              # type: int
@@ -221,6 +266,13 @@ class Replica(HasActionQueue, MessageProcessor):
     def requests(self):
         return self.node.requests
 
+    @property
+    def ordered(self):
+        """
+        The ordered 3 phase keys, i.e. (viewNo, ppSeqNo)
+        """
+        return self.threePCLog.ordered
+
     def shouldParticipate(self, viewNo: int, ppSeqNo: int):
         # Replica should only participating in the consensus process and the
         # replica did not stash any of this request's 3-phase request
@@ -413,6 +465,9 @@ class Replica(HasActionQueue, MessageProcessor):
         """
         # TODO should handle SuspiciousNode here
         r = self.inBoxRouter.handleAllSync(self.inBox, limit)
+        r += self.tryPrePrepare()
+        if self.isLean:
+            self.pruneOrdered()
         r += self._serviceActions()
         return r
         # Messages that can be processed right now needs to be added back to the
@@ -430,21 +485,15 @@ class Replica(HasActionQueue, MessageProcessor):
 
     def process3PhaseReqsQueue(self):
         """
-        Process the 3 phase requests from the queue whose view number is equal
-        to the current view number of this replica.
+        Process the 3 phase requests from the queue whose view number is not
+        more than the current view number of this replica. Requests for later
+        views stay in the queue.
         """
-        unprocessed = deque()
-        while self.threePhaseMsgsForLaterView:
-            request, sender = self.threePhaseMsgsForLaterView.popleft()
+        for request, sender in self.threePhaseMsgsForLaterView.popRange(
+                maxKey=(self.viewNo + 1,)):
             logger.debug("{} processing pended 3 phase request: {}"
                          .format(self, request))
-            # If the request is for a later view dont try to process it but add
-            # it back to the queue.
-            if self.isMsgForLaterView(request):
-                unprocessed.append((request, sender))
-            else:
-                self.processThreePhaseMsg(request, sender)
-        self.threePhaseMsgsForLaterView = unprocessed
+            self.processThreePhaseMsg(request, sender)
 
     @property
     def quorum(self) -> int:
@@ -462,7 +511,15 @@ class Replica(HasActionQueue, MessageProcessor):
         :param sender: the name of the node that sent this request
         """
         senderRep = self.generateName(sender, self.instId)
-        if self.isPpSeqNoAcceptable(msg.ppSeqNo):
+        if isinstance(msg, PrePrepare):
+            # Request keys are deserialized as lists, they are used as
+            # dictionary keys so convert them to tuples
+            msg = msg._replace(reqIdr=[tuple(k) for k in msg.reqIdr])
+        if self.isLean and msg.ppSeqNo <= self.h:
+            self.discard(msg, reason="lean replica has ordered and pruned "
+                                     "ppSeqNo {}".format(msg.ppSeqNo),
+                         logMethod=logger.debug)
+        elif self.isPpSeqNoAcceptable(msg.ppSeqNo):
             try:
                 self.threePhaseRouter.handleSync((msg, senderRep))
             except SuspiciousNode as ex:
@@ -471,7 +528,11 @@ class Replica(HasActionQueue, MessageProcessor):
             logger.debug("{} stashing 3 phase message {} since ppSeqNo {} is "
                          "not between {} and {}".
                          format(self, msg, msg.ppSeqNo, self.h, self.H))
-            self.stashingWhileOutsideWaterMarks.append((msg, sender))
+            if not self.stashingWhileOutsideWaterMarks.add(
+                    (msg.ppSeqNo, msg.viewNo), msg, sender):
+                self.discard(msg, reason="too many messages from {} stashed "
+                                         "outside water marks".format(sender),
+                             logMethod=logger.warning)
 
     def processReqDigest(self, rd: ReqDigest):
         """
@@ -484,7 +545,12 @@ class Replica(HasActionQueue, MessageProcessor):
         if self.isPrimary is False:
             self.dequeuePrePrepare(rd.identifier, rd.reqId)
         else:
-            self.doPrePrepare(rd)
+            # PRE-PREPAREs are sent once the inBox has been processed, see
+            # `serviceQueues`, so that all request digests received in one
+            # go are seen while choosing the batch
+            if not self.reqDigestQueue:
+                self.batchStartedAt = time.perf_counter()
+            self.reqDigestQueue.append(rd)
 
     def processThreePhaseMsg(self, msg: ThreePhaseMsg, sender: str):
         """
@@ -498,9 +564,14 @@ class Replica(HasActionQueue, MessageProcessor):
         """
         # Can only proceed further if it knows whether its primary or not
         if self.isMsgForLaterView(msg):
-            self.threePhaseMsgsForLaterView.append((msg, sender))
-            logger.debug("{} pended received 3 phase request for a later view: "
-                         "{}".format(self, msg))
+            if self.threePhaseMsgsForLaterView.add(
+                    (msg.viewNo, msg.ppSeqNo), msg, sender):
+                logger.debug("{} pended received 3 phase request for a later "
+                             "view: {}".format(self, msg))
+            else:
+                self.discard(msg, reason="too many messages from {} stashed "
+                                         "for later views".format(sender),
+                             logMethod=logger.warning)
         else:
             if self.isPrimary is None:
                 self.postElectionMsgs.append((msg, sender))
@@ -596,15 +667,62 @@ class Replica(HasActionQueue, MessageProcessor):
         if canOrder:
             logger.debug("{} returning request to node".format(self))
             self.tryOrdering(commit)
+            self.orderStashedCommits()
         else:
             logger.trace("{} cannot return request to node: {}".
                          format(self, reason))
 
-    def doPrePrepare(self, reqDigest: ReqDigest) -> None:
+    def tryPrePrepare(self) -> int:
         """
-        Broadcast a PRE-PREPARE to all the replicas.
+        Send PRE-PREPAREs for the queued request digests if this replica is
+        the primary. A batch is sent when a full batch of request digests is
+        queued or when the oldest queued request digest has waited long
+        enough. Batch size and wait are chosen by `batchController`.
 
-        :param reqDigest: a tuple with elements identifier, reqId, and digest
+        :return: the number of PRE-PREPAREs sent
+        """
+        if not self.isPrimary or not self.reqDigestQueue:
+            return 0
+        if not self.node.isParticipating:
+            return 0
+        if self.batchController.update(
+                len(self.reqDigestQueue),
+                lambda: self.node.monitor.getOrderingLatency(self.instId)):
+            self.batchingChanged()
+        batchSize = self.batchController.batchSize
+        waited = time.perf_counter() - self.batchStartedAt
+        sent = 0
+        while self.reqDigestQueue and \
+                (len(self.reqDigestQueue) >= batchSize or
+                 waited >= self.batchController.batchWait):
+            if self.lastPrePrepareSeqNo == self.H:
+                logger.debug("{} not sending PRE-PREPARE {} since it is "
+                             "greater than high water mark {}".
+                             format(self,
+                                    (self.viewNo, self.lastPrePrepareSeqNo+1),
+                                    self.H))
+                break
+            if self.inFlightWindow.isFull(len(self.prePrepareSentAt)):
+                logger.debug("{} not sending PRE-PREPARE {} since {} "
+                             "PRE-PREPAREs are in flight".
+                             format(self,
+                                    (self.viewNo, self.lastPrePrepareSeqNo+1),
+                                    len(self.prePrepareSentAt)))
+                break
+            reqDigests = [self.reqDigestQueue.popleft() for _ in
+                          range(min(batchSize, len(self.reqDigestQueue)))]
+            self.doPrePrepare(reqDigests)
+            sent += 1
+        if not self.reqDigestQueue:
+            self.batchStartedAt = None
+        return sent
+
+    def doPrePrepare(self, reqDigests: List[ReqDigest]) -> None:
+        """
+        Broadcast a PRE-PREPARE for a batch of requests to all the replicas.
+
+        :param reqDigests: list of tuples with elements identifier, reqId,
+        and digest
         """
         if not self.node.isParticipating:
             logger.error("Non participating node is attempting PRE-PREPARE. "
@@ -612,26 +730,49 @@ class Replica(HasActionQueue, MessageProcessor):
             return
 
         if self.lastPrePrepareSeqNo == self.H:
-            logger.debug("{} stashing PRE-PREPARE {} since outside greater "
-                         "than high water mark {}".
+            logger.debug("{} queueing back requests of PRE-PREPARE {} since "
+                         "outside greater than high water mark {}".
                          format(self, (self.viewNo, self.lastPrePrepareSeqNo+1),
                                 self.H))
-            self.stashingWhileOutsideWaterMarks.append(reqDigest)
+            if not self.reqDigestQueue:
+                self.batchStartedAt = time.perf_counter()
+            self.reqDigestQueue.extendleft(reversed(reqDigests))
             return
         self.lastPrePrepareSeqNo += 1
         tm = time.time()*1000
-        logger.debug("{} Sending PRE-PREPARE {} at {}".
+        logger.debug("{} Sending PRE-PREPARE {} with {} requests at {}".
                      format(self, (self.viewNo, self.lastPrePrepareSeqNo),
-                            time.perf_counter()))
+                            len(reqDigests), time.perf_counter()))
         prePrepareReq = PrePrepare(self.instId,
                                    self.viewNo,
                                    self.lastPrePrepareSeqNo,
-                                   *reqDigest,
+                                   [rd.key for rd in reqDigests],
+                                   self.batchDigest([rd.digest
+                                                     for rd in reqDigests]),
                                    tm)
-        self.sentPrePrepares[self.viewNo, self.lastPrePrepareSeqNo] = (reqDigest.key,
-                                                                       tm)
+        self.sentPrePrepares[self.viewNo, self.lastPrePrepareSeqNo] = \
+            prePrepareReq
+        self.threePCLog.addPrePrepare(prePrepareReq)
+        self.prePrepareSentAt[self.viewNo, self.lastPrePrepareSeqNo] = \
+            time.perf_counter()
         self.send(prePrepareReq, TPCStat.PrePrepareSent)
 
+    def batchingChanged(self):
+        metrics = self.batchController.metrics()
+        metrics.update(self.inFlightWindow.metrics())
+        logger.debug("{} changed batching to {}".format(self, metrics))
+        self.node.monitor.batchingChanged(self.instId, metrics)
+
+    @staticmethod
+    def batchDigest(digests: List[str]) -> str:
+        """
+        Return the digest of a batch of requests, calculated over the digests
+        of the requests in the order they appear in the batch.
+
+        :param digests: digests of the requests of the batch
+        """
+        return sha256("".join(digests).encode()).hexdigest()
+
     def doPrepare(self, pp: PrePrepare):
         logger.debug("{} Sending PREPARE {} at {}".
                      format(self, (pp.viewNo, pp.ppSeqNo), time.perf_counter()))
@@ -666,7 +807,8 @@ class Replica(HasActionQueue, MessageProcessor):
 
         - this replica is non-primary replica
         - the request isn't in its list of received PRE-PREPAREs
-        - the request is waiting to for PRE-PREPARE and the digest value matches
+        - all requests of the batch are finalised and the digest of the batch
+        matches
 
         :param pp: a PRE-PREPARE msg to process
         :param sender: the name of the node that sent the PRE-PREPARE msg
@@ -685,13 +827,15 @@ class Replica(HasActionQueue, MessageProcessor):
         if (pp.viewNo, pp.ppSeqNo) in self.prePrepares:
             raise SuspiciousNode(sender, Suspicions.DUPLICATE_PPR_SENT, pp)
 
-        key = (pp.identifier, pp.reqId)
-        if not self.requests.isFinalised(key):
-            self.enqueuePrePrepare(pp, sender)
+        notFinalised = [key for key in pp.reqIdr
+                        if not self.requests.isFinalised(key)]
+        if notFinalised:
+            self.enqueuePrePrepare(pp, sender, notFinalised)
             return False
 
-        # A PRE-PREPARE is sent that does not match request digest
-        if self.requests.digest(key) != pp.digest:
+        # A PRE-PREPARE is sent that does not match digest of the requests
+        if self.batchDigest([self.requests.digest(key)
+                             for key in pp.reqIdr]) != pp.digest:
             raise SuspiciousNode(sender, Suspicions.PPR_DIGEST_WRONG, pp)
 
         return True
@@ -704,8 +848,8 @@ class Replica(HasActionQueue, MessageProcessor):
         :param pp: the PRE-PREPARE to add to the list
         """
         key = (pp.viewNo, pp.ppSeqNo)
-        self.prePrepares[key] = \
-            ((pp.identifier, pp.reqId), pp.ppTime)
+        self.prePrepares[key] = pp
+        self.threePCLog.addPrePrepare(pp)
         self.dequeuePrepares(*key)
         self.dequeueCommits(*key)
         self.stats.inc(TPCStat.PrePrepareRcvd)
@@ -716,15 +860,14 @@ class Replica(HasActionQueue, MessageProcessor):
 
     def canSendPrepare(self, request) -> bool:
         """
-        Return whether the request identified by (identifier, requestId) can
-        proceed to the Prepare step.
+        Return whether the batch of requests of a PRE-PREPARE can proceed to
+        the Prepare step.
 
-        :param request: any object with identifier and requestId attributes
+        :param request: any object with viewNo, ppSeqNo and reqIdr attributes
         """
         return self.shouldParticipate(request.viewNo, request.ppSeqNo) \
             and not self.hasPrepared(request) \
-            and self.requests.isFinalised((request.identifier,
-                                           request.reqId))
+            and all(self.requests.isFinalised(key) for key in request.reqIdr)
 
     def isValidPrepare(self, prepare: Prepare, sender: str) -> bool:
         """
@@ -754,9 +897,9 @@ class Replica(HasActionQueue, MessageProcessor):
             if key not in ppReqs:
                 self.enqueuePrepare(prepare, sender)
                 return False
-            elif prepare.digest != self.requests.digest(ppReqs[key][0]):
+            elif prepare.digest != ppReqs[key].digest:
                 raise SuspiciousNode(sender, Suspicions.PR_DIGEST_WRONG, prepare)
-            elif prepare.ppTime != ppReqs[key][1]:
+            elif prepare.ppTime != ppReqs[key].ppTime:
                 raise SuspiciousNode(sender, Suspicions.PR_TIME_WRONG,
                                      prepare)
             else:
@@ -769,9 +912,9 @@ class Replica(HasActionQueue, MessageProcessor):
             # malicious behavior
             elif key not in ppReqs:
                 raise SuspiciousNode(sender, Suspicions.UNKNOWN_PR_SENT, prepare)
-            elif prepare.digest != self.requests.digest(ppReqs[key][0]):
+            elif prepare.digest != ppReqs[key].digest:
                 raise SuspiciousNode(sender, Suspicions.PR_DIGEST_WRONG, prepare)
-            elif prepare.ppTime != ppReqs[key][1]:
+            elif prepare.ppTime != ppReqs[key].ppTime:
                 raise SuspiciousNode(sender, Suspicions.PR_TIME_WRONG,
                                      prepare)
             else:
@@ -779,6 +922,8 @@ class Replica(HasActionQueue, MessageProcessor):
 
     def addToPrepares(self, prepare: Prepare, sender: str):
         self.prepares.addVote(prepare, sender)
+        key = self.prepares.getKey(prepare)
+        self.threePCLog.addPrepares(key, self.prepares[key])
         self.tryCommit(prepare)
 
     def hasCommitted(self, request) -> bool:
@@ -827,7 +972,7 @@ class Replica(HasActionQueue, MessageProcessor):
             raise SuspiciousNode(sender, Suspicions.DUPLICATE_CM_SENT, commit)
         elif commit.digest != self.getDigestFor3PhaseKey(ThreePhaseKey(*key)):
             raise SuspiciousNode(sender, Suspicions.CM_DIGEST_WRONG, commit)
-        elif key in ppReqs and commit.ppTime != ppReqs[key][1]:
+        elif key in ppReqs and commit.ppTime != ppReqs[key].ppTime:
             raise SuspiciousNode(sender, Suspicions.CM_TIME_WRONG,
                                  commit)
         else:
@@ -842,10 +987,14 @@ class Replica(HasActionQueue, MessageProcessor):
         :param sender: the name of the node that sent the COMMIT
         """
         self.commits.addVote(commit, sender)
+        key = self.commits.getKey(commit)
+        self.threePCLog.addCommits(key, self.commits[key])
+        if not self.hasOrdered(commit.viewNo, commit.ppSeqNo):
+            self.addToUnorderedCommits(commit.viewNo, commit.ppSeqNo)
         self.tryOrder(commit)
 
     def hasOrdered(self, viewNo, ppSeqNo) -> bool:
-        return (viewNo, ppSeqNo) in self.ordered
+        return self.threePCLog.isOrdered((viewNo, ppSeqNo))
 
     def canOrder(self, commit: Commit) -> Tuple[bool, Optional[str]]:
         """
@@ -871,79 +1020,66 @@ class Replica(HasActionQueue, MessageProcessor):
         if not self.isNextInOrdering(commit):
             viewNo, ppSeqNo = commit.viewNo, commit.ppSeqNo
             if viewNo not in self.stashedCommitsForOrdering:
-                self.stashedCommitsForOrdering[viewNo] = {}
+                self.stashedCommitsForOrdering[viewNo] = SortedDict()
             self.stashedCommitsForOrdering[viewNo][ppSeqNo] = commit
-            self.startRepeating(self.orderStashedCommits, 2)
             return False, "stashing {} since out of order".\
                 format(commit)
 
         return True, None
 
     def isNextInOrdering(self, commit: Commit):
+        """
+        Return whether the COMMIT has no unordered COMMIT before it, either
+        from a previous view or with a lower ppSeqNo in the same view.
+        """
         viewNo, ppSeqNo = commit.viewNo, commit.ppSeqNo
-        if self.ordered and self.ordered[-1] == (viewNo, ppSeqNo-1):
+        if self.threePCLog.lastOrdered == (viewNo, ppSeqNo-1):
             return True
-        for (v, p) in self.commits:
-            if v < viewNo:
-                # Have commits from previous view that are unordered.
-                # TODO: Question: would commits be always ordered, what if
-                # some are never ordered and its fine, go to PBFT.
-                return False
-            if v == viewNo and p < ppSeqNo and (v, p) not in self.ordered:
-                # If unordered commits are found with lower ppSeqNo then this
-                # cannot be ordered.
-                return False
-
         # TODO: Revisit PBFT paper, how to make sure that last request of the
         # last view has been ordered? Need change in `VIEW CHANGE` mechanism.
         # Somehow view change needs to communicate what the last request was.
         # Also what if some COMMITs were completely missed in the same view
-        return True
+        lowest = self.lowestUnorderedCommit
+        return lowest is None or lowest >= (viewNo, ppSeqNo)
+
+    @property
+    def lowestUnorderedCommit(self) -> Optional[Tuple[int, int]]:
+        """
+        The lowest 3 phase key that has COMMITs but has not been ordered
+        """
+        if not self.unorderedCommits:
+            return None
+        viewNo, ppSeqNos = self.unorderedCommits.peekitem(0)
+        return viewNo, ppSeqNos[0]
+
+    def addToUnorderedCommits(self, viewNo: int, ppSeqNo: int):
+        if viewNo not in self.unorderedCommits:
+            self.unorderedCommits[viewNo] = SortedSet()
+        self.unorderedCommits[viewNo].add(ppSeqNo)
+
+    def removeFromUnorderedCommits(self, viewNo: int, ppSeqNo: int):
+        ppSeqNos = self.unorderedCommits.get(viewNo)
+        if ppSeqNos is not None:
+            ppSeqNos.discard(ppSeqNo)
+            if not ppSeqNos:
+                del self.unorderedCommits[viewNo]
 
     def orderStashedCommits(self):
-        # TODO: What if the first few commits were out of order and stashed?
-        # `self.ordered` would be empty
-        if self.ordered:
-            lastOrdered = self.ordered[-1]
-            vToRemove = set()
-            for v in self.stashedCommitsForOrdering:
-                if v < lastOrdered[0] and self.stashedCommitsForOrdering[v]:
-                    raise RuntimeError("{} found commits from previous view {}"
-                                       " that were not ordered but last ordered"
-                                       " is {}".format(self, v, lastOrdered))
-                pToRemove = set()
-                for p, commit in self.stashedCommitsForOrdering[v].items():
-                    if (v == lastOrdered[0] and lastOrdered == (v, p - 1)) or \
-                            (v > lastOrdered[0] and
-                                self.isLowestCommitInView(commit)):
-                        logger.debug("{} ordering stashed commit {}".
-                                     format(self, commit))
-                        if self.tryOrdering(commit):
-                            lastOrdered = (v, p)
-                            pToRemove.add(p)
-
-                for p in pToRemove:
-                    del self.stashedCommitsForOrdering[v][p]
-                if not self.stashedCommitsForOrdering[v]:
-                    vToRemove.add(v)
-
-            for v in vToRemove:
-                del self.stashedCommitsForOrdering[v]
-
-            # if self.stashedCommitsForOrdering:
-            #     self._schedule(self.orderStashedCommits, 2)
-            if not self.stashedCommitsForOrdering:
-                self.stopRepeating(self.orderStashedCommits)
-
-    def isLowestCommitInView(self, commit):
-        # TODO: Assumption: This assumes that at least one commit that was sent
-        #  for any request by any node has been received in the view of this
-        # commit
-        ppSeqNos = []
-        for v, p in self.commits:
-            if v == commit.viewNo:
-                ppSeqNos.append(p)
-        return min(ppSeqNos) == commit.ppSeqNo if ppSeqNos else True
+        """
+        Order the stashed COMMITs, lowest first, for as long as the lowest
+        stashed COMMIT is next in ordering.
+        """
+        while self.stashedCommitsForOrdering:
+            viewNo, commits = self.stashedCommitsForOrdering.peekitem(0)
+            ppSeqNo, commit = commits.peekitem(0)
+            if not self.isNextInOrdering(commit):
+                break
+            del commits[ppSeqNo]
+            if not commits:
+                del self.stashedCommitsForOrdering[viewNo]
+            logger.debug("{} ordering stashed commit {}".
+                         format(self, commit))
+            self.tryOrdering(commit)
 
     def tryOrdering(self, commit: Commit) -> None:
         """
@@ -954,22 +1090,25 @@ class Replica(HasActionQueue, MessageProcessor):
         """
         key = (commit.viewNo, commit.ppSeqNo)
         logger.debug("{} trying to order COMMIT{}".format(self, key))
-        reqKey = self.getReqKeyFrom3PhaseKey(key)   # type: Tuple
-        digest = self.getDigestFor3PhaseKey(key)
-        if not digest:
-            logger.error("{} did not find digest for {}, request key {}".
-                         format(self, key, reqKey))
+        pp = self.getPrePrepare(*key)
+        if pp is None:
+            logger.error("{} did not find PRE-PREPARE for {}".
+                         format(self, key))
             return
-        self.doOrder(*key, *reqKey, digest, commit.ppTime)
+        self.doOrder(*key, pp.reqIdr, pp.digest, commit.ppTime)
         return True
 
-    def doOrder(self, viewNo, ppSeqNo, identifier, reqId, digest, ppTime):
+    def doOrder(self, viewNo, ppSeqNo, reqIdr, digest, ppTime):
         key = (viewNo, ppSeqNo)
         self.addToOrdered(*key)
+        sentAt = self.prePrepareSentAt.pop(key, None)
+        if sentAt is not None and \
+                self.inFlightWindow.ordered(time.perf_counter() - sentAt):
+            self.batchingChanged()
         ordered = Ordered(self.instId,
                           viewNo,
-                          identifier,
-                          reqId,
+                          reqIdr,
+                          ppSeqNo,
                           ppTime)
         # TODO: Should not order or add to checkpoint while syncing
         # 3 phase state.
@@ -977,10 +1116,14 @@ class Replica(HasActionQueue, MessageProcessor):
         if key in self.stashingWhileCatchingUp:
             self.stashingWhileCatchingUp.remove(key)
         logger.debug("{} ordered request {}".format(self, (viewNo, ppSeqNo)))
-        self.addToCheckpoint(ppSeqNo, digest)
+        if not self.isLean:
+            self.addToCheckpoint(ppSeqNo, digest)
 
     def processCheckpoint(self, msg: Checkpoint, sender: str):
-        if self.checkpoints:
+        if self.isLean:
+            self.discard(msg, reason="lean replica keeps no checkpoints",
+                         logMethod=logger.debug)
+        elif self.checkpoints:
             seqNo = msg.seqNo
             _, firstChk = self.firstCheckPoint
             if firstChk.isStable:
@@ -1010,11 +1153,11 @@ class Replica(HasActionQueue, MessageProcessor):
             self.discard(msg, reason="No checkpoints present to tally",
                          logMethod=logger.warn)
 
-    def _newCheckpointState(self, ppSeqNo, digest) -> CheckpointState:
+    def _newCheckpointState(self, ppSeqNo) -> CheckpointState:
         s, e = ppSeqNo, ppSeqNo + self.config.CHK_FREQ - 1
         logger.debug("{} adding new checkpoint state for {}".
                      format(self, (s, e)))
-        state = CheckpointState(ppSeqNo, [digest, ], None, {}, False)
+        state = CheckpointState(ppSeqNo, RunningDigest(), None, {}, False)
         self.checkpoints[s, e] = state
         return state
 
@@ -1022,17 +1165,18 @@ class Replica(HasActionQueue, MessageProcessor):
         for (s, e) in self.checkpoints.keys():
             if s <= ppSeqNo <= e:
                 state = self.checkpoints[s, e]  # type: CheckpointState
-                state.digests.append(digest)
-                state = updateNamedTuple(state, seqNo=ppSeqNo)
-                self.checkpoints[s, e] = state
                 break
         else:
-            state = self._newCheckpointState(ppSeqNo, digest)
-            s, e = ppSeqNo, ppSeqNo + self.config.CHK_FREQ
-
-        if len(state.digests) == self.config.CHK_FREQ:
-            state = updateNamedTuple(state, digest=serialize(state.digests),
-                                     digests=[])
+            state = self._newCheckpointState(ppSeqNo)
+            s, e = ppSeqNo, ppSeqNo + self.config.CHK_FREQ - 1
+
+        # The running digest is updated in place, the state is only replaced
+        # once the checkpoint is complete
+        state.digests.add(digest)
+        if state.digests.count == self.config.CHK_FREQ:
+            state = updateNamedTuple(state, seqNo=ppSeqNo,
+                                     digest=state.digests.hexdigest(),
+                                     digests=None)
             self.checkpoints[s, e] = state
             self.send(Checkpoint(self.instId, self.viewNo, ppSeqNo,
                                  state.digest))
@@ -1060,47 +1204,67 @@ class Replica(HasActionQueue, MessageProcessor):
 
     def gc(self, tillSeqNo):
         logger.debug("{} cleaning up till {}".format(self, tillSeqNo))
-        tpcKeys = set()
+        removed = self.threePCLog.truncate(tillSeqNo)
         reqKeys = set()
-        for (v, p), (reqKey, _) in self.sentPrePrepares.items():
-            if p <= tillSeqNo:
-                tpcKeys.add((v, p))
-                reqKeys.add(reqKey)
-        for (v, p), (reqKey, _) in self.prePrepares.items():
-            if p <= tillSeqNo:
-                tpcKeys.add((v, p))
-                reqKeys.add(reqKey)
-
-        logger.debug("{} found {} 3 phase keys to clean".
-                     format(self, len(tpcKeys)))
-        logger.debug("{} found {} request keys to clean".
-                     format(self, len(reqKeys)))
-
-        for k in tpcKeys:
+        for k, entry in removed:
+            if entry.prePrepare is not None:
+                reqKeys.update(entry.prePrepare.reqIdr)
             self.sentPrePrepares.pop(k, None)
+            self.prePrepareSentAt.pop(k, None)
             self.prePrepares.pop(k, None)
             self.prepares.pop(k, None)
             self.commits.pop(k, None)
-            if k in self.ordered:
-                self.ordered.remove(k)
-
-        for k in reqKeys:
-            self.requests.pop(k, None)
+            self.removeFromUnorderedCommits(*k)
+            stashed = self.stashedCommitsForOrdering.get(k[0])
+            if stashed is not None:
+                stashed.pop(k[1], None)
+                if not stashed:
+                    del self.stashedCommitsForOrdering[k[0]]
+
+        logger.debug("{} cleaned {} 3 phase keys and {} request keys".
+                     format(self, len(removed), len(reqKeys)))
+
+        # A lean replica prunes before the master replica is done with the
+        # requests, they are left to be cleaned up by the master replica
+        # unless the requests are the replica's own, as in a worker process
+        if not self.isLean or getattr(self.node, 'ownsRequests', False):
+            for k in reqKeys:
+                self.requests.pop(k, None)
+
+        # Cleaned up keys might have been holding back stashed commits
+        self.orderStashedCommits()
+
+    def pruneOrdered(self):
+        """
+        Drop the 3 phase state of the batches ordered by a lean replica and
+        move the water marks past them since a lean replica has no
+        checkpoints to do so.
+        """
+        lastOrdered = self.threePCLog.lastOrdered
+        if lastOrdered is None or lastOrdered[1] <= self.h:
+            return
+        self.h = lastOrdered[1]
+        self.gc(self.h)
+        self.processStashedMsgsForNewWaterMarks()
 
     def processStashedMsgsForNewWaterMarks(self):
-        while self.stashingWhileOutsideWaterMarks:
-            item = self.stashingWhileOutsideWaterMarks.pop()
+        """
+        Process the stashed messages that are within the new water marks and
+        discard the ones that are below the low water mark.
+        """
+        stale = self.stashingWhileOutsideWaterMarks.popRange(
+            maxKey=(self.h + 1,))
+        if stale:
+            logger.debug("{} discarding {} stashed messages below the low "
+                         "water mark {}".format(self, len(stale), self.h))
+        for msg, sender in self.stashingWhileOutsideWaterMarks.popRange(
+                (self.h + 1,), (self.H + 1,)):
             logger.debug("{} processing stashed item {} after new stable "
-                         "checkpoint".format(self, item))
-
-            if isinstance(item, ReqDigest):
-                self.doPrePrepare(item)
-            elif isinstance(item, tuple) and len(item) == 2:
-                self.dispatchThreePhaseMsg(*item)
-            else:
-                logger.error("{} cannot process {} "
-                             "from stashingWhileOutsideWaterMarks".
-                             format(self, item))
+                         "checkpoint".format(self, (msg, sender)))
+            self.dispatchThreePhaseMsg(msg, sender)
+        # Request digests queued by the primary while the high water mark was
+        # reached can now be sent in PRE-PREPAREs
+        self.tryPrePrepare()
 
     @property
     def firstCheckPoint(self) -> Tuple[Tuple[int, int], CheckpointState]:
@@ -1120,31 +1284,40 @@ class Replica(HasActionQueue, MessageProcessor):
         return self.h < ppSeqNo <= self.H
 
     def addToOrdered(self, viewNo: int, ppSeqNo: int):
-        self.ordered.add((viewNo, ppSeqNo))
+        self.threePCLog.markOrdered((viewNo, ppSeqNo))
+        self.removeFromUnorderedCommits(viewNo, ppSeqNo)
 
-    def enqueuePrePrepare(self, request: PrePrepare, sender: str):
+    def enqueuePrePrepare(self, request: PrePrepare, sender: str,
+                          notFinalised: List[Tuple[str, int]]):
         logger.debug("Queueing pre-prepares due to unavailability of finalised "
                      "Request. Request {} from {}".format(request, sender))
-        key = (request.identifier, request.reqId)
-        if key not in self.prePreparesPendingReqDigest:
-            self.prePreparesPendingReqDigest[key] = []
-        self.prePreparesPendingReqDigest[key].append((request, sender))
+        for key in notFinalised:
+            if key not in self.prePreparesPendingReqDigest:
+                self.prePreparesPendingReqDigest[key] = []
+            self.prePreparesPendingReqDigest[key].append((request, sender))
 
     def dequeuePrePrepare(self, identifier: int, reqId: int):
         key = (identifier, reqId)
         if key in self.prePreparesPendingReqDigest:
-            pps = self.prePreparesPendingReqDigest[key]
+            pps = self.prePreparesPendingReqDigest.pop(key)
             for (pp, sender) in pps:
                 logger.debug("{} popping stashed PRE-PREPARE{}".
                              format(self, key))
-                if pp.digest == self.requests.digest(key):
-                    self.prePreparesPendingReqDigest.pop(key)
+                if (pp.viewNo, pp.ppSeqNo) in self.prePrepares:
+                    continue
+                # The PRE-PREPARE is still stashed against other requests of
+                # the batch which are not finalised yet
+                if not all(self.requests.isFinalised(k) for k in pp.reqIdr):
+                    continue
+                try:
                     self.processPrePrepare(pp, sender)
-                    logger.debug(
-                        "{} processed {} PRE-PREPAREs waiting for finalised "
-                        "request for identifier {} and reqId {}".
-                        format(self, pp, identifier, reqId))
-                    break
+                except SuspiciousNode as ex:
+                    self.node.reportSuspiciousNodeEx(ex)
+                    continue
+                logger.debug(
+                    "{} processed {} PRE-PREPAREs waiting for finalised "
+                    "request for identifier {} and reqId {}".
+                    format(self, pp, identifier, reqId))
 
     def enqueuePrepare(self, request: Prepare, sender: str):
         logger.debug("Queueing prepares due to unavailability of PRE-PREPARE. "
@@ -1195,38 +1368,31 @@ class Replica(HasActionQueue, MessageProcessor):
                          format(self, i, viewNo, ppSeqNo))
 
     def getDigestFor3PhaseKey(self, key: ThreePhaseKey) -> Optional[str]:
-        reqKey = self.getReqKeyFrom3PhaseKey(key)
-        digest = self.requests.digest(reqKey)
-        if not digest:
+        pp = self.getPrePrepare(*key)
+        if pp is None:
             logger.debug("{} could not find digest in sent or received "
-                         "PRE-PREPAREs or PREPAREs for 3 phase key {} and req "
-                         "key {}".format(self, key, reqKey))
+                         "PRE-PREPAREs for 3 phase key {}".format(self, key))
             return None
         else:
-            return digest
+            return pp.digest
 
-    def getReqKeyFrom3PhaseKey(self, key: ThreePhaseKey):
-        reqKey = None
+    def getPrePrepare(self, viewNo, ppSeqNo) -> Optional[PrePrepare]:
+        key = (viewNo, ppSeqNo)
         if key in self.sentPrePrepares:
-            reqKey = self.sentPrePrepares[key][0]
-        elif key in self.prePrepares:
-            reqKey = self.prePrepares[key][0]
-        elif key in self.prepares:
-            reqKey = self.prepares[key][0]
-        else:
-            logger.debug("Could not find request key for 3 phase key {}".
-                         format(key))
-        return reqKey
+            return self.sentPrePrepares[key]
+        if key in self.prePrepares:
+            return self.prePrepares[key]
+        logger.debug("{} could not find PRE-PREPARE for 3 phase key {}".
+                     format(self, key))
 
     @property
     def threePhaseState(self):
         # TODO: This method is incomplete
         # Gets the current stable and unstable checkpoints and creates digest
         # of unstable checkpoints
+        state = []
         if self.checkpoints:
             pass
-        else:
-            state = []
         return ThreePCState(self.instId, state)
 
     def process3PhaseState(self, msg: ThreePCState, sender: str):
@@ -0,0 +1,289 @@
+"""
+Hosting of backup replicas in worker processes.
+
+A `ReplicaProxy` takes the place of a backup `Replica` in the node. Messages
+the node puts in the proxy's inBox are sent to a worker process which runs
+the actual `Replica` and the messages the replica puts in its outBox are
+sent back and put in the proxy's outBox, so the node services a proxy the
+same way as an in-process replica.
+
+Messages cross the process boundary in batches, as tuples of the message
+class name and the message fields, since the message classes are created
+dynamically and cannot be pickled by reference.
+"""
+
+import multiprocessing
+import queue
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+from plenum.common.config_util import getConfig
+from plenum.common.exceptions import SuspiciousNode
+from plenum.common.log import getlogger
+from plenum.common.request import ReqDigest
+from plenum.common.types import PrePrepare, Prepare, Commit, Checkpoint, \
+    Ordered, ThreePCState
+from plenum.server.suspicion_codes import Suspicion
+
+logger = getlogger()
+
+# Message classes that are passed between a node and a replica
+MsgClasses = {cls.__name__: cls for cls in (PrePrepare, Prepare, Commit,
+                                            Checkpoint, Ordered,
+                                            ThreePCState, ReqDigest)}
+
+SUSPICION = "SUSPICION"
+BATCHING = "BATCHING"
+PRIMARY = "PRIMARY"
+THREE_PC_STATE = "THREE_PC_STATE"
+STOP = "STOP"
+
+
+def encodeMsg(msg) -> Tuple[str, tuple]:
+    return msg.__class__.__name__, tuple(msg)
+
+
+def decodeMsg(encoded: Tuple[str, tuple]):
+    name, fields = encoded
+    return MsgClasses[name](*fields)
+
+
+def encodeOutMsg(msg) -> Tuple:
+    if isinstance(msg, SuspiciousNode):
+        offendingMsg = encodeMsg(msg.offendingMsg) \
+            if msg.offendingMsg.__class__.__name__ in MsgClasses else None
+        return SUSPICION, (msg.node, msg.code, msg.reason, offendingMsg)
+    return encodeMsg(msg)
+
+
+def decodeOutMsg(encoded: Tuple):
+    name, fields = encoded
+    if name == SUSPICION:
+        node, code, reason, offendingMsg = fields
+        return SuspiciousNode(node, Suspicion(code, reason),
+                              decodeMsg(offendingMsg) if offendingMsg
+                              else None)
+    return decodeMsg(encoded)
+
+
+class FinalisedRequests(dict):
+    """
+    Digests of the requests forwarded to a replica in a worker process.
+    Requests are forwarded only once finalised, so every request known here
+    is finalised.
+    """
+
+    def isFinalised(self, reqKey: Tuple[str, int]) -> bool:
+        return reqKey in self
+
+    def digest(self, reqKey: Tuple[str, int]) -> Optional[str]:
+        return self.get(reqKey)
+
+
+class ReplicaHost:
+    """
+    Stands in for the node of a replica running in a worker process. Keeps
+    the node state the replica reads, as last sent by the `ReplicaProxy`,
+    and collects what the replica reports to its node.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.viewNo = None
+        self.f = None
+        self.isParticipating = False
+        self.orderingLatency = 0
+        self.requests = FinalisedRequests()
+        # The requests are only used by the replica of this worker so it
+        # cleans them up, there is no master replica to do it
+        self.ownsRequests = True
+        self.outBox = deque()
+
+    @property
+    def quorum(self) -> int:
+        return (2 * self.f) + 1
+
+    @property
+    def monitor(self):
+        return self
+
+    def updateState(self, state: Tuple):
+        self.viewNo, self.f, self.isParticipating, self.orderingLatency = \
+            state
+
+    def reportSuspiciousNodeEx(self, ex: SuspiciousNode):
+        self.outBox.append(encodeOutMsg(ex))
+
+    def getOrderingLatency(self, instId: int) -> float:
+        return self.orderingLatency
+
+    def batchingChanged(self, instId: int, choices: Dict[str, Any]):
+        self.outBox.append((BATCHING, choices))
+
+
+def runReplica(nodeName: str, instId: int, inQueue, outQueue):
+    """
+    Run a backup replica in a worker process till asked to stop.
+    """
+    from plenum.server.replica import Replica
+    config = getConfig()
+    host = ReplicaHost(nodeName)
+    replica = Replica(host, instId, isMaster=False)
+    while True:
+        batches = []
+        try:
+            batches.append(inQueue.get(timeout=config.ReplicaWorkerPollTimeout))
+            while True:
+                batches.append(inQueue.get_nowait())
+        except queue.Empty:
+            pass
+        for batch in batches:
+            if batch == STOP:
+                return
+            state, items = batch
+            host.updateState(state)
+            for item in items:
+                if item[0] == PRIMARY:
+                    replica.primaryName = item[1]
+                    continue
+                if item[0] == THREE_PC_STATE:
+                    host.outBox.append((THREE_PC_STATE,
+                                        encodeMsg(replica.threePhaseState)))
+                    continue
+                encoded, sender = item
+                msg = decodeMsg(encoded)
+                if isinstance(msg, ReqDigest):
+                    host.requests[msg.key] = msg.digest
+                    replica.inBox.append(msg)
+                else:
+                    replica.inBox.append((msg, sender))
+        replica.serviceQueues()
+        out = list(host.outBox)
+        host.outBox.clear()
+        while replica.outBox:
+            out.append(encodeOutMsg(replica.outBox.popleft()))
+        if out:
+            outQueue.put(out)
+
+
+class ReplicaProxy:
+    """
+    In-process stand in for a backup replica running in a worker process.
+    Exposes the attributes of `Replica` that the node and the elector use.
+    """
+
+    def __init__(self, node, instId: int):
+        self.node = node
+        self.instId = instId
+        self.isMaster = False
+        self.name = self.generateName(node.name, instId)
+        self.inBox = deque()
+        self.outBox = deque()
+        self._primaryName = None    # type: Optional[str]
+        self.primaryNames = {}      # type: Dict[int, str]
+        # 3 phase state last reported by the worker
+        self._threePhaseState = None    # type: Optional[ThreePCState]
+        # Controls to send to the worker ahead of the messages in the inBox
+        self._pending = []          # type: List[Tuple]
+        self._lastState = None
+        self._process = None
+        self._inQueue = None
+        self._outQueue = None
+
+    @staticmethod
+    def generateName(nodeName: str, instId: int):
+        return "{}:{}".format(nodeName, instId)
+
+    def __repr__(self):
+        return self.name
+
+    @property
+    def isPrimary(self):
+        return self._primaryName == self.name if self._primaryName is not None \
+            else None
+
+    @property
+    def primaryName(self):
+        return self._primaryName
+
+    @primaryName.setter
+    def primaryName(self, value: Optional[str]) -> None:
+        if not value == self._primaryName:
+            self._primaryName = value
+            self.primaryNames[self.node.viewNo] = value
+            self._pending.append((PRIMARY, value))
+
+    @property
+    def threePhaseState(self) -> ThreePCState:
+        """
+        The 3 phase state last reported by the worker, an empty one till it
+        reports one. A fresh one is asked for every time it is read.
+        """
+        self._pending.append((THREE_PC_STATE, None))
+        return self._threePhaseState or ThreePCState(self.instId, [])
+
+    @property
+    def isRunning(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self):
+        self._inQueue = multiprocessing.Queue()
+        self._outQueue = multiprocessing.Queue()
+        self._process = multiprocessing.Process(
+            target=runReplica, name=self.name,
+            args=(self.node.name, self.instId, self._inQueue,
+                  self._outQueue),
+            daemon=True)
+        self._process.start()
+        logger.debug("{} started worker process {}".
+                     format(self, self._process.pid))
+        if self._primaryName is not None:
+            self._pending.insert(0, (PRIMARY, self._primaryName))
+
+    def stop(self):
+        if self.isRunning:
+            self._inQueue.put(STOP)
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.terminate()
+            logger.debug("{} stopped worker process".format(self))
+        self._process = None
+
+    def serviceQueues(self, limit=None) -> int:
+        """
+        Send `limit` number of messages in the inBox to the worker and put
+        the messages the worker sent back in the outBox.
+
+        :return: the number of messages sent and received
+        """
+        if not self.isRunning:
+            self.start()
+        count = 0
+        while self.inBox and (not limit or count < limit):
+            msg = self.inBox.popleft()
+            if isinstance(msg, ReqDigest):
+                self._pending.append((encodeMsg(msg), None))
+            else:
+                msg, sender = msg
+                self._pending.append((encodeMsg(msg), sender))
+            count += 1
+        state = (self.node.viewNo, self.node.f, self.node.isParticipating)
+        if self._pending or state != self._lastState:
+            latency = self.node.monitor.getOrderingLatency(self.instId)
+            self._inQueue.put(((*state, latency), self._pending))
+            self._pending = []
+            self._lastState = state
+        while True:
+            try:
+                out = self._outQueue.get_nowait()
+            except queue.Empty:
+                break
+            for item in out:
+                if item[0] == BATCHING:
+                    self.node.monitor.batchingChanged(self.instId, item[1])
+                elif item[0] == THREE_PC_STATE:
+                    self._threePhaseState = decodeMsg(item[1])
+                else:
+                    self.outBox.append(decodeOutMsg(item))
+                count += 1
+        return count
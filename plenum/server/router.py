@@ -1,9 +1,71 @@
+import time
 from collections import deque, OrderedDict
-from inspect import isawaitable
-from typing import Callable, Any
+from functools import partial
+from inspect import isawaitable, iscoroutinefunction, isfunction, unwrap
+from typing import Callable, Any, Dict, Optional
 from typing import Tuple
 
 
+class Routes(OrderedDict):
+    """
+    Routes of a `Router`, any change to them clears the router's cache of
+    resolved handlers.
+    """
+
+    def __init__(self, routes, onChange: Callable):
+        self._onChange = None
+        super().__init__(routes)
+        self._onChange = onChange
+
+    def _changed(self):
+        if self._onChange:
+            self._onChange()
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self._changed()
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._changed()
+
+    def pop(self, *args):
+        value = super().pop(*args)
+        self._changed()
+        return value
+
+    def popitem(self, last=True):
+        item = super().popitem(last)
+        self._changed()
+        return item
+
+    def setdefault(self, key, default=None):
+        value = super().setdefault(key, default)
+        self._changed()
+        return value
+
+    def clear(self):
+        super().clear()
+        self._changed()
+
+
+def isCoroutineHandler(func: Callable) -> Optional[bool]:
+    """
+    Whether the handler is a coroutine function, None if that cannot be
+    known before calling it. Wrappers made with `functools.wraps` are
+    considered coroutine functions if the function they wrap is one.
+    """
+    while isinstance(func, partial):
+        func = func.func
+    func = getattr(func, '__func__', func)
+    func = unwrap(func)
+    if iscoroutinefunction(func):
+        return True
+    if isfunction(func):
+        return False
+    return None
+
+
 class Router:
     """
     A simple router.
@@ -13,17 +75,67 @@ class Router:
     Constructor takes an iterable of tuples of
     (1) a class type and
     (2) a function that handles the message
+
+    The handler of a type is resolved once, from the route of the type or
+    else of its closest base class in its MRO, and kept in a dispatch table
+    keyed by the exact type of the message.
     """
 
-    def __init__(self, *routes: Tuple[type, Callable]):
+    def __init__(self, *routes: Tuple[type, Callable],
+                 dispatchTable: bool=True, collectStats: bool=False):
         """
         Create a new router with a list of routes
 
         :param routes: each route is a tuple of a type and a callable, so that
         the router knows which callable to invoke when presented with an object
          of a particular type.
+        :param dispatchTable: if False, the handler is looked up for every
+        message by checking the message against each route in turn
+        :param collectStats: if True, the number of messages handled and the
+        time taken by the handler are kept for each route, see `stats`
+        """
+        # Type of message -> route type, handler and whether the handler is
+        # a coroutine function
+        self._dispatch = {}  # type: Dict[type, Tuple[type, Callable, bool]]
+        self.routes = Routes(routes, self._dispatch.clear)
+        self.dispatchTable = dispatchTable
+        self.collectStats = collectStats
+        # Route type -> number of messages handled and total time (in
+        # seconds) taken to handle them
+        self._stats = {}  # type: Dict[type, list]
+
+    def resolve(self, typ: type) -> Tuple[type, Callable, Optional[bool]]:
+        """
+        Get the route type, the handler and whether the handler is a
+        coroutine function for messages of the given type.
+
+        :param typ: type of the message
         """
-        self.routes = OrderedDict(routes)
+        try:
+            return self._dispatch[typ]
+        except KeyError:
+            pass
+        route = next((cls for cls in typ.__mro__ if cls in self.routes), None)
+        if route is None:
+            # Routes for abstract base classes do not appear in the MRO
+            route = next((cls for cls in self.routes
+                          if issubclass(typ, cls)), None)
+        if route is None:
+            return None
+        func = self.routes[route]
+        resolved = (route, func, isCoroutineHandler(func))
+        self._dispatch[typ] = resolved
+        return resolved
+
+    def _resolve(self, o: Any) -> Tuple[type, Callable, Optional[bool]]:
+        if self.dispatchTable:
+            resolved = self.resolve(type(o))
+        else:
+            resolved = next(((cls, func, None) for cls, func in
+                             self.routes.items() if isinstance(o, cls)), None)
+        if resolved is None:
+            raise RuntimeError("unhandled msg: {}".format(o))
+        return resolved
 
     def getFunc(self, o: Any) -> Callable:
         """
@@ -33,12 +145,21 @@ class Router:
         :param o: the object to process
         :return: the next function
         """
-        try:
-            return next(
-                func for cls, func in self.routes.items()
-                if isinstance(o, cls))
-        except StopIteration:
-            raise RuntimeError("unhandled msg: {}".format(o))
+        return self._resolve(o)[1]
+
+    @staticmethod
+    def _args(msg: Any) -> Tuple:
+        if isinstance(msg, tuple) and len(msg) == 2:
+            return msg
+        else:
+            return msg,
+
+    def _record(self, route: type, start: float):
+        stats = self._stats.get(route)
+        if stats is None:
+            stats = self._stats[route] = [0, 0.0]
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
 
     # noinspection PyCallingNonCallable
     def handleSync(self, msg: Any) -> Any:
@@ -48,10 +169,15 @@ class Router:
 
         :param msg: tuple of object and callable
         """
-        if isinstance(msg, tuple) and len(msg) == 2:
-            return self.getFunc(msg[0])(*msg)
-        else:
-            return self.getFunc(msg)(msg)
+        args = self._args(msg)
+        route, func, _ = self._resolve(args[0])
+        if not self.collectStats:
+            return func(*args)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self._record(route, start)
 
     async def handle(self, msg: Any) -> Any:
         """
@@ -60,11 +186,18 @@ class Router:
         :param msg: a message
         :return: the result of execution of the function corresponding to this message's type
         """
-        res = self.handleSync(msg)
-        if isawaitable(res):
-            return await res
-        else:
-            return res
+        args = self._args(msg)
+        route, func, isCoroutine = self._resolve(args[0])
+        start = time.perf_counter() if self.collectStats else None
+        try:
+            res = func(*args)
+            if isCoroutine or (isCoroutine is None and isawaitable(res)):
+                return await res
+            else:
+                return res
+        finally:
+            if start is not None:
+                self._record(route, start)
 
     async def handleAll(self, deq: deque, limit=None) -> int:
         """
@@ -95,3 +228,16 @@ class Router:
             msg = deq.popleft()
             self.handleSync(msg)
         return count
+
+    @property
+    def stats(self) -> Dict[str, Tuple[int, float]]:
+        """
+        Number of messages handled and total time (in seconds) taken to
+        handle them for each route, keyed by the name of the route type.
+        Empty unless `collectStats` is set.
+        """
+        return {route.__name__: tuple(stats)
+                for route, stats in self._stats.items()}
+
+    def resetStats(self):
+        self._stats.clear()
@@ -0,0 +1,114 @@
+"""
+Verification of client signatures in a pool of worker processes.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple
+
+from plenum.common.config_util import getConfig
+from plenum.common.log import getlogger
+from plenum.common.verifier import VerifierCache
+
+logger = getlogger()
+
+# Identifier, verkey, decoded signature and serialized message
+SigData = Tuple[str, str, bytes, bytes]
+
+# Verifiers of the clients seen by a worker process
+_verifiers = None   # type: VerifierCache
+
+
+def verifySignatures(items: List[SigData]) -> List[Optional[bool]]:
+    """
+    Verify a batch of signatures. Runs in a worker process.
+
+    :return: for each signature, True if it is valid, False if it is not and
+        None if it could not be verified
+    """
+    global _verifiers
+    if _verifiers is None:
+        _verifiers = VerifierCache(getConfig().ClientVerifierCacheSize)
+    results = []
+    for identifier, verkey, sig, ser in items:
+        try:
+            results.append(bool(_verifiers.get(identifier, verkey).
+                                verify(sig, ser)))
+        except Exception:
+            results.append(None)
+    return results
+
+
+class PooledSigVerifier:
+    """
+    Verifies signatures in batches in a pool of worker processes. Messages
+    are added with what is needed to verify their signatures and are
+    returned with the results of verification in the order they were added.
+    """
+
+    def __init__(self, workers: int=None, batchSize: int=None):
+        """
+        :param workers: number of worker processes, the number of CPUs if None
+        :param batchSize: number of signatures sent to a worker at once,
+            `SigVerificationBatchSize` if None
+        """
+        self.batchSize = batchSize or getConfig().SigVerificationBatchSize
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        # Signatures and messages not yet sent to the pool
+        self._batch = []    # type: List[Tuple[SigData, Any]]
+        # Batches sent to the pool, oldest first, as the future of the
+        # results, the signatures and the messages of the batch
+        self._pending = deque()
+
+    def __len__(self):
+        return len(self._batch) + \
+            sum(len(msgs) for _, _, msgs in self._pending)
+
+    def add(self, sigData: SigData, msg: Any):
+        self._batch.append((sigData, msg))
+        if len(self._batch) >= self.batchSize:
+            self.flush()
+
+    def flush(self):
+        """
+        Send the signatures added since the last batch to the pool
+        """
+        if not self._batch:
+            return
+        items = [sigData for sigData, _ in self._batch]
+        msgs = [msg for _, msg in self._batch]
+        self._batch = []
+        try:
+            future = self.executor.submit(verifySignatures, items)
+        except Exception as ex:
+            logger.warning("could not send {} signatures for verification to "
+                           "the pool, verifying them in process: {}".
+                           format(len(items), ex))
+            future = None
+        self._pending.append((future, items, msgs))
+
+    def service(self) -> List[Tuple[Any, Optional[bool]]]:
+        """
+        Return the messages of the verified batches with the result of
+        verification of each. A batch is returned only once all the batches
+        sent before it are.
+        """
+        verified = []
+        while self._pending:
+            future, items, msgs = self._pending[0]
+            if future is not None and not future.done():
+                break
+            self._pending.popleft()
+            try:
+                results = future.result() if future is not None else \
+                    verifySignatures(items)
+            except Exception as ex:
+                logger.warning("verification of {} signatures in the pool "
+                               "failed, verifying them in process: {}".
+                               format(len(items), ex))
+                results = verifySignatures(items)
+            verified.extend(zip(msgs, results))
+        return verified
+
+    def stop(self):
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,82 @@
+from collections import deque, Counter
+from typing import Any, List, Tuple
+
+from sortedcontainers import SortedDict
+
+
+class MsgStash:
+    """
+    Messages held back till they can be processed, indexed by a sortable key
+    so that the messages that become processable are found without going
+    over the rest. At most `maxPerSender` messages are kept from each sender
+    so that a lagging or malicious sender cannot make the stash grow without
+    limit.
+    """
+
+    def __init__(self, maxPerSender: int):
+        self.maxPerSender = maxPerSender
+        self._msgs = SortedDict()   # type: SortedDict[Any, deque]
+        self._senderCounts = Counter()
+        self._count = 0
+        # Number of messages not stashed since their sender was at its limit
+        self.rejected = 0
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for msgs in self._msgs.values():
+            yield from msgs
+
+    def countFrom(self, sender: str) -> int:
+        return self._senderCounts[sender]
+
+    def add(self, key, msg, sender: str) -> bool:
+        """
+        Stash the message under the key unless its sender is at its limit.
+
+        :return: whether the message was stashed
+        """
+        if self._senderCounts[sender] >= self.maxPerSender:
+            self.rejected += 1
+            return False
+        if key not in self._msgs:
+            self._msgs[key] = deque()
+        self._msgs[key].append((msg, sender))
+        self._senderCounts[sender] += 1
+        self._count += 1
+        return True
+
+    def pop(self, key) -> List[Tuple[Any, str]]:
+        """
+        Remove and return the messages stashed under the key
+        """
+        msgs = self._msgs.pop(key, ())
+        self._released(msgs)
+        return list(msgs)
+
+    def popRange(self, minKey=None, maxKey=None) -> List[Tuple[Any, str]]:
+        """
+        Remove and return, in key order, the messages stashed under keys from
+        `minKey` (inclusive) to `maxKey` (exclusive). A missing bound leaves
+        that end of the range open.
+        """
+        keys = list(self._msgs.irange(minKey, maxKey, inclusive=(True, False)))
+        popped = []
+        for key in keys:
+            msgs = self._msgs.pop(key)
+            self._released(msgs)
+            popped.extend(msgs)
+        return popped
+
+    def clear(self):
+        self._msgs.clear()
+        self._senderCounts.clear()
+        self._count = 0
+
+    def _released(self, msgs):
+        for _, sender in msgs:
+            self._senderCounts[sender] -= 1
+            if not self._senderCounts[sender]:
+                del self._senderCounts[sender]
+        self._count -= len(msgs)
@@ -46,6 +46,8 @@ class Suspicions:
         Suspicion(5, "PREPARE time does not match with PRE-PREPARE")
     CM_TIME_WRONG = \
         Suspicion(5, "COMMIT time does not match with PRE-PREPARE")
+    FETCHED_REQ_DIGEST_WRONG = \
+        Suspicion(18, "Fetched request does not match its digest")
 
     @classmethod
     def getList(cls):
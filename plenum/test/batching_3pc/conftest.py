@@ -0,0 +1,22 @@
+import pytest
+
+from plenum.test.pool_transactions.conftest import looper, clientAndWallet1, \
+    client1, wallet1, client1Connected
+
+Max3PCBatchSize = 5
+
+
+@pytest.fixture(scope="module")
+def batchingPatched(tconf, request):
+    oldBatchSize = tconf.Max3PCBatchSize
+    oldBatchWait = tconf.Max3PCBatchWait
+    tconf.Max3PCBatchSize = Max3PCBatchSize
+    tconf.Max3PCBatchWait = 1
+
+    def reset():
+        tconf.Max3PCBatchSize = oldBatchSize
+        tconf.Max3PCBatchWait = oldBatchWait
+
+    request.addfinalizer(reset)
+
+    return tconf
@@ -0,0 +1,26 @@
+from plenum.common.eventually import eventually
+from plenum.test.batching_3pc.conftest import Max3PCBatchSize
+from plenum.test.helper import sendReqsToNodesAndVerifySuffReplies
+from plenum.test.node_catchup.helper import checkNodeLedgersForEquality
+
+
+def testRequestsOrderedInBatches(batchingPatched, looper, txnPoolNodeSet,
+                                 client1, wallet1, client1Connected):
+    """
+    Requests sent together are ordered in fewer PRE-PREPAREs than the number of
+    requests and every node executes all of them
+    """
+    numReqs = 2 * Max3PCBatchSize
+    sendReqsToNodesAndVerifySuffReplies(looper, wallet1, client1, numReqs, 1)
+    looper.run(eventually(checkNodeLedgersForEquality, txnPoolNodeSet[0],
+                          *txnPoolNodeSet[1:], retryWait=1, timeout=5))
+
+    for node in txnPoolNodeSet:
+        for replica in node.replicas:
+            ppSeqNos = {ppSeqNo for _, ppSeqNo in replica.ordered}
+            assert len(ppSeqNos) < numReqs
+        primary = node.replicas[0]
+        if primary.isPrimary:
+            batches = list(primary.sentPrePrepares.values())
+            assert sum(len(pp.reqIdr) for pp in batches) == numReqs
+            assert all(len(pp.reqIdr) <= Max3PCBatchSize for pp in batches)
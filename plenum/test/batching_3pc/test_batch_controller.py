@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from plenum.server.batching import BatchController
+
+
+def adaptiveConfig(**kwargs):
+    config = dict(Adaptive3PCBatching=True,
+                  Min3PCBatchSize=1,
+                  Max3PCBatchSize=16,
+                  Min3PCBatchWait=0,
+                  Max3PCBatchWait=1,
+                  Target3PCBatchLatency=1,
+                  Adapt3PCBatchFreq=0)
+    config.update(kwargs)
+    return SimpleNamespace(**config)
+
+
+def testConfiguredValuesUsedWhenNotAdaptive():
+    config = adaptiveConfig(Adaptive3PCBatching=False)
+    controller = BatchController(config)
+    assert not controller.update(100, lambda: 0)
+    assert controller.batchSize == config.Max3PCBatchSize
+    assert controller.batchWait == config.Max3PCBatchWait
+
+
+def testBatchSizeFollowsQueueDepth():
+    config = adaptiveConfig()
+    controller = BatchController(config)
+    assert controller.batchSize == config.Min3PCBatchSize
+    for _ in range(10):
+        controller.update(100, lambda: 0)
+    assert controller.batchSize == config.Max3PCBatchSize
+    for _ in range(10):
+        controller.update(0, lambda: 0)
+    assert controller.batchSize == config.Min3PCBatchSize
+
+
+def testBatchWaitFollowsLatency():
+    config = adaptiveConfig()
+    controller = BatchController(config)
+    for _ in range(20):
+        controller.update(10, lambda: .1)
+    assert controller.batchWait == config.Max3PCBatchWait
+
+    controller.update(10, lambda: 2)
+    assert controller.batchWait == config.Max3PCBatchWait / 2
+
+    # With hardly any load there is nothing to wait for
+    controller.update(1, lambda: .1)
+    assert controller.batchWait == config.Min3PCBatchWait
+    assert controller.metrics() == {"adaptive": True,
+                                    "batchSize": controller.batchSize,
+                                    "batchWait": config.Min3PCBatchWait}
+
+
+def testUpdatesAreRateLimited():
+    controller = BatchController(adaptiveConfig(Adapt3PCBatchFreq=60))
+    assert controller.update(100, lambda: 0)
+    assert not controller.update(100, lambda: 0)
@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from plenum.server.batching import InFlightWindow
+
+
+def pipelinedConfig(**kwargs):
+    config = dict(Pipelined3PC=True,
+                  Min3PCInFlight=1,
+                  Max3PCInFlight=64,
+                  InFlightRttFactor=2,
+                  CHK_FREQ=10,
+                  LOG_SIZE=30)
+    config.update(kwargs)
+    return SimpleNamespace(**config)
+
+
+def orderWindows(window, rtt, count):
+    for _ in range(count):
+        for _ in range(window.size):
+            window.ordered(rtt)
+
+
+def testNoWindowWhenNotPipelined():
+    window = InFlightWindow(pipelinedConfig(Pipelined3PC=False))
+    assert window.size is None
+    assert not window.isFull(1000)
+    assert not window.ordered(1)
+
+
+def testWindowGrowsTillCheckpointHeadroom():
+    config = pipelinedConfig()
+    window = InFlightWindow(config)
+    assert window.size == config.Min3PCInFlight
+    assert window.isFull(1)
+    orderWindows(window, .1, 10)
+    # Capped below `Max3PCInFlight` by `LOG_SIZE - CHK_FREQ`
+    assert window.size == config.LOG_SIZE - config.CHK_FREQ
+    assert not window.isFull(window.size - 1)
+    assert window.isFull(window.size)
+
+
+def testWindowShrinksWhenRoundTripGrows():
+    window = InFlightWindow(pipelinedConfig())
+    orderWindows(window, .1, 4)
+    grown = window.size
+    orderWindows(window, 1, 2)
+    assert window.size < grown
+    assert not window.slowStart
+
+    # Grows again, one batch at a time, at the new round trip time
+    shrunk = window.size
+    orderWindows(window, 1, 3)
+    assert window.size == shrunk + 3
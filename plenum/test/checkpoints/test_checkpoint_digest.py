@@ -0,0 +1,24 @@
+from plenum.common.eventually import eventually
+from plenum.test.checkpoints.conftest import CHK_FREQ
+from plenum.test.checkpoints.helper import chkChkpoints
+from plenum.test.helper import sendReqsToNodesAndVerifySuffReplies
+
+
+def testCheckpointDigestIsFixedSizeAndAgreed(chkFreqPatched, looper,
+                                            txnPoolNodeSet, client1, wallet1,
+                                            client1Connected):
+    """
+    The digest of a stable checkpoint is a single fixed size hash which is
+    the same on the replicas of a protocol instance
+    """
+    sendReqsToNodesAndVerifySuffReplies(looper, wallet1, client1, CHK_FREQ, 1)
+    looper.run(eventually(chkChkpoints, txnPoolNodeSet, 1, 0, retryWait=1))
+
+    for instId in range(len(txnPoolNodeSet[0].replicas)):
+        digests = set()
+        for node in txnPoolNodeSet:
+            _, state = node.replicas[instId].firstCheckPoint
+            assert state.isStable
+            assert len(state.digest) == 64
+            digests.add(state.digest)
+        assert len(digests) == 1
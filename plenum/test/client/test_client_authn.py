@@ -54,3 +54,38 @@ def testReconstitutedClientCreatesTheSameSig(cli, sig, msg):
     cli2 = SimpleSigner(idr, seed=cli.seed)
     sig2 = cli2.sign(msg)
     assert sig == sig2
+
+
+def testVerifiersCached(cli, msg, sig):
+    sa = SimpleAuthNr()
+    sa.addClient(cli.identifier, cli.verkey)
+    for _ in range(3):
+        sa.authenticate(msg, idr, sig)
+    assert sa.verifierCache.misses == 1
+    assert sa.verifierCache.hits == 2
+
+
+def testVerifierCacheInvalidatedOnNewKey(cli, msg, sig):
+    sa = SimpleAuthNr()
+    sa.addClient(cli.identifier, cli.verkey)
+    sa.authenticate(msg, idr, sig)
+
+    # The client's key changes, signatures with the old key do not verify
+    newCli = SimpleSigner(idr)
+    sa.addClient(cli.identifier, newCli.verkey)
+    assert len(sa.verifierCache) == 0
+    with pytest.raises(InvalidSignature):
+        sa.authenticate(msg, idr, sig)
+    sa.authenticate(msg, idr, newCli.sign(msg))
+
+
+def testVerifierCacheBounded(msg):
+    sa = SimpleAuthNr(verifierCacheSize=2)
+    signers = [SimpleSigner() for _ in range(3)]
+    for signer in signers:
+        sa.addClient(signer.identifier, signer.verkey)
+        sa.authenticate(msg, signer.identifier, signer.sign(msg))
+    assert len(sa.verifierCache) == 2
+    # The least recently used verifier was evicted
+    sa.authenticate(msg, signers[0].identifier, signers[0].sign(msg))
+    assert sa.verifierCache.misses == 4
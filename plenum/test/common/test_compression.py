@@ -0,0 +1,59 @@
+import json
+import zlib
+from base64 import b64encode
+
+import pytest
+
+from plenum.common.compression import ZLIB, compressMsg, decompressMsg
+from plenum.common.exceptions import InvalidNodeMsg
+from plenum.common.msg_decoder import decodeNodeMsg
+from plenum.common.types import Batch, CatchupRep, Compressed, \
+    ConsistencyProof, OP_FIELD_NAME
+
+
+def melted(msg):
+    return dict(msg._asdict(), **{OP_FIELD_NAME: msg.typename})
+
+
+def catchupRep(count):
+    txns = {str(seqNo): {"type": "NYM", "dest": "dest{}".format(seqNo),
+                         "identifier": "steward1", "reqId": seqNo}
+            for seqNo in range(1, count + 1)}
+    return CatchupRep(1, txns, ["proof1", "proof2"])
+
+
+def testLargeMessagesCompressed():
+    rep = catchupRep(1000)
+    compressed = compressMsg(rep, threshold=1024)
+    assert isinstance(compressed, Compressed)
+    assert len(json.dumps(melted(compressed))) < \
+        len(json.dumps(melted(rep))) / 3
+    assert decodeNodeMsg(melted(compressed)) == rep
+    assert decompressMsg(melted(compressed)) == melted(rep)
+
+    # Small messages are sent as they are
+    proof = ConsistencyProof(1, 10, 20, "old", "new", ["hash"])
+    assert compressMsg(proof, threshold=1024) is proof
+
+
+def testCompressedMsgInBatchDecodedWhenProcessed():
+    rep = catchupRep(10)
+    compressed = melted(compressMsg(rep))
+    batch = decodeNodeMsg(melted(Batch([compressed], None)))
+    assert batch.messages == [compressed]
+    assert decodeNodeMsg(batch.messages[0]) == rep
+
+
+def testInvalidCompressedMsgsRejected():
+    compressed = compressMsg(catchupRep(100))
+    with pytest.raises(InvalidNodeMsg):
+        decompressMsg(compressed, maxSize=100)
+    with pytest.raises(InvalidNodeMsg):
+        decodeNodeMsg(melted(Compressed("lzma", compressed.data)))
+    with pytest.raises(InvalidNodeMsg):
+        decodeNodeMsg(melted(Compressed(ZLIB, compressed.data[:100])))
+    # Compressed messages are not decompressed again
+    twice = b64encode(zlib.compress(
+        json.dumps(melted(compressed)).encode())).decode()
+    with pytest.raises(InvalidNodeMsg):
+        decodeNodeMsg(melted(Compressed(ZLIB, twice)))
@@ -0,0 +1,152 @@
+import time
+
+import pytest
+
+from plenum.common.exceptions import InvalidNodeMsg, InvalidNodeMsgField, \
+    InvalidNodeOp, MissingNodeOp
+from plenum.common.log import getlogger
+from plenum.common.msg_decoder import decodeNodeMsg
+from plenum.common.stacked import PositionalCodec
+from plenum.common.types import Batch, Commit, InstanceChange, Prepare, \
+    PrePrepare, Propagate, OP_FIELD_NAME, TaggedTuples
+
+logger = getlogger()
+
+
+def melted(msg):
+    return dict(msg._asdict(), **{OP_FIELD_NAME: msg.typename})
+
+
+def threePhaseMsgs(count):
+    msgs = []
+    for ppSeqNo in range(1, count + 1):
+        msgs.append(PrePrepare(0, 0, ppSeqNo, [["cli1", ppSeqNo]], "digest",
+                               time.time()))
+        msgs.append(Prepare(0, 0, ppSeqNo, "digest", time.time()))
+        msgs.append(Commit(0, 0, ppSeqNo, "digest", time.time()))
+    return msgs
+
+
+def decodeByKeywords(msg):
+    """
+    Decoding of node messages before messages had decoders, a batch and each
+    message in it are decoded separately
+    """
+    msg = dict(msg)
+    op = msg.pop(OP_FIELD_NAME)
+    decoded = TaggedTuples[op](**msg)
+    if isinstance(decoded, Batch):
+        for m in decoded.messages:
+            decodeByKeywords(m)
+    return decoded
+
+
+def testMessagesDecoded():
+    for msg in threePhaseMsgs(2) + [InstanceChange(1),
+                                    Propagate({"reqId": 1}, "Client1")]:
+        assert decodeNodeMsg(melted(msg)) == msg
+        assert type(decodeNodeMsg(melted(msg))) is type(msg)
+
+
+def testBatchDecodedInOnePass():
+    msgs = threePhaseMsgs(2)
+    invalid = {OP_FIELD_NAME: "UNKNOWN"}
+    batch = Batch([melted(m) for m in msgs] + [invalid], None)
+    decoded = decodeNodeMsg(melted(batch))
+    assert isinstance(decoded, Batch)
+    assert decoded.messages[:-1] == msgs
+    assert all(type(d) is type(m) for d, m in zip(decoded.messages, msgs))
+    # Left to be rejected when processed
+    assert decoded.messages[-1] == invalid
+
+
+def testInvalidMessagesRejected():
+    with pytest.raises(MissingNodeOp):
+        decodeNodeMsg({"viewNo": 1})
+    with pytest.raises(InvalidNodeOp):
+        decodeNodeMsg({OP_FIELD_NAME: "UNKNOWN"})
+    msg = melted(Prepare(0, 0, 1, "digest", time.time()))
+    del msg["digest"]
+    with pytest.raises(InvalidNodeMsg):
+        decodeNodeMsg(msg)
+    with pytest.raises(InvalidNodeMsg):
+        decodeNodeMsg(dict(melted(InstanceChange(1)), extra=1))
+    with pytest.raises(InvalidNodeMsgField) as ex:
+        decodeNodeMsg(melted(InstanceChange("BAD")))
+    # The message is kept to be reported
+    assert ex.value.msg == InstanceChange("BAD")
+    assert "viewNo has incorrect type" in ex.value.reason
+
+
+def testPositionalMessagesDecoded():
+    codec = PositionalCodec()
+    for msg in threePhaseMsgs(2) + [InstanceChange(1),
+                                    Propagate({"reqId": 1}, "Client1")]:
+        positional = codec.encode(melted(msg))
+        assert isinstance(positional, list)
+        assert decodeNodeMsg(positional) == msg
+        assert type(decodeNodeMsg(positional)) is type(msg)
+
+    positional = codec.encode(melted(Prepare(0, 0, 1, "digest", 1.5)))
+    with pytest.raises(InvalidNodeMsg):
+        decodeNodeMsg(positional[:-1])
+    with pytest.raises(InvalidNodeMsg):
+        decodeNodeMsg(positional + [1])
+    with pytest.raises(InvalidNodeOp):
+        decodeNodeMsg([1000] + positional[1:])
+    with pytest.raises(InvalidNodeMsgField):
+        decodeNodeMsg(codec.encode(melted(InstanceChange("BAD"))))
+    # Left to be rejected when processed
+    batch = melted(Batch([positional[:-1]], None))
+    assert decodeNodeMsg(batch).messages == [positional[:-1]]
+
+
+def decodingRates(runs, rounds, repeats=9):
+    """
+    Messages decoded per second by each run in the median of `repeats`
+    repetitions. The runs are interleaved in each repetition so that changes
+    in the speed of the machine affect them alike.
+
+    :param runs: name of each run -> decoding function and messages to decode
+    """
+    rates = {name: [] for name in runs}
+    for _ in range(repeats):
+        for name, (decode, msgs) in runs.items():
+            start = time.perf_counter()
+            for _ in range(rounds):
+                for msg in msgs:
+                    decode(msg)
+            taken = time.perf_counter() - start
+            rates[name].append(rounds * len(msgs) / taken)
+    return {name: sorted(r)[repeats // 2] for name, r in rates.items()}
+
+
+def testDecodingBenchmark():
+    """
+    Messages decoded per second by keyword arguments, as node messages were
+    decoded before, by their decoders and by their decoders when sent by a
+    positional codec. A batch counts as the messages in it. The rates are
+    only logged since they vary with the load of the machine.
+    """
+    msgs = threePhaseMsgs(100)
+    single = [melted(m) for m in msgs]
+    codec = PositionalCodec()
+    positional = [codec.encode(m) for m in single]
+    assert [decodeNodeMsg(m) for m in single] == \
+        [decodeByKeywords(m) for m in single] == msgs
+    assert [decodeNodeMsg(m) for m in positional] == msgs
+    runs = {}
+    for name, decode, encoded in (("keywords", decodeByKeywords, single),
+                                  ("decoders", decodeNodeMsg, single),
+                                  ("positional", decodeNodeMsg, positional)):
+        runs[name] = (decode, encoded)
+        runs[name, "batched"] = (decode, [melted(Batch(encoded[i:i + 30],
+                                                       None))
+                                          for i in range(0, len(encoded), 30)])
+    rates = decodingRates(runs, rounds=10)
+    batchSize = len(single) / len(runs["keywords", "batched"][1])
+    results = {name: (rates[name], rates[name, "batched"] * batchSize)
+               for name in ("keywords", "decoders", "positional")}
+    for name, (singleRate, batchedRate) in results.items():
+        logger.info("decoding by {}: {:.0f} messages/sec, {:.0f} batched "
+                    "messages/sec".format(name, singleRate, batchedRate))
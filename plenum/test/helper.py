@@ -304,9 +304,10 @@ def checkPropagateReqCountOfNode(node: TestNode, identifier: str, reqId: int):
 def requestReturnedToNode(node: TestNode, identifier: str, reqId: int,
                                instId: int):
     params = getAllArgs(node, node.processOrdered)
-    # Skipping the view no and time from each ordered request
-    recvdOrderedReqs = [p['ordered'][:1] + p['ordered'][2:-1] for p in params]
-    expected = (instId, identifier, reqId)
+    # Skipping the view no, ppSeqNo and time from each ordered batch
+    recvdOrderedReqs = [(p['ordered'].instId, tuple(key))
+                        for p in params for key in p['ordered'].reqIdr]
+    expected = (instId, (identifier, reqId))
     return expected in recvdOrderedReqs
 
 
@@ -318,7 +319,7 @@ def checkRequestReturnedToNode(node: TestNode, identifier: str, reqId: int,
 def checkPrePrepareReqSent(replica: TestReplica, req: Request):
     prePreparesSent = getAllArgs(replica, replica.doPrePrepare)
     expected = req.reqDigest
-    assert expected in [p["reqDigest"] for p in prePreparesSent]
+    assert expected in [rd for p in prePreparesSent for rd in p["reqDigests"]]
 
 
 def checkPrePrepareReqRecvd(replicas: Iterable[TestReplica],
@@ -334,8 +335,7 @@ def checkPrepareReqSent(replica: TestReplica, identifier: str, reqId: int):
                           replica.canSendPrepare)
     for params in paramsList:
         req = params['request']
-        assert req.identifier == identifier
-        assert req.reqId == reqId
+        assert (identifier, reqId) in req.reqIdr
     assert all(rv)
 
 
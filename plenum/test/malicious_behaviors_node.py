@@ -3,6 +3,7 @@ import types
 from functools import partial
 
 import time
+from typing import List
 
 import plenum.common.error
 from plenum.common.types import Propagate, PrePrepare, Prepare, ThreePhaseMsg, \
@@ -46,13 +47,18 @@ def delaysPrePrepareProcessing(node, delay: float=30, instId: int=None):
 # instance id but this looks more useful as a complete node can be malicious
 def sendDuplicate3PhaseMsg(node: TestNode, msgType: ThreePhaseMsg, count: int=2,
                            instId=None):
-    def evilSendPrePrepareRequest(self, reqDigest: ReqDigest):
+    def evilSendPrePrepareRequest(self, reqDigests: List[ReqDigest]):
         tm = time.time()
         prePrepare = PrePrepare(self.instId, self.viewNo,
-                                self.lastPrePrepareSeqNo+1, *reqDigest, tm)
-        logger.debug("EVIL: Creating pre-prepare message for request {}: {}".
-                     format(reqDigest, prePrepare))
-        self.sentPrePrepares[self.viewNo, self.lastPrePrepareSeqNo] = (reqDigest, tm)
+                                self.lastPrePrepareSeqNo+1,
+                                [rd.key for rd in reqDigests],
+                                self.batchDigest([rd.digest
+                                                  for rd in reqDigests]),
+                                tm)
+        logger.debug("EVIL: Creating pre-prepare message for requests {}: {}".
+                     format(reqDigests, prePrepare))
+        self.sentPrePrepares[self.viewNo, self.lastPrePrepareSeqNo] = \
+            prePrepare
         sendDup(self, prePrepare, TPCStat.PrePrepareSent, count)
 
     def evilSendPrepare(self, request):
@@ -120,14 +126,15 @@ def malignInstancesOfNode(node: TestNode, malignMethod, instId: int=None):
 
 def send3PhaseMsgWithIncorrectDigest(node: TestNode, msgType: ThreePhaseMsg,
                                      instId: int=None):
-    def evilSendPrePrepareRequest(self, reqDigest: ReqDigest):
-        reqDigest = ReqDigest(reqDigest.identifier, reqDigest.reqId, "random")
+    def evilSendPrePrepareRequest(self, reqDigests: List[ReqDigest]):
         tm = time.time()
         prePrepare = PrePrepare(self.instId, self.viewNo,
-                                self.lastPrePrepareSeqNo+1, *reqDigest, tm)
-        logger.debug("EVIL: Creating pre-prepare message for request {}: {}".
-                     format(reqDigest, prePrepare))
-        self.sentPrePrepares[self.viewNo, self.lastPrePrepareSeqNo] = (reqDigest, tm)
+                                self.lastPrePrepareSeqNo+1,
+                                [rd.key for rd in reqDigests], "random", tm)
+        logger.debug("EVIL: Creating pre-prepare message for requests {}: {}".
+                     format(reqDigests, prePrepare))
+        self.sentPrePrepares[self.viewNo, self.lastPrePrepareSeqNo] = \
+            prePrepare
         self.send(prePrepare, TPCStat.PrePrepareSent)
 
     def evilSendPrepare(self, request):
@@ -0,0 +1,65 @@
+from plenum.common.catchup_reply_buffer import CatchupReplyBuffer
+
+
+def txns(start, end):
+    return [(s, {"reqId": s}) for s in range(start, end + 1)]
+
+
+def ranges(buffer):
+    return [(r.frm, r.start, r.end) for r in buffer]
+
+
+def testRepliesFoundByRange():
+    buffer = CatchupReplyBuffer()
+    assert buffer.add("Alpha", txns(11, 20), ["proof"], 0)
+    assert buffer.add("Beta", txns(31, 40), [], 0)
+    assert len(buffer) == 20
+
+    assert buffer.at(11).frm == "Alpha"
+    assert buffer.at(11).consProof == ["proof"]
+    assert buffer.at(12) is None
+    assert buffer.covering(15).frm == "Alpha"
+    assert buffer.covering(40).frm == "Beta"
+    assert buffer.covering(25) is None
+    assert buffer.covering(5) is None
+    assert buffer.missing(1, 50) == [(1, 10), (21, 30), (41, 50)]
+    assert buffer.missing(15, 35) == [(21, 30)]
+    assert buffer.missing(11, 20) == []
+
+
+def testOverlappingRepliesTrimmed():
+    buffer = CatchupReplyBuffer()
+    buffer.add("Alpha", txns(11, 20), [], 0)
+    buffer.add("Beta", txns(31, 40), [], 0)
+    buffer.add("Gamma", txns(41, 45), [], 0)
+
+    # Already buffered or applied
+    assert buffer.add("Delta", txns(12, 18), [], 0) is None
+    assert buffer.add("Delta", txns(1, 10), [], 10) is None
+
+    # The head of a reply already buffered is dropped, a buffered reply
+    # covered by it is replaced and one overlapping its tail loses its head
+    assert buffer.add("Delta", txns(15, 42), [], 0)
+    assert ranges(buffer) == [("Alpha", 11, 20), ("Delta", 21, 42),
+                              ("Gamma", 43, 45)]
+    assert len(buffer) == 35
+    assert buffer.at(43).txns == txns(43, 45)
+    assert buffer.missing(1, 50) == [(1, 10), (46, 50)]
+
+
+def testAppliedRepliesReleased():
+    buffer = CatchupReplyBuffer()
+    buffer.add("Alpha", txns(1, 10), [], 0)
+    buffer.add("Beta", txns(11, 20), [], 0)
+    buffer.add("Gamma", txns(21, 30), [], 0)
+
+    buffer.release(15)
+    assert ranges(buffer) == [("Beta", 16, 20), ("Gamma", 21, 30)]
+    assert buffer.at(16).txns == txns(16, 20)
+    assert len(buffer) == 15
+
+    buffer.remove(buffer.at(21))
+    assert ranges(buffer) == [("Beta", 16, 20)]
+    buffer.release(20)
+    assert len(buffer) == 0
+    assert list(buffer) == []
@@ -0,0 +1,120 @@
+from plenum.common.catchup_stream import CatchupStream
+from plenum.common.types import CatchupReq, f
+
+peers = ["Alpha", "Beta", "Gamma"]
+
+
+def newStream(start=1, end=1000, chunkSize=100, maxInFlight=2, timeout=5):
+    return CatchupStream(1, start, end, peers, chunkSize, maxInFlight,
+                         timeout)
+
+
+def ranges(reqs):
+    return [(peer, getattr(req, f.SEQ_NO_START.nm),
+             getattr(req, f.SEQ_NO_END.nm)) for peer, req in reqs]
+
+
+def testChunksRequestedWithBoundedInFlight():
+    stream = newStream(start=11, end=1005)
+    reqs = stream.requests(now=0)
+    assert all(isinstance(req, CatchupReq) for _, req in reqs)
+    sent = ranges(reqs)
+    # Two chunks in flight to each node, requested in order
+    assert [(s, e) for _, s, e in sent] == \
+        [(11, 110), (111, 210), (211, 310), (311, 410), (411, 510),
+         (511, 610)]
+    assert {peer: sum(1 for p, _, _ in sent if p == peer)
+            for peer in peers} == {peer: 2 for peer in peers}
+    assert stream.requests(now=0) == []
+
+    # A received chunk frees a slot of the node which sent it
+    peer, s, e = sent[0]
+    assert stream.received(peer, s, e, now=1)
+    assert ranges(stream.requests(now=1)) == [(peer, 611, 710)]
+    # Duplicates and replies to requests not sent are not accepted
+    assert not stream.received(peer, s, e, now=1)
+    assert not stream.received(peer, 911, 1005, now=1)
+
+    stream.applied(110)
+    assert 11 not in stream.chunks
+    assert not stream.done
+
+
+def testFasterNodesPreferred():
+    stream = newStream(end=1500, maxInFlight=2)
+    for peer, s, e in ranges(stream.requests(now=0)):
+        # Gamma is ten times as slow as the others
+        stream.received(peer, s, e, now=10 if peer == "Gamma" else 1)
+    sent = ranges(stream.requests(now=10))
+    assert [p for p, _, _ in sent].count("Gamma") == 1
+    assert sent[0][0] != "Gamma"
+    assert stream.latencies["Gamma"] > 2 * stream.latencies["Alpha"]
+
+
+def testOnlyMissingChunksRequestedAgain():
+    stream = newStream(end=400, maxInFlight=1)
+    sent = ranges(stream.requests(now=0))
+    assert len(sent) == 3
+    for peer, s, e in sent[1:]:
+        stream.received(peer, s, e, now=1)
+    assert stream.expire(now=3) == []
+
+    # The chunk not received is requested again, from another node
+    slowPeer, s, e = sent[0]
+    expired = stream.expire(now=6)
+    assert [(c.start, c.end) for c in expired] == [(s, e)]
+    again = ranges(stream.requests(now=6))
+    assert (s, e) in [(rs, re) for _, rs, re in again]
+    assert all(p != slowPeer for p, rs, _ in again if rs == s)
+    # The last chunk was never requested before
+    assert sorted((rs, re) for _, rs, re in again) == [(1, 100), (301, 400)]
+
+    # A reply from the node which timed out is still used
+    assert stream.received(slowPeer, s, e, now=7)
+
+    # A chunk partially sent is requested for the rest
+    peer = next(p for p, rs, _ in again if rs == 301)
+    assert stream.received(peer, 301, 350, now=7)
+    assert ranges(stream.requests(now=7))[0][1:] == (351, 400)
+
+
+def testFailedChunksAndRemovedNodes():
+    stream = newStream(end=300, maxInFlight=1)
+    sent = ranges(stream.requests(now=0))
+    peer, s, e = sent[0]
+    stream.received(peer, s, e, now=1)
+
+    # The chunk could not be verified and its sender is removed
+    stream.failed(s)
+    stream.removePeer(peer)
+    assert peer not in stream.peers
+    again = ranges(stream.requests(now=1))
+    assert again == []
+    stream.removePeer(sent[1][0])
+    lastPeer, ls, le = sent[2]
+    assert stream.received(lastPeer, ls, le, now=2)
+    again = ranges(stream.requests(now=2))
+    assert again == [(lastPeer, s, e)]
+
+    # A reply from a removed node requested before is still used
+    assert stream.received(*sent[1], now=3)
+    assert stream.received(*again[0], now=3)
+    stream.applied(300)
+    assert stream.done
+
+
+def testNodesAddedBack():
+    stream = newStream(end=300, maxInFlight=1)
+    sent = ranges(stream.requests(now=0))
+    # All nodes disconnected
+    for peer in peers:
+        stream.removePeer(peer)
+    assert stream.peers == []
+    assert stream.requests(now=1) == []
+
+    # A node reconnects and is sent the chunks awaited from the others
+    stream.addPeer("Beta")
+    stream.addPeer("Beta")
+    assert stream.peers == ["Beta"]
+    assert ranges(stream.requests(now=2)) == [("Beta", *sent[0][1:])]
+    assert stream.inFlight["Beta"] == 1
@@ -0,0 +1,153 @@
+import json
+import os
+from base64 import b64encode
+from hashlib import sha256
+from types import SimpleNamespace
+
+import pytest
+
+from plenum.common.catchup_reply_buffer import CatchupReplyBuffer
+from plenum.common.catchup_verifier import CatchupVerifier, \
+    deferredDurability
+
+
+class Hasher:
+    @staticmethod
+    def hash_empty():
+        return sha256().digest()
+
+    @staticmethod
+    def hash_leaf(data):
+        return sha256(b"\x00" + data).digest()
+
+    @staticmethod
+    def hash_children(left, right):
+        return sha256(b"\x01" + left + right).digest()
+
+
+class Serializer:
+    @staticmethod
+    def serialize(txn):
+        return json.dumps(txn, sort_keys=True).encode()
+
+
+def merkleRoot(leaves):
+    """
+    Merkle tree hash of the leaves, computed as RFC 6962 defines it
+    """
+    if not leaves:
+        return Hasher.hash_empty()
+    if len(leaves) == 1:
+        return Hasher.hash_leaf(leaves[0])
+    k = 1
+    while k * 2 < len(leaves):
+        k *= 2
+    return Hasher.hash_children(merkleRoot(leaves[:k]),
+                                merkleRoot(leaves[k:]))
+
+
+def subtreeHashes(leaves):
+    """
+    Hashes of the full subtrees of a tree of the leaves, largest first
+    """
+    hashes = []
+    start = 0
+    while start < len(leaves):
+        k = 1
+        while start + k * 2 <= len(leaves):
+            k *= 2
+        hashes.append(merkleRoot(leaves[start:start + k]))
+        start += k
+    return hashes
+
+
+def txnsFrom(start, count):
+    return [(s, {"reqId": s}) for s in range(start, start + count)]
+
+
+def ledgerOf(size):
+    leaves = [Serializer.serialize(txn) for _, txn in txnsFrom(1, size)]
+    return SimpleNamespace(leafSerializer=Serializer(), hasher=Hasher(),
+                           tree=SimpleNamespace(tree_size=size,
+                                                hashes=subtreeHashes(leaves)))
+
+
+class RootVerifier:
+    """
+    Accepts a proof if it is the root of the tree being verified
+    """
+
+    @staticmethod
+    def verify_tree_consistency(size, finalSize, root, finalRoot, proof):
+        return proof == [root]
+
+
+def buffered(start, count, batchSize, badBatch=None):
+    """
+    Buffer `count` transactions from `start` in replies of `batchSize`,
+    each with the root of the tree after its last transaction as its proof
+    """
+    leaves = [Serializer.serialize(txn) for _, txn in txnsFrom(1, start - 1)]
+    buffer = CatchupReplyBuffer()
+    for s in range(start, start + count, batchSize):
+        txns = txnsFrom(s, batchSize)
+        leaves.extend(Serializer.serialize(txn) for _, txn in txns)
+        proof = merkleRoot(leaves) if s != badBatch else b"wrong"
+        buffer.add("Node{}".format(s), txns, [b64encode(proof).decode()], 0)
+    return buffer, b64encode(merkleRoot(leaves)).decode()
+
+
+@pytest.fixture(params=[0, 2], ids=["inProcess", "pooled"])
+def verifier(request):
+    verifier = CatchupVerifier(workers=request.param)
+    request.addfinalizer(verifier.stop)
+    return verifier
+
+
+def testRepliesVerifiedInOrder(verifier):
+    ledger = ledgerOf(0)
+    buffer, root = buffered(1, 100, 10)
+    assert verifier.verify(ledger, RootVerifier, list(buffer), 100, root) \
+        == 10
+    # The tree of the ledger is left as it is
+    assert ledger.tree.tree_size == 0 and not ledger.tree.hashes
+
+
+def testRepliesFollowingLedgerVerified(verifier):
+    ledger = ledgerOf(37)
+    buffer, root = buffered(38, 63, 9)
+    assert verifier.verify(ledger, RootVerifier, list(buffer), 100, root) \
+        == 7
+
+
+def testVerificationStopsAtInvalidReply(verifier):
+    ledger = ledgerOf(0)
+    buffer, root = buffered(1, 100, 10, badBatch=41)
+    assert verifier.verify(ledger, RootVerifier, list(buffer), 100, root) \
+        == 4
+    # A malformed proof does not verify either
+    assert verifier.verify(ledger, RootVerifier, list(buffer), 100,
+                           "abc") == 0
+
+
+def testDurabilityDeferredToOneSync(tdir_for_func):
+    path = os.path.join(tdir_for_func, "transactions")
+    log = SimpleNamespace(ensureDurability=True, dbFile=open(path, "a"))
+    leaves = SimpleNamespace(ensureDurability=True)
+    ledger = SimpleNamespace(_transactionLog=log, tree=SimpleNamespace(
+        hashStore=SimpleNamespace(leavesFile=leaves)))
+
+    with deferredDurability(ledger):
+        assert not log.ensureDurability
+        assert not leaves.ensureDurability
+        log.dbFile.write("txn\n")
+    assert log.ensureDurability and leaves.ensureDurability
+    with open(path) as data:
+        assert data.read() == "txn\n"
+    log.dbFile.close()
+
+    # Stores not syncing every write are left so
+    log = SimpleNamespace(ensureDurability=False)
+    with deferredDurability(SimpleNamespace(_transactionLog=log)):
+        pass
+    assert not log.ensureDurability
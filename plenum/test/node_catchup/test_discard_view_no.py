@@ -57,8 +57,7 @@ def testNodeDiscardMessageFromUnknownView(txnPoolNodeSet,
             0,
             viewNo,
             10,
-            wallet.defaultId,
-            wallet._getIdData().lastReqId+1,
+            [(wallet.defaultId, wallet._getIdData().lastReqId+1)],
             "random digest",
             time.time()
             )
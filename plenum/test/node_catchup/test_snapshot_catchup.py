@@ -0,0 +1,32 @@
+import pytest
+
+from plenum.test.test_ledger_manager import TestLedgerManager
+
+txnCount = 25
+
+SnapshotChunkSize = 10
+
+
+@pytest.fixture(scope="module", autouse=True)
+def snapshotCatchup(tconf, request):
+    oldThreshold = tconf.SnapshotCatchupThreshold
+    oldChunkSize = tconf.SnapshotChunkSize
+    tconf.SnapshotCatchupThreshold = 1
+    tconf.SnapshotChunkSize = SnapshotChunkSize
+
+    def reset():
+        tconf.SnapshotCatchupThreshold = oldThreshold
+        tconf.SnapshotChunkSize = oldChunkSize
+
+    request.addfinalizer(reset)
+    return tconf
+
+
+def testNewNodeCatchupFromSnapshot(newNodeCaughtUp):
+    """
+    A new node far behind the other nodes fetches whole chunks of their
+    ledgers as snapshots and the remaining transactions as usual
+    """
+    chunks = newNodeCaughtUp.ledgerManager.spylog.getAll(
+        TestLedgerManager.processSnapshotChunk.__name__)
+    assert len(chunks) >= txnCount // SnapshotChunkSize
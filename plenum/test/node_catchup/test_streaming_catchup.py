@@ -0,0 +1,33 @@
+import pytest
+
+from plenum.test.test_ledger_manager import TestLedgerManager
+
+txnCount = 10
+
+
+@pytest.fixture(scope="module", autouse=True)
+def streamingCatchup(tconf, request):
+    oldStreaming = tconf.StreamingCatchup
+    oldChunkSize = tconf.CatchupChunkSize
+    tconf.StreamingCatchup = True
+    tconf.CatchupChunkSize = 3
+
+    def reset():
+        tconf.StreamingCatchup = oldStreaming
+        tconf.CatchupChunkSize = oldChunkSize
+
+    request.addfinalizer(reset)
+    return tconf
+
+
+def testNewNodeCatchupInChunks(newNodeCaughtUp):
+    """
+    A new node catches up its ledgers by requesting chunks of transactions
+    from the other nodes
+    """
+    ledgerManager = newNodeCaughtUp.ledgerManager
+    streams = ledgerManager.spylog.getAll(
+        TestLedgerManager.startCatchupStream.__name__)
+    # The domain ledger is always behind, 1 is its type
+    assert 1 in {s.params['ledgerType'] for s in streams}
+    assert all(s is None for s in ledgerManager.catchupStreams.values())
@@ -77,9 +77,8 @@ def checkPrePrepared(looper,
                     instId,
                     primary.viewNo,
                     primary.lastPrePrepareSeqNo,
-                    propagated1.identifier,
-                    propagated1.reqId,
-                    propagated1.digest,
+                    [propagated1.key],
+                    Replica.batchDigest([propagated1.digest]),
                     time.time())
 
             passes = 0
@@ -109,12 +108,7 @@ def checkPrePrepared(looper,
             """
             actualMsgs = len([param for param in
                               getAllArgs(primary, primary.doPrePrepare)
-                              if (param['reqDigest'].identifier,
-                                  param['reqDigest'].reqId,
-                                  param['reqDigest'].digest) ==
-                              (propagated1.identifier,
-                               propagated1.reqId,
-                               propagated1.digest)
+                              if propagated1.reqDigest in param['reqDigests']
                               ])
 
             numOfMsgsWithZFN = 1
@@ -0,0 +1,55 @@
+from plenum.common.eventually import eventually
+from plenum.common.types import Commit
+from plenum.test.helper import sendRandomRequest, getPrimaryReplica
+from plenum.test.spy_helpers import getAllArgs
+from plenum.test.test_node import getNonPrimaryReplicas
+
+commitDelay = 5
+
+
+def testStashedCommitOrderedOnceGapFills(looper, nodeSet, up, client1,
+                                         wallet1):
+    """
+    Hold back COMMITs of the first of two requests at a replica so that the
+    second request gets COMMIT quorum first. The second request should be
+    stashed and ordered right after the first one, without waiting for any
+    timer.
+    """
+    primary = getPrimaryReplica(nodeSet, 0)
+    slowRep = getNonPrimaryReplicas(nodeSet, 0)[0]
+    firstPpSeqNo = primary.lastPrePrepareSeqNo + 1
+
+    def delayFirstCommits(wrappedMsg):
+        msg, frm = wrappedMsg
+        if isinstance(msg, Commit) and msg.instId == 0 and \
+                msg.ppSeqNo == firstPpSeqNo:
+            return commitDelay
+
+    slowRep.node.nodeIbStasher.delay(delayFirstCommits)
+
+    def chkPrePrepared(ppSeqNo):
+        assert primary.lastPrePrepareSeqNo == ppSeqNo
+
+    # Each request is sent once the one before it is in a PRE-PREPARE so
+    # that they are in different batches
+    sendRandomRequest(wallet1, client1)
+    looper.run(eventually(chkPrePrepared, firstPpSeqNo, retryWait=.1,
+                          timeout=5))
+    sendRandomRequest(wallet1, client1)
+    looper.run(eventually(chkPrePrepared, firstPpSeqNo + 1, retryWait=.1,
+                          timeout=5))
+
+    def chkStashed():
+        assert slowRep.stashedCommitsForOrdering
+
+    looper.run(eventually(chkStashed, retryWait=.1,
+                          timeout=commitDelay - 1))
+
+    def chkOrdered():
+        ordered = [p['ppSeqNo'] for p in getAllArgs(slowRep, slowRep.doOrder)]
+        assert ordered[-2:] == [firstPpSeqNo, firstPpSeqNo + 1]
+        assert not slowRep.stashedCommitsForOrdering
+        assert not slowRep.unorderedCommits
+
+    looper.run(eventually(chkOrdered, retryWait=.1, timeout=commitDelay + 2))
+    slowRep.node.nodeIbStasher.nodelay(delayFirstCommits)
@@ -1,5 +1,6 @@
 import time
 import types
+from typing import List
 
 import pytest as pytest
 
@@ -7,6 +8,7 @@ from plenum.common.eventually import eventually
 from plenum.common.log import getlogger
 from plenum.common.request import ReqDigest
 from plenum.common.types import PrePrepare
+from plenum.server.replica import Replica
 from plenum.server.suspicion_codes import Suspicions
 from plenum.test.helper import getPrimaryReplica, getNodeSuspicions
 from plenum.test.instances.helper import recvdPrePrepare
@@ -23,9 +25,9 @@ whitelist = [Suspicions.PPR_FRM_NON_PRIMARY.reason,
 
 @pytest.fixture(scope="module")
 def setup(nodeSet, up):
-    def dontSendPrePrepareRequest(self, reqDigest: ReqDigest):
-        logger.debug("EVIL: {} not sending pre-prepare message for request {}".
-                     format(self.name, reqDigest))
+    def dontSendPrePrepareRequest(self, reqDigests: List[ReqDigest]):
+        logger.debug("EVIL: {} not sending pre-prepare message for requests "
+                     "{}".format(self.name, reqDigests))
         return
 
     pr = getPrimaryReplica(nodeSet, instId)
@@ -40,15 +42,14 @@ def testNonPrimarySendsAPrePrepare(looper, nodeSet, setup, propagated1):
     remainingNpr = nonPrimaryReplicas[1:]
 
     def sendPrePrepareFromNonPrimary(replica):
-        firstNpr.doPrePrepare(propagated1.reqDigest)
+        firstNpr.doPrePrepare([propagated1.reqDigest])
 
         return PrePrepare(
                 replica.instId,
                 firstNpr.viewNo,
                 firstNpr.lastPrePrepareSeqNo,
-                propagated1.identifier,
-                propagated1.reqId,
-                propagated1.digest,
+                [propagated1.key],
+                Replica.batchDigest([propagated1.digest]),
                 time.time())
 
     ppr = sendPrePrepareFromNonPrimary(firstNpr)
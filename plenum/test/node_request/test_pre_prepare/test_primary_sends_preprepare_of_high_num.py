@@ -5,7 +5,7 @@ import pytest
 from plenum.common.eventually import eventually
 from plenum.common.request import ReqDigest
 from plenum.common.types import PrePrepare
-from plenum.server.replica import TPCStat
+from plenum.server.replica import TPCStat, Replica
 from plenum.server.suspicion_codes import Suspicions
 from plenum.test.helper import getPrimaryReplica, getNodeSuspicions
 from plenum.test.test_node import getNonPrimaryReplicas
@@ -23,13 +23,12 @@ def testPrePrepareWithHighSeqNo(looper, nodeSet, propagated1):
             assert nodeSuspicions == 1
 
     def checkPreprepare(replica, viewNo, ppSeqNo, req, numOfPrePrepares):
-        assert (replica.prePrepares[viewNo, ppSeqNo][0]) == \
-               (req.identifier, req.reqId, req.digest)
+        assert replica.prePrepares[viewNo, ppSeqNo].reqIdr == [req.key]
 
     primary = getPrimaryReplica(nodeSet, instId)
     nonPrimaryReplicas = getNonPrimaryReplicas(nodeSet, instId)
     req = propagated1.reqDigest
-    primary.doPrePrepare(req)
+    primary.doPrePrepare([req])
     for np in nonPrimaryReplicas:
         looper.run(
                 eventually(checkPreprepare, np, primary.viewNo,
@@ -40,7 +39,9 @@ def testPrePrepareWithHighSeqNo(looper, nodeSet, propagated1):
     incorrectPrePrepareReq = PrePrepare(instId,
                                         primary.viewNo,
                                         primary.lastPrePrepareSeqNo + 2,
-                                        *newReqDigest,
+                                        [newReqDigest.key],
+                                        Replica.batchDigest(
+                                            [newReqDigest.digest]),
                                         time.time())
     primary.send(incorrectPrePrepareReq,TPCStat.PrePrepareSent)
     looper.run(eventually(chk, retryWait=1, timeout=50))
@@ -0,0 +1,58 @@
+from plenum.common.request import Request
+from plenum.common.types import PropagateDigest
+from plenum.server.propagator import Requests
+
+f = 1
+
+
+def request(amount=10):
+    return Request("cli1", 1, {"type": "buy", "amount": amount}, "sig")
+
+
+def digestFor(req, client="Client1"):
+    return PropagateDigest(req.identifier, req.reqId, req.digest, client)
+
+
+def testFinalisedOnDigestsOnceBodyKnown():
+    requests = Requests()
+    req = request()
+    for node in ("Beta", "Gamma", "Delta"):
+        requests.addPropagateDigest(digestFor(req), node)
+    state = requests[req.key]
+    # Enough nodes agree on the digest but the node does not have the request
+    assert state.votedDigest(f + 1) == req.digest
+    assert not state.isFinalised(f + 1)
+    assert requests.votes(req) == 3
+
+    # Fetched from one of the nodes
+    requests.add(req)
+    assert state.isFinalised(f + 1) == req
+    assert requests.canForward(req, f + 1)
+
+
+def testDigestsAndPropagatesCountedTogether():
+    requests = Requests()
+    req = request()
+    requests.addPropagate(req, "Alpha")
+    requests.addPropagateDigest(digestFor(req), "Beta")
+    assert not requests.canForward(req, f + 1)
+    requests.addPropagateDigest(digestFor(req), "Gamma")
+    assert requests.canForward(req, f + 1)
+    assert requests.hasPropagated(req, "Beta")
+
+
+def testNotFinalisedOnConflictingDigests():
+    requests = Requests()
+    req = request()
+    other = request(amount=1000)
+    requests.addPropagate(req, "Alpha")
+    requests.addPropagateDigest(digestFor(req), "Beta")
+    requests.addPropagateDigest(digestFor(other), "Gamma")
+    requests.addPropagateDigest(digestFor(other), "Delta")
+    state = requests[req.key]
+    assert state.votedDigest(f + 1) is None
+    assert not requests.canForward(req, f + 1)
+    # A body with a digest other than the agreed one is never finalised
+    requests.addPropagateDigest(digestFor(other), "Beta")
+    assert state.votedDigest(f + 1) == other.digest
+    assert not state.isFinalised(f + 1)
@@ -0,0 +1,68 @@
+import pytest
+
+from plenum.common.eventually import eventually
+from plenum.common.request import Request
+from plenum.common.types import Propagate
+from plenum.test.propagate.helper import recvdPropagate
+
+nodeCount = 4
+
+
+@pytest.fixture(scope="module", autouse=True)
+def pooledSigVerification(tconf, request):
+    oldPooled = tconf.PooledSigVerification
+    tconf.PooledSigVerification = True
+
+    def reset():
+        tconf.PooledSigVerification = oldPooled
+
+    request.addfinalizer(reset)
+    return tconf
+
+
+def countDeferredPropagates(node, counts):
+    original = node.sigVerifier.add
+
+    def add(sigData, wrappedMsg):
+        if isinstance(wrappedMsg[0], Propagate):
+            counts[node.name] += 1
+        return original(sigData, wrappedMsg)
+
+    counts[node.name] = 0
+    node.sigVerifier.add = add
+
+
+def testPooledPropagateSignatureNotReverified(looper, nodeSet, up, sent1):
+    """
+    With signatures verified in a pool of processes, a PROPAGATE carrying a
+    request whose signature the node has verified is not sent to the pool,
+    and one the pool verifies marks the request as verified
+    """
+    def chk():
+        for node in nodeSet.nodes.values():
+            assert len(recvdPropagate(node)) == nodeCount - 1
+
+    looper.run(eventually(chk, retryWait=.5, timeout=10))
+
+    counts = {}
+    for node in nodeSet.nodes.values():
+        assert node.sigVerifier is not None
+        countDeferredPropagates(node, counts)
+
+    A, B = list(nodeSet.nodes.values())[:2]
+    propagate = recvdPropagate(A)[0]['msg']
+    request = Request(**propagate.request)
+    assert A.requests.isVerified(request)
+    assert A.validateNodeMsg((propagate, B.name)) == (propagate, B.name)
+    assert counts[A.name] == 0
+
+    # Once forgotten, the signature is verified in the pool again and
+    # recorded as verified when the pool returns
+    A.requests[request.key].verifiedSigs.clear()
+    assert A.validateNodeMsg((propagate, B.name)) is None
+    assert counts[A.name] == 1
+
+    def chkMarked():
+        assert A.requests.isVerified(request)
+
+    looper.run(eventually(chkMarked, retryWait=.5, timeout=10))
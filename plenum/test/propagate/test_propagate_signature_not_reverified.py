@@ -0,0 +1,38 @@
+from plenum.common.eventually import eventually
+from plenum.test.propagate.helper import recvdPropagate
+from plenum.test.test_node import TestNode
+
+nodeCount = 4
+
+
+def countAuthentications(node: TestNode, counts):
+    authNr = node.clientAuthNr
+    original = authNr.authenticate
+
+    def authenticate(*args, **kwargs):
+        counts[node.name] += 1
+        return original(*args, **kwargs)
+
+    counts[node.name] = 0
+    authNr.authenticate = authenticate
+
+
+def testPropagateSignatureNotReverified(looper, nodeSet, up, sent1):
+    """
+    A node verifies the signature of a request once, the PROPAGATEs carrying
+    the same request are not verified again
+    """
+    counts = {}
+    for node in nodeSet.nodes.values():
+        countAuthentications(node, counts)
+
+    def chk():
+        for node in nodeSet.nodes.values():
+            assert len(recvdPropagate(node)) == nodeCount - 1
+
+    looper.run(eventually(chk, retryWait=.5, timeout=10))
+
+    for node in nodeSet.nodes.values():
+        # Once for the REQUEST and at most once for a PROPAGATE received
+        # before the REQUEST
+        assert counts[node.name] <= 2
@@ -0,0 +1,114 @@
+import pytest
+
+from plenum.common.eventually import eventually
+from plenum.common.types import RequestFetch
+from plenum.test.helper import checkRequestReturnedToNode, \
+    sendRandomRequest
+from plenum.test.spy_helpers import getAllArgs
+
+nodeCount = 4
+
+
+@pytest.fixture(scope="module")
+def digestPropagates(tconf, request):
+    oldDigestPropagates = tconf.DigestPropagates
+    tconf.DigestPropagates = True
+
+    def reset():
+        tconf.DigestPropagates = oldDigestPropagates
+
+    request.addfinalizer(reset)
+    return tconf
+
+
+def dropFetchesAtFirstAsked():
+    """
+    Delayers which hold back the REQUEST_FETCHes received by the node asked
+    first, whichever it is, for longer than the test runs
+    """
+    firstAsked = []
+
+    def dropper(node):
+        def inner(wrappedMsg):
+            msg, frm = wrappedMsg
+            if not isinstance(msg, RequestFetch):
+                return
+            if not firstAsked:
+                firstAsked.append(node.name)
+            if firstAsked[0] == node.name:
+                return 300
+        return inner
+
+    return dropper, firstAsked
+
+
+@pytest.fixture()
+def setup(digestPropagates, nodeSet):
+    A, B, C, D = nodeSet.nodes.values()
+    # A never gets the request from the client
+    A.clientIbStasher.delay(lambda x: 300)
+    dropper, firstAsked = dropFetchesAtFirstAsked()
+    for node in (B, C, D):
+        node.nodeIbStasher.delay(dropper(node))
+    return firstAsked
+
+
+def testRequestFetchedAgainIfNotSent(setup, looper, nodeSet, up, sent1):
+    """
+    The node asked first for a request never sends it, the node fetching the
+    request asks another node after `RequestFetchTimeout` and orders the
+    request, though it receives no more PROPAGATE_DIGESTs
+    """
+    A, B, C, D = nodeSet.nodes.values()
+    key = sent1.identifier, sent1.reqId
+    timeout = A.config.RequestFetchTimeout + 10
+    looper.run(eventually(checkRequestReturnedToNode, A, *key, 0,
+                          retryWait=1, timeout=timeout))
+    state = A.requests[key]
+    assert setup[0] in state.fetchedFrom
+    assert len(state.fetchedFrom) == 2
+    assert state.fetchRetry is None
+
+
+def dropFirstFetchAtEachNode():
+    """
+    Delayers which hold back the first REQUEST_FETCH received by each node
+    for longer than the test runs
+    """
+    asked = set()
+
+    def dropper(node):
+        def inner(wrappedMsg):
+            msg, frm = wrappedMsg
+            if isinstance(msg, RequestFetch) and node.name not in asked:
+                asked.add(node.name)
+                return 300
+        return inner
+
+    return dropper
+
+
+def testRequestFetchedAgainFromNodesAsked(digestPropagates, looper, nodeSet,
+                                          up, wallet1, client1):
+    """
+    Once every node agreeing on the digest of a request has been asked for it
+    without sending it, the node fetching the request asks them again and
+    orders the request
+    """
+    A, B, C, D = nodeSet.nodes.values()
+    A.clientIbStasher.delay(lambda x: 300)
+    dropper = dropFirstFetchAtEachNode()
+    for node in (B, C, D):
+        node.nodeIbStasher.delay(dropper(node))
+
+    req = sendRandomRequest(wallet1, client1)
+    key = req.identifier, req.reqId
+    timeout = 6 * A.config.RequestFetchTimeout + 10
+    looper.run(eventually(checkRequestReturnedToNode, A, *key, 0,
+                          retryWait=1, timeout=timeout))
+    fetches = [p['msg'] for p in getAllArgs(A, A.send)
+               if isinstance(p['msg'], RequestFetch) and
+               (p['msg'].identifier, p['msg'].reqId) == key]
+    # More REQUEST_FETCHes than nodes to ask
+    assert len(fetches) > 3
+    assert A.requests[key].fetchRetry is None
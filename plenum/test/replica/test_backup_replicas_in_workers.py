@@ -0,0 +1,68 @@
+import pytest
+
+from plenum.common.eventually import eventually
+from plenum.common.types import ThreePCState
+from plenum.server.replica_worker import ReplicaProxy
+from plenum.test.helper import sendRandomRequest, \
+    checkSufficientRepliesRecvd, checkRequestReturnedToNode
+
+nodeCount = 4
+
+
+@pytest.fixture(scope="module", autouse=True)
+def backupReplicasInWorkers(tconf, request):
+    oldInWorkers = tconf.BackupReplicasInWorkers
+    tconf.BackupReplicasInWorkers = True
+
+    def reset():
+        tconf.BackupReplicasInWorkers = oldInWorkers
+
+    request.addfinalizer(reset)
+    return tconf
+
+
+def testBackupInstancesOrderInWorkers(looper, nodeSet, up, wallet1,
+                                      client1):
+    """
+    Backup replicas running in worker processes order the requests the
+    master orders, and the monitor compares the throughput of the master
+    with theirs
+    """
+    reqs = []
+    for i in range(5):
+        req = sendRandomRequest(wallet1, client1)
+        looper.run(eventually(checkSufficientRepliesRecvd, client1.inBox,
+                              req.reqId, 1, retryWait=1, timeout=5))
+        reqs.append(req)
+
+    for node in nodeSet:
+        backups = node.replicas[1:]
+        assert backups
+        assert all(isinstance(r, ReplicaProxy) and r.isRunning
+                   for r in backups)
+        for req in reqs:
+            for r in backups:
+                looper.run(eventually(checkRequestReturnedToNode, node,
+                                      req.identifier, req.reqId, r.instId,
+                                      retryWait=.5, timeout=5))
+        masterThroughput, avgBackupThroughput = \
+            node.monitor.getThroughputs(node.instances.masterId)
+        assert masterThroughput > 0
+        assert avgBackupThroughput > 0
+        assert node.monitor.masterThroughputRatio() is not None
+
+
+def testThreePhaseStateReportedByWorkers(looper, nodeSet, up):
+    """
+    A node syncs the 3 phase state of its replicas, those in worker
+    processes report theirs to the node
+    """
+    for node in nodeSet:
+        node.sync3PhaseState()
+
+    def chkReported():
+        for node in nodeSet:
+            for r in node.replicas[1:]:
+                assert r._threePhaseState == ThreePCState(r.instId, [])
+
+    looper.run(eventually(chkReported, retryWait=.5, timeout=5))
@@ -0,0 +1,36 @@
+from plenum.common.types import Prepare, Commit
+from plenum.server.models import Prepares, Commits, VoterIndex, VoterSet
+
+
+def testVoterSetBehavesLikeSet():
+    index = VoterIndex()
+    voters = VoterSet(index, ["Alpha:0", "Beta:0"])
+    voters.add("Gamma:0")
+    voters.add("Beta:0")
+    assert len(voters) == 3
+    assert "Beta:0" in voters
+    assert "Delta:0" not in voters
+    assert set(voters) == {"Alpha:0", "Beta:0", "Gamma:0"}
+    assert len(index) == 3
+
+
+def testPreparesAndCommitsShareVoterIndex():
+    index = VoterIndex()
+    prepares, commits = Prepares(index), Commits(index)
+    names = ["Alpha:0", "Beta:0", "Gamma:0", "Delta:0"]
+    f = 1
+    for ppSeqNo in range(1, 4):
+        prepare = Prepare(0, 0, ppSeqNo, "digest", 0)
+        commit = Commit(0, 0, ppSeqNo, "digest", 0)
+        for name in names[:2]:
+            prepares.addVote(prepare, name)
+        for name in names[1:]:
+            commits.addVote(commit, name)
+        assert prepares.hasQuorum(prepare, f)
+        assert prepares.hasPrepareFrom(prepare, "Alpha:0")
+        assert not prepares.hasPrepareFrom(prepare, "Delta:0")
+        assert commits.hasQuorum(commit, f)
+        assert not commits.hasCommitFrom(commit, "Alpha:0")
+        assert len(prepares[(0, ppSeqNo)].voters) == 2
+    # Every name got an index once
+    assert len(index) == len(names)
@@ -0,0 +1,104 @@
+import time
+
+from plenum.common.log import getlogger
+from plenum.common.perf_util import get_size
+from plenum.common.request import ReqDigest
+from plenum.common.types import PrePrepare, Prepare, Commit, Checkpoint, \
+    Ordered
+from plenum.server.replica import Replica
+from plenum.server.replica_worker import ReplicaHost
+
+logger = getlogger()
+
+instId = 1
+primary = "Alpha"
+others = ["Gamma", "Delta"]
+batchCount = 1000
+
+
+def createBackupReplica(tconf, lean: bool) -> Replica:
+    oldLean = tconf.LeanBackupReplicas
+    tconf.LeanBackupReplicas = lean
+    try:
+        host = ReplicaHost("Beta")
+        host.updateState((0, 1, True, 0))
+        replica = Replica(host, instId, isMaster=False)
+    finally:
+        tconf.LeanBackupReplicas = oldLean
+    replica.primaryName = Replica.generateName(primary, instId)
+    return replica
+
+
+def orderBatch(replica, ppSeqNo) -> int:
+    """
+    Feed a backup replica with what the other nodes send for a batch of one
+    request and return the number of batches ordered.
+    """
+    key = ("cli", ppSeqNo)
+    digest = "digest{}".format(ppSeqNo)
+    replica.requests[key] = digest
+    batchDigest = Replica.batchDigest([digest])
+    ppTime = time.time()
+    replica.inBox.append(ReqDigest(*key, digest))
+    replica.inBox.append((PrePrepare(instId, 0, ppSeqNo, [key], batchDigest,
+                                     ppTime), primary))
+    for sender in others:
+        replica.inBox.append((Prepare(instId, 0, ppSeqNo, batchDigest, ppTime),
+                              sender))
+    for sender in [primary] + others:
+        replica.inBox.append((Commit(instId, 0, ppSeqNo, batchDigest, ppTime),
+                              sender))
+    replica.serviceQueues()
+    ordered = 0
+    while replica.outBox:
+        msg = replica.outBox.popleft()
+        if isinstance(msg, Checkpoint):
+            # The other nodes reach the same checkpoint
+            for sender in others:
+                replica.inBox.append((msg, sender))
+        elif isinstance(msg, Ordered):
+            ordered += 1
+    replica.serviceQueues()
+    return ordered
+
+
+def threePCStateSize(replica):
+    return get_size([replica.prePrepares, replica.prepares, replica.commits,
+                     replica.threePCLog, replica.checkpoints,
+                     replica.stashingWhileOutsideWaterMarks])
+
+
+def runBackupReplica(tconf, lean: bool):
+    replica = createBackupReplica(tconf, lean)
+    start = time.perf_counter()
+    ordered = sum(orderBatch(replica, ppSeqNo)
+                  for ppSeqNo in range(1, batchCount + 1))
+    elapsed = time.perf_counter() - start
+    size = threePCStateSize(replica)
+    logger.info("{} backup replica ordered {} batches in {:.3f} seconds and "
+                "holds {} bytes of 3 phase state".
+                format("Lean" if lean else "Full", ordered, elapsed, size))
+    assert ordered == batchCount
+    return replica, elapsed, size
+
+
+def testLeanBackupReplicaCost(tconf):
+    """
+    Benchmark of the cost of a backup replica ordering batches with and
+    without `LeanBackupReplicas`. The lean replica keeps no 3 phase state
+    for ordered batches and no checkpoints
+    """
+    full, fullTime, fullSize = runBackupReplica(tconf, lean=False)
+    lean, leanTime, leanSize = runBackupReplica(tconf, lean=True)
+    logger.info("Lean backup replica took {:.0%} of the time and {:.0%} of "
+                "the memory of a full one".
+                format(leanTime / fullTime, leanSize / fullSize))
+
+    assert not full.isLean and lean.isLean
+    assert not lean.prePrepares
+    assert not lean.checkpoints
+    assert len(lean.threePCLog) == 0
+    assert lean.h == batchCount
+    # Hosted in a worker, the lean replica cleans up the requests it ordered
+    assert not lean.requests
+    assert leanSize < fullSize
@@ -0,0 +1,46 @@
+from plenum.common.types import Prepare
+from plenum.server.stash import MsgStash
+
+
+def prepare(viewNo, ppSeqNo):
+    return Prepare(0, viewNo, ppSeqNo, "digest", 0)
+
+
+def testOnlyMatchingKeysReleased():
+    stash = MsgStash(maxPerSender=100)
+    for viewNo, ppSeqNo in [(2, 1), (1, 5), (3, 2), (1, 2)]:
+        stash.add((viewNo, ppSeqNo), prepare(viewNo, ppSeqNo), "Alpha")
+
+    released = stash.popRange(maxKey=(2 + 1,))
+    assert [(m.viewNo, m.ppSeqNo) for m, _ in released] == \
+        [(1, 2), (1, 5), (2, 1)]
+    assert len(stash) == 1
+    assert [(m.viewNo, m.ppSeqNo) for m, _ in stash] == [(3, 2)]
+
+
+def testReleaseWithinWaterMarks():
+    stash = MsgStash(maxPerSender=100)
+    for ppSeqNo in (3, 12, 25, 40):
+        stash.add((ppSeqNo, 0), prepare(0, ppSeqNo), "Alpha")
+    h, H = 10, 30
+    stale = stash.popRange(maxKey=(h + 1,))
+    released = stash.popRange((h + 1,), (H + 1,))
+    assert [m.ppSeqNo for m, _ in stale] == [3]
+    assert [m.ppSeqNo for m, _ in released] == [12, 25]
+    assert [m.ppSeqNo for m, _ in stash] == [40]
+
+
+def testMessagesLimitedPerSender():
+    stash = MsgStash(maxPerSender=3)
+    for ppSeqNo in range(1, 6):
+        stash.add((0, ppSeqNo), prepare(0, ppSeqNo), "Beta")
+    assert stash.add((0, 1), prepare(0, 1), "Gamma")
+    assert len(stash) == 4
+    assert stash.countFrom("Beta") == 3
+    assert stash.rejected == 2
+
+    # Releasing messages makes room for more from the same sender
+    stash.pop((0, 1))
+    assert stash.countFrom("Beta") == 2
+    assert stash.countFrom("Gamma") == 0
+    assert stash.add((0, 6), prepare(0, 6), "Beta")
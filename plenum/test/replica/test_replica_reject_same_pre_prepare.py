@@ -6,6 +6,7 @@ from plenum.common.eventually import eventually
 from plenum.common.log import getlogger
 from plenum.common.types import PrePrepare
 from plenum.common.util import getMaxFailures
+from plenum.server.replica import Replica
 from plenum.test.helper import checkPrePrepareReqSent, \
     checkPrePrepareReqRecvd, \
     checkPrepareReqSent
@@ -53,9 +54,8 @@ def testReplicasRejectSamePrePrepareMsg(looper, nodeSet, client1, wallet1):
         primaryRepl.instId,
         primaryRepl.viewNo,
         primaryRepl.lastPrePrepareSeqNo,
-        wallet1.defaultId,
-        request2.reqId,
-        request2.digest,
+        [(wallet1.defaultId, request2.reqId)],
+        Replica.batchDigest([request2.digest]),
         time.time()
     )
 
@@ -0,0 +1,34 @@
+import pickle
+
+from plenum.common.exceptions import SuspiciousNode
+from plenum.common.request import ReqDigest
+from plenum.common.types import PrePrepare, Ordered, Prepare
+from plenum.server.replica_worker import encodeMsg, decodeMsg, \
+    encodeOutMsg, decodeOutMsg
+from plenum.server.suspicion_codes import Suspicions
+
+
+def roundTrip(encoded):
+    return pickle.loads(pickle.dumps(encoded))
+
+
+def testMsgsSurviveCrossingProcesses():
+    msgs = [PrePrepare(1, 0, 5, [("cli", 1), ("cli", 2)], "digest", 10.5),
+            Prepare(1, 0, 5, "digest", 10.5),
+            Ordered(1, 0, [("cli", 1)], 5, 10.5),
+            ReqDigest("cli", 1, "reqDigest")]
+    for msg in msgs:
+        decoded = decodeMsg(roundTrip(encodeMsg(msg)))
+        assert type(decoded) is type(msg)
+        assert decoded == msg
+
+
+def testSuspicionSurvivesCrossingProcesses():
+    pp = PrePrepare(1, 0, 5, [("cli", 1)], "digest", 10.5)
+    ex = SuspiciousNode("Beta:1", Suspicions.PPR_FRM_NON_PRIMARY, pp)
+    decoded = decodeOutMsg(roundTrip(encodeOutMsg(ex)))
+    assert isinstance(decoded, SuspiciousNode)
+    assert decoded.node == "Beta"
+    assert decoded.code == Suspicions.PPR_FRM_NON_PRIMARY.code
+    assert decoded.reason == Suspicions.PPR_FRM_NON_PRIMARY.reason
+    assert decoded.offendingMsg == pp
@@ -0,0 +1,40 @@
+from plenum.common.types import PrePrepare
+from plenum.server.models import ThreePCLog, ThreePhaseVotes
+
+
+def prePrepare(viewNo, ppSeqNo):
+    return PrePrepare(0, viewNo, ppSeqNo, [("cli", ppSeqNo)], "digest", 0)
+
+
+def testLogKeepsStateTogetherInSequenceOrder():
+    log = ThreePCLog()
+    for ppSeqNo in (3, 1, 2):
+        log.addPrePrepare(prePrepare(0, ppSeqNo))
+    votes = ThreePhaseVotes({"Alpha:0"})
+    log.addPrepares((0, 1), votes)
+    log.addCommits((0, 1), votes)
+    log.markOrdered((0, 1))
+
+    assert [k for k, _ in log.items()] == [(0, 1), (0, 2), (0, 3)]
+    entry = log.get((0, 1))
+    assert entry.prePrepare.reqIdr == [("cli", 1)]
+    assert entry.prepares is entry.commits is votes
+    assert (0, 1) in log.ordered
+    assert (0, 2) not in log.ordered
+    assert len(log.ordered) == 1
+    assert log.lastOrdered == (0, 1)
+
+
+def testTruncateRemovesOnlyPrefix():
+    log = ThreePCLog()
+    for ppSeqNo in range(1, 11):
+        log.addPrePrepare(prePrepare(0 if ppSeqNo < 6 else 1, ppSeqNo))
+        log.markOrdered((0 if ppSeqNo < 6 else 1, ppSeqNo))
+
+    removed = log.truncate(7)
+    assert [k for k, _ in removed] == [(0, 1), (0, 2), (0, 3), (0, 4),
+                                       (0, 5), (1, 6), (1, 7)]
+    assert len(log) == 3
+    assert len(log.ordered) == 3
+    assert list(log.ordered) == [(1, 8), (1, 9), (1, 10)]
+    assert log.truncate(7) == []
@@ -0,0 +1,47 @@
+import time
+
+import pytest
+
+from plenum.common.signer_simple import SimpleSigner
+from plenum.server.client_authn import SimpleAuthNr
+from plenum.server.sig_verifier import PooledSigVerifier
+
+
+@pytest.fixture
+def sigVerifier(request):
+    verifier = PooledSigVerifier(workers=2, batchSize=4)
+    request.addfinalizer(verifier.stop)
+    return verifier
+
+
+def waitForVerification(verifier, timeout=10):
+    verified = []
+    start = time.perf_counter()
+    while len(verifier) and time.perf_counter() - start < timeout:
+        verified.extend(verifier.service())
+        time.sleep(.01)
+    verified.extend(verifier.service())
+    return verified
+
+
+def testSignaturesVerifiedInArrivalOrder(sigVerifier):
+    authNr = SimpleAuthNr()
+    signers = [SimpleSigner() for _ in range(3)]
+    for signer in signers:
+        authNr.addClient(signer.identifier, signer.verkey)
+
+    expected = []
+    for reqId in range(1, 11):
+        signer = signers[reqId % len(signers)]
+        msg = {"identifier": signer.identifier, "reqId": reqId}
+        msg["signature"] = signer.sign(msg)
+        # Every third request is tampered with after signing
+        valid = reqId % 3 != 0
+        if not valid:
+            msg["reqId"] = reqId + 100
+        sigVerifier.add(authNr.verificationData(msg), reqId)
+        expected.append((reqId, valid))
+    sigVerifier.flush()
+
+    assert waitForVerification(sigVerifier) == expected
+    assert len(sigVerifier) == 0
@@ -0,0 +1,174 @@
+import json
+import os
+from collections import OrderedDict
+from types import SimpleNamespace
+
+from plenum.persistence import ledger_offset_index
+from plenum.persistence.ledger_offset_index import LedgerOffsetIndex
+
+
+class FileLedger:
+    """
+    Ledger stored in a text file with a transaction per line, like the
+    transaction log of `Ledger`
+    """
+
+    def __init__(self, dataDir):
+        self._transactionLog = SimpleNamespace(
+            dbPath=os.path.join(dataDir, "transactions"), isLineNoKey=True,
+            storeContentHash=False, delimiter="\t", lineSep="\r\n")
+        self.leafSerializer = SimpleNamespace(deserialize=json.loads)
+        self.size = 0
+
+    def add(self, count):
+        with open(self._transactionLog.dbPath, "ab") as data:
+            for _ in range(count):
+                self.size += 1
+                data.write(json.dumps(txn(self.size)).encode() + b"\r\n")
+
+    def getAllTxn(self, frm, to):
+        txns = OrderedDict()
+        with open(self._transactionLog.dbPath, "rb") as data:
+            for seqNo, line in enumerate(data, 1):
+                if frm <= seqNo <= to:
+                    txns[seqNo] = json.loads(line.decode())
+        return txns
+
+
+def txn(seqNo):
+    return {"type": "NYM", "dest": "dest{}".format(seqNo), "reqId": seqNo}
+
+
+def expected(start, end):
+    return OrderedDict((s, txn(s)) for s in range(start, end + 1))
+
+
+def testRangesReadThroughIndex(tdir_for_func):
+    ledger = FileLedger(tdir_for_func)
+    ledger.add(1000)
+    index = LedgerOffsetIndex.forLedger(ledger)
+    assert index.getRange(1, 3) == expected(1, 3)
+    assert index.getRange(990, 1005) == expected(990, 1000)
+    assert index.getRange(1001, 1005) == OrderedDict()
+
+    # Only the transactions added since are indexed
+    ledger.add(10)
+    assert index.sync() == 10
+    assert index.getRange(1005, 1010) == expected(1005, 1010)
+    assert index.sync() == 0
+    assert LedgerOffsetIndex.forLedger(SimpleNamespace()) is None
+
+
+def testIndexPersistedNextToLedger(tdir_for_func):
+    ledger = FileLedger(tdir_for_func)
+    ledger.add(100)
+    index = LedgerOffsetIndex.forLedger(ledger)
+    index.sync()
+    index.close()
+    assert os.path.exists(ledger._transactionLog.dbPath +
+                          LedgerOffsetIndex.Suffix)
+
+    # A transaction not completely written is not indexed
+    with open(ledger._transactionLog.dbPath, "ab") as data:
+        data.write(b'{"type":')
+    index = LedgerOffsetIndex.forLedger(ledger)
+    assert index.size == 100
+    assert index.sync() == 0
+    assert index.getRange(99, 101) == expected(99, 100)
+    index.close()
+
+    # The ledger was reset and has other transactions now
+    os.remove(ledger._transactionLog.dbPath)
+    ledger.size = 0
+    ledger.add(10)
+    index = LedgerOffsetIndex.forLedger(ledger)
+    assert index.getRange(1, 10) == expected(1, 10)
+    assert index.size == 10
+
+
+class ReadCounter:
+    """
+    File counting the bytes read from it
+    """
+
+    def __init__(self, file, counts):
+        self.file = file
+        self.counts = counts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.file.close()
+
+    def __iter__(self):
+        for line in self.file:
+            self.counts["bytes"] += len(line)
+            yield line
+
+    def read(self, size=-1):
+        data = self.file.read(size)
+        self.counts["bytes"] += len(data)
+        return data
+
+    def readline(self):
+        line = self.file.readline()
+        self.counts["bytes"] += len(line)
+        return line
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def countingOpen(counts):
+    def _open(path, mode="r", *args, **kwargs):
+        file = open(path, mode, *args, **kwargs)
+        return ReadCounter(file, counts) if mode == "rb" else file
+    return _open
+
+
+def testTailReadIndependentOfLedgerSize(tdir_for_func, monkeypatch):
+    ledger = FileLedger(tdir_for_func)
+    ledger.add(1000)
+    index = LedgerOffsetIndex.forLedger(ledger)
+    index.sync()
+    start = ledger.size - 99
+    tailSize = sum(len(json.dumps(txn(s))) + 2
+                   for s in range(start, ledger.size + 1))
+
+    counts = {"bytes": 0}
+    monkeypatch.setattr(ledger_offset_index, "open", countingOpen(counts),
+                        raising=False)
+    assert index.getRange(start, ledger.size) == expected(start, ledger.size)
+    # The tail is read, along with the last indexed transaction to check
+    # that the ledger's file did not change
+    assert counts["bytes"] < 2 * tailSize
+    assert counts["bytes"] * 5 < os.path.getsize(ledger._transactionLog.dbPath)
+
+
+def testIndexRebuiltWhenLedgerRewritten(tdir_for_func):
+    ledger = FileLedger(tdir_for_func)
+    ledger.add(10)
+    index = LedgerOffsetIndex.forLedger(ledger)
+    assert index.sync() == 10
+
+    # The ledger was reset and has more, other, transactions now
+    others = [dict(txn(s), amount=s) for s in range(1, 21)]
+    with open(ledger._transactionLog.dbPath, "wb") as data:
+        for other in others:
+            data.write(json.dumps(other).encode() + b"\r\n")
+    assert index.getRange(1, 20) == OrderedDict(enumerate(others, 1))
+    assert index.size == 20
+    index.close()
+
+
+def testSerializedRangesAsStored(tdir_for_func):
+    ledger = FileLedger(tdir_for_func)
+    ledger.add(100)
+    index = LedgerOffsetIndex.forLedger(ledger)
+    serialized = index.getSerializedRange(95, 105)
+    assert serialized == [json.dumps(txn(s)) for s in range(95, 101)]
+    assert [json.loads(s) for s in serialized] == \
+        list(expected(95, 100).values())
+    assert index.getSerializedRange(101, 105) == []
+    index.close()
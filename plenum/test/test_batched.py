@@ -0,0 +1,264 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from plenum.common.compression import ZLIB
+from plenum.common.log import getlogger
+from plenum.common.msg_decoder import decodeNodeMsg
+from plenum.common.stacked import Batched, SimpleStack, MsgCodecsByName, \
+    PositionalCodec, DefaultMsgCodec, ClientStack, MsgPackCodec, msgpack
+from plenum.common.txn import CATCHUP_REP, COMMIT, NOMINATE, PREPARE, \
+    PROPAGATE
+from plenum.common.types import Batch, CatchupRep, Commit, Nomination, \
+    Prepare, Propagate, PositionalTypeIds
+
+logger = getlogger()
+
+remoteCount = 24
+
+
+class RecordingStack(Batched):
+    """
+    Batched stack which records what it prepares, encodes and transmits
+    """
+
+    def __init__(self, preEncode):
+        super().__init__()
+        self.preEncodeBatchedMsgs = preEncode
+        # Batches are limited in size by the tests which need it
+        self.maxBatchSize = None
+        self.remotes = {rid: SimpleNamespace(name="Node{}".format(rid))
+                        for rid in range(1, remoteCount + 1)}
+        self.messageTimeout = 0
+        self.announcedCodecs = {}
+        self.prepared = 0
+        self.encoded = 0
+        self.transmitted = []
+
+    def prepForSending(self, msg, signer=None):
+        self.prepared += 1
+        return SimpleStack.prepForSending(self, msg, signer)
+
+    def encodeBatchedMsg(self, msg):
+        self.encoded += 1
+        return super().encodeBatchedMsg(msg)
+
+    def transmit(self, msg, rid, timeout=None):
+        self.transmitted.append((msg, rid))
+
+    setAnnouncedCodecs = SimpleStack.setAnnouncedCodecs
+
+
+def broadcast(stack, count):
+    msgs = []
+    for ppSeqNo in range(1, count + 1):
+        msgs.append(Prepare(0, 0, ppSeqNo, "digest", 1.5))
+        msgs.append(Commit(0, 0, ppSeqNo, "digest", 1.5))
+    for msg in msgs:
+        stack.send(msg)
+    return msgs
+
+
+def testBroadcastPreparedOnce():
+    stack = RecordingStack(preEncode=False)
+    msgs = broadcast(stack, 1)
+    assert stack.prepared == len(msgs)
+    # All remotes share the same payload
+    payloads = [tuple(map(id, box)) for box in stack.outBoxes.values()]
+    assert len(payloads) == remoteCount
+    assert len(set(payloads)) == 1
+
+    stack.send(msgs[0], 1, 2, 3)
+    assert stack.prepared == len(msgs) + 1
+
+
+def testBatchedMsgsEncodedOnce():
+    stack = RecordingStack(preEncode=True)
+    msgs = broadcast(stack, 5)
+    # Sent to one remote only, so not shared
+    stack.send(msgs[0], 1)
+    stack.flushOutBoxes()
+    assert stack.encoded == len(msgs) + 1
+    assert len(stack.transmitted) == remoteCount
+
+    # Nodes decode the batch and the messages in it
+    for payload, rid in stack.transmitted:
+        assert all(isinstance(m, str) for m in payload["messages"])
+        decoded = decodeNodeMsg(dict(payload))
+        assert isinstance(decoded, Batch)
+        expected = msgs + [msgs[0]] if rid == 1 else msgs
+        assert decoded.messages == expected
+
+
+def testMsgsNotEncodedWithoutSizeLimit():
+    stack = RecordingStack(preEncode=False)
+    stack.maxBatchSize = None
+    broadcast(stack, 5)
+    stack.flushOutBoxes()
+    assert stack.encoded == 0
+    assert len(stack.transmitted) == remoteCount
+
+
+def wireSize(payload) -> int:
+    return len(json.dumps(payload, separators=(',', ':')))
+
+
+def testPreEncodedMsgsBytes():
+    """
+    Pre-encoded messages are encoded once for all remotes rather than once
+    per remote by the transport, but a JSON batch escapes them again
+    """
+    sizes, encodes, escaped = {}, {}, 0
+    for preEncode in (False, True):
+        stack = RecordingStack(preEncode=preEncode)
+        msgs = broadcast(stack, 20)
+        stack.flushOutBoxes()
+        sizes[preEncode] = sum(wireSize(p) for p, _ in stack.transmitted)
+        encodes[preEncode] = stack.encoded
+        if preEncode:
+            escaped = sum(len(json.dumps(m)) - len(m)
+                          for p, _ in stack.transmitted
+                          for m in p["messages"])
+    logger.info("{} messages to {} remotes take {} bytes plain, encoded in "
+                "the batch of each remote, and {} bytes pre-encoded, encoded "
+                "{} times".format(len(msgs), remoteCount, sizes[False],
+                                  sizes[True], encodes[True]))
+    assert encodes == {False: 0, True: len(msgs)}
+    # The only bytes added are the quotes and escapes of the messages
+    assert escaped > 0
+    assert sizes[True] == sizes[False] + escaped
+
+
+@pytest.mark.skipif(msgpack is None, reason="msgpack is not installed")
+def testPreEncodedMsgsNotEscapedWithMsgPack():
+    stack = RecordingStack(preEncode=True)
+    stack.msgCodec = MsgCodecsByName[MsgPackCodec.name]
+    stack.setAnnouncedCodecs("Node1", [MsgPackCodec.name])
+    msgs = broadcast(stack, 20)
+    stack.flushOutBoxes()
+
+    payload, = [p for p, rid in stack.transmitted if rid == 1]
+    packed = msgpack.packb(payload)
+    assert len(packed) < wireSize(payload)
+    assert decodeNodeMsg(msgpack.unpackb(packed, raw=False)).\
+        messages == msgs
+
+
+def testConsensusMsgsSentFirst():
+    stack = RecordingStack(preEncode=False)
+    stack.send(CatchupRep(1, {str(i): {"txn": i} for i in range(5)}, []), 1)
+    stack.send(Propagate({"reqId": 1}, "Client1"), 1)
+    stack.send(Commit(0, 0, 1, "digest", 1.5), 1)
+    stack.send(Nomination("Node2", 0, 0), 1)
+    stack.send(Prepare(0, 0, 1, "digest", 1.5), 1)
+    assert stack.laneDepths() == {"consensus": 2, "election": 1, "bulk": 2}
+    stack.flushOutBoxes()
+
+    (payload, rid), = stack.transmitted
+    assert [m["op"] for m in payload["messages"]] == \
+        [COMMIT, PREPARE, NOMINATE, CATCHUP_REP, PROPAGATE]
+    assert stack.laneDepths() == {"consensus": 0, "election": 0, "bulk": 0}
+    assert stack.outBoxStats()["peakDepths"] == \
+        {"consensus": 2, "election": 1, "bulk": 2}
+    stack.resetOutBoxStats()
+    assert stack.outBoxStats()["peakDepths"] == \
+        {"consensus": 0, "election": 0, "bulk": 0}
+
+
+def testBatchesLimitedInSize():
+    for preEncode in (False, True):
+        stack = RecordingStack(preEncode=preEncode)
+        stack.maxBatchSize = 2000
+        msgs = [Prepare(0, 0, ppSeqNo, "digest" * 10, 1.5)
+                for ppSeqNo in range(100)]
+        for msg in msgs:
+            stack.send(msg, 1)
+        stack.flushOutBoxes()
+
+        assert len(stack.transmitted) > 1
+        received = []
+        for payload, _ in stack.transmitted:
+            assert len(json.dumps(payload, separators=(',', ':'))) <= \
+                stack.maxBatchSize
+            received.extend(decodeNodeMsg(dict(payload)).messages)
+        assert received == msgs
+        # Messages measured are sent encoded, not encoded again
+        assert stack.encoded == len(msgs)
+        assert all(isinstance(m, str) for payload, _ in stack.transmitted
+                   for m in payload["messages"])
+
+
+def testPositionalCodecUsedForRemotesSupportingIt():
+    stack = RecordingStack(preEncode=False)
+    stack.msgCodec = MsgCodecsByName[PositionalCodec.name]
+    stack.setAnnouncedCodecs("Node1", stack.supportedCodecs)
+    stack.setAnnouncedCodecs("Node2", [DefaultMsgCodec.name])
+    assert stack.codecFor("Node1") is stack.msgCodec
+    assert stack.codecFor("Node2") is DefaultMsgCodec
+    assert stack.codecFor("Node3") is DefaultMsgCodec
+    msgs = broadcast(stack, 20)
+    stack.flushOutBoxes()
+
+    sizes = {}
+    for payload, rid in stack.transmitted:
+        positional = rid == 1
+        assert all(isinstance(m, list) == positional
+                   for m in payload["messages"])
+        assert decodeNodeMsg(dict(payload)).messages == msgs
+        sizes[rid] = len(json.dumps(payload, separators=(',', ':')))
+    # Field names are not sent
+    assert sizes[1] < sizes[2] * 0.6
+
+    stack.setAnnouncedCodecs("Node1", None)
+    stack.transmitted = []
+    broadcast(stack, 2)
+    stack.flushOutBoxes()
+    assert not any(isinstance(m, list) for payload, _ in stack.transmitted
+                   for m in payload["messages"])
+
+
+def testPositionalCodecLeavesOtherMsgsAsDicts():
+    stack = RecordingStack(preEncode=True)
+    stack.msgCodec = MsgCodecsByName[PositionalCodec.name]
+    stack.setAnnouncedCodecs("Node1", [PositionalCodec.name])
+    signed = dict(Prepare(0, 0, 1, "digest", 1.5)._asdict(),
+                  op=PREPARE, signature="sig")
+    stack._enqueuePayload(signed, 1)
+    stack.send(Commit(0, 0, 1, "digest", 1.5), 1)
+    stack.flushOutBoxes()
+
+    (payload, _), = stack.transmitted
+    encodedSigned, encodedCommit = payload["messages"]
+    assert json.loads(encodedSigned) == signed
+    assert json.loads(encodedCommit)[0] == PositionalTypeIds[COMMIT]
+    assert decodeNodeMsg(dict(payload)).messages[1] == \
+        Commit(0, 0, 1, "digest", 1.5)
+
+
+class ConnectingClientStack(ClientStack):
+    """
+    Client stack whose clients connect and disconnect as they are told to
+    """
+
+    def __init__(self):
+        self.clients = set()
+        self.connectedClients = set()
+        self.announcedCodecs = {}
+
+    @property
+    def connecteds(self):
+        return set(self.clients)
+
+
+def testClientCodecsForgottenWhenDisconnected():
+    stack = ConnectingClientStack()
+    stack.clients = {"client1", "client2"}
+    assert stack.serviceClientStack() == {"client1", "client2"}
+    for name in stack.clients:
+        stack.setAnnouncedCodecs(name, [ZLIB])
+
+    stack.clients = {"client2"}
+    stack.serviceClientStack()
+    assert not stack.canDecode("client1", ZLIB)
+    assert stack.canDecode("client2", ZLIB)
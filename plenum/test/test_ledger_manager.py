@@ -4,7 +4,9 @@ from plenum.test.testable import Spyable
 
 @Spyable(methods=[LedgerManager.startCatchUpProcess,
                   LedgerManager.catchupCompleted,
-                  LedgerManager.processConsistencyProofReq])
+                  LedgerManager.processConsistencyProofReq,
+                  LedgerManager.startCatchupStream,
+                  LedgerManager.processSnapshotChunk])
 class TestLedgerManager(LedgerManager):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
\ No newline at end of file
@@ -26,6 +26,7 @@ from plenum.server.instances import Instances
 from plenum.server.monitor import Monitor
 from plenum.server.node import Node
 from plenum.server.primary_elector import PrimaryElector
+from plenum.server.replica_worker import ReplicaProxy
 from plenum.test.greek import genNodeNames
 from plenum.test.msgs import TestMsg
 from plenum.test.spy_helpers import getLastMsgReceivedForNode, \
@@ -102,6 +103,8 @@ class TestNodeCore(StackedTester):
         return super()._serviceActions()
 
     def createReplica(self, instNo: int, isMaster: bool):
+        if not isMaster and self.config.BackupReplicasInWorkers:
+            return ReplicaProxy(self, instNo)
         return TestReplica(self, instNo, isMaster)
 
     def newPrimaryDecider(self):
@@ -174,7 +177,9 @@ class TestNodeCore(StackedTester):
 
     def serviceReplicaOutBox(self, *args, **kwargs) -> int:
         for r in self.replicas:  # type: TestReplica
-            r.outBoxTestStasher.process()
+            # Replicas in worker processes have no stasher
+            if isinstance(r, TestReplica):
+                r.outBoxTestStasher.process()
         return super().serviceReplicaOutBox(*args, **kwargs)
 
     @classmethod
@@ -0,0 +1,70 @@
+import asyncio
+from collections import deque
+
+import pytest
+
+from plenum.server.router import Router
+
+
+class Base:
+    pass
+
+
+class Derived(Base):
+    pass
+
+
+class Other:
+    pass
+
+
+def testMostSpecificRouteResolved():
+    handled = []
+    router = Router((Base, lambda m: handled.append(("base", m))),
+                    (Derived, lambda m: handled.append(("derived", m))))
+    base, derived = Base(), Derived()
+    router.handleSync(base)
+    router.handleSync(derived)
+    assert handled == [("base", base), ("derived", derived)]
+    with pytest.raises(RuntimeError):
+        router.handleSync(Other())
+
+
+def testChangedRoutesUsed():
+    router = Router((Base, lambda m: "base"))
+    assert router.handleSync(Derived()) == "base"
+    router.routes[Derived] = lambda m: "derived"
+    assert router.handleSync(Derived()) == "derived"
+    del router.routes[Derived]
+    assert router.handleSync(Derived()) == "base"
+
+
+def testSyncAndAsyncHandlers():
+    async def processOther(msg, frm):
+        return "async", frm
+
+    router = Router((Base, lambda msg, frm: ("sync", frm)),
+                    (Other, processOther))
+    loop = asyncio.new_event_loop()
+    try:
+        assert loop.run_until_complete(router.handle((Base(), "Alpha"))) == \
+            ("sync", "Alpha")
+        assert loop.run_until_complete(router.handle((Other(), "Beta"))) == \
+            ("async", "Beta")
+    finally:
+        loop.close()
+
+
+def testStatsCollectedPerRoute():
+    router = Router((Base, lambda m: None), (Other, lambda m: None),
+                    collectStats=True)
+    msgs = deque([Base(), Derived(), Other(), Base()])
+    assert router.handleAllSync(msgs) == 4
+    stats = router.stats
+    assert {name: count for name, (count, _) in stats.items()} == \
+        {"Base": 3, "Other": 1}
+    assert all(total >= 0 for _, total in stats.values())
+    router.resetStats()
+    assert router.stats == {}
+
+    assert Router((Base, lambda m: None)).stats == {}